@@ -16,8 +16,10 @@ from fastapi import (
     FastAPI,
     File,
     Form,
+    Header,
     HTTPException,
     Query,
+    Response,
     UploadFile,
 )
 from fastapi.responses import PlainTextResponse, StreamingResponse
@@ -123,8 +125,18 @@ def create_app(settings: APISettings | None = None) -> FastAPI:
     def _settings() -> APISettings:
         return settings or get_api_settings()
 
-    @router.get("/healthz")
-    def healthz() -> dict[str, str]:
+    # The health payload only changes with the package version, so it doubles
+    # as the ETag and lets the UI's frequent probes revalidate without a body.
+    healthz_etag = f'"{__version__}"'
+
+    @router.get("/healthz", response_model=None)
+    def healthz(
+        response: Response,
+        if_none_match: str | None = Header(default=None),
+    ) -> dict[str, str] | Response:
+        if if_none_match == healthz_etag:
+            return Response(status_code=304, headers={"ETag": healthz_etag})
+        response.headers["ETag"] = healthz_etag
         return {"status": "ok", "version": __version__}
 
     @router.get("/status")
@@ -12,6 +12,11 @@ from typing import Any
 
 import yaml
 
+try:  # libyaml's C loader when PyYAML was built against it.
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on the install
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 from scripts.codex_watcher import (
     DEFAULT_CONFIG,
     DEFAULT_CONFIG_PATH,
@@ -43,7 +48,12 @@ class APISettings:
         cfg: dict[str, Any] = copy.deepcopy(DEFAULT_CONFIG)
         if config_path.is_file():
             try:
-                user_cfg = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
+                user_cfg = (
+                    yaml.load(
+                        config_path.read_text(encoding="utf-8"), Loader=_YamlLoader
+                    )
+                    or {}
+                )
                 if not isinstance(user_cfg, dict):
                     raise ValueError(
                         "configuration file must contain a mapping at the top level"
@@ -3,6 +3,6 @@
 from __future__ import annotations
 
 from prompt_valet.ui.app import create_ui_app
-from prompt_valet.ui.settings import UISettings
+from prompt_valet.ui.settings import UISettings, get_ui_settings
 
-__all__ = ["create_ui_app", "UISettings"]
+__all__ = ["create_ui_app", "UISettings", "get_ui_settings"]
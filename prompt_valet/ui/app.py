@@ -6,15 +6,32 @@ import asyncio
 import json
 import logging
 import os
+import tempfile
+import time
 from collections import deque
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Coroutine, Dict, List, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+)
 
 from nicegui import ui
+
+try:  # NiceGUI pulls in orjson on CPython; fall back to stdlib json elsewhere.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the platform build
+    orjson = None  # type: ignore[assignment]
 from nicegui.events import MultiUploadEventArguments
 
 from prompt_valet.ui.client import PromptValetAPIClient, UploadFilePayload
-from prompt_valet.ui.settings import UISettings
+from prompt_valet.ui.settings import UISettings, get_ui_settings
 
 TIMESTAMP_FIELDS = (
     "created_at",
@@ -23,6 +40,10 @@ TIMESTAMP_FIELDS = (
     "heartbeat_at",
     "finished_at",
 )
+# Display labels for TIMESTAMP_FIELDS, e.g. "heartbeat_at" -> "Heartbeat At".
+_FIELD_PRETTY: Dict[str, str] = {
+    field: field.replace("_", " ").title() for field in TIMESTAMP_FIELDS
+}
 
 _STATE_BADGE_STYLES: Dict[str, str] = {
     "queued": "bg-slate-100 text-slate-700",
@@ -35,6 +56,20 @@ _STATE_BADGE_STYLES: Dict[str, str] = {
 
 TERMINAL_STATES = {"succeeded", "failed", "aborted"}
 _SERVICE_TARGET_PREVIEW = 4
+_JOBS_PAGE_SIZE = 25
+_ACCEPTED_UPLOAD_SUFFIXES = (".md",)
+_CONNECTIVITY_HINT_BASE_CLASSES = "text-sm break-words whitespace-pre-line"
+_CONNECTIVITY_HINT_IDLE = f"{_CONNECTIVITY_HINT_BASE_CLASSES} text-gray-500"
+_CONNECTIVITY_HINT_OK = f"{_CONNECTIVITY_HINT_BASE_CLASSES} text-emerald-600"
+_CONNECTIVITY_HINT_BAD = f"{_CONNECTIVITY_HINT_BASE_CLASSES} text-rose-600"
+# Header (icon, label) classes keyed by API reachability.
+_API_STATUS_CLASSES: Dict[bool, tuple[str, str]] = {
+    True: ("text-xl text-emerald-500", "font-medium text-emerald-500"),
+    False: ("text-xl text-red-500", "font-medium text-red-500"),
+}
+# Quasar delays model updates for text inputs by this many milliseconds so a
+# burst of keystrokes reaches the server as a single value change.
+_TEXT_INPUT_DEBOUNCE_MS = 200
 
 
 def _schedule_async(factory: Callable[[], Coroutine[Any, Any, Any]]) -> None:
@@ -42,7 +77,107 @@ def _schedule_async(factory: Callable[[], Coroutine[Any, Any, Any]]) -> None:
     ui.timer(0, lambda: asyncio.create_task(factory()), once=True)
 
 
+class _PollTask:
+    """A periodic refresh dispatched by a shared :class:`_Poller`.
+
+    Exposes the same ``active`` flag as ``ui.timer`` so panels can pause it.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        callback: Callable[[], Coroutine[Any, Any, Any]],
+        active: bool,
+    ) -> None:
+        self.base_interval = interval
+        self.interval = interval
+        self.callback = callback
+        self._active = active
+        self._last_result: Any = None
+        self._unchanged = 0
+        self._failures = 0
+        self.next_due = time.monotonic() + interval
+
+    def note_result(self, result: Any, *, max_multiplier: int = 6) -> None:
+        """Stretch the interval while ``result`` repeats; snap back on change.
+
+        The interval doubles per unchanged poll, capped at ``max_multiplier``
+        times the base interval.
+        """
+        self._failures = 0
+        if result == self._last_result:
+            self._unchanged += 1
+            self.interval = self.base_interval * min(max_multiplier, 2**self._unchanged)
+            return
+        self._last_result = result
+        self.reset_backoff()
+
+    def note_failure(self, max_interval: float) -> None:
+        """Double the interval per consecutive failure, up to ``max_interval``."""
+        self._failures += 1
+        self.interval = min(
+            max_interval, self.base_interval * 2 ** (self._failures - 1)
+        )
+
+    def reset_backoff(self) -> None:
+        self._unchanged = 0
+        self._failures = 0
+        if self.interval != self.base_interval:
+            self.interval = self.base_interval
+            self.next_due = min(self.next_due, time.monotonic() + self.interval)
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @active.setter
+    def active(self, value: bool) -> None:
+        if value and not self._active:
+            self.reset_backoff()
+            self.next_due = time.monotonic() + self.interval
+        self._active = value
+
+
+class _Poller:
+    """Drive every periodic refresh on a page from one coarse NiceGUI timer."""
+
+    def __init__(self, granularity: float = 1.0) -> None:
+        self._tasks: List[_PollTask] = []
+        self._timer = ui.timer(granularity, self._tick, immediate=False)
+
+    def every(
+        self,
+        interval: float,
+        callback: Callable[[], Coroutine[Any, Any, Any]],
+        *,
+        active: bool = True,
+    ) -> _PollTask:
+        task = _PollTask(interval, callback, active)
+        self._tasks.append(task)
+        return task
+
+    @property
+    def active(self) -> bool:
+        return self._timer.active
+
+    @active.setter
+    def active(self, value: bool) -> None:
+        # Overdue tasks fire on the first tick after resuming, which doubles as
+        # a catch-up refresh for anything that went stale while paused.
+        self._timer.active = value
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        for task in self._tasks:
+            if task.active and now >= task.next_due:
+                task.next_due = now + task.interval
+                asyncio.create_task(task.callback())
+
+
 logger = logging.getLogger(__name__)
+# Connectivity listeners may be plain callbacks or coroutine functions, which
+# the probe awaits concurrently with the other listeners.
+_ConnectivityListener = Callable[[bool], Optional[Coroutine[Any, Any, None]]]
 _PV_UI_DEBUG_REFRESH = bool(os.getenv("PV_UI_DEBUG_REFRESH"))
 _LAST_TEXT_VALUES: Dict[str, str] = {}
 
@@ -60,11 +195,15 @@ def _set_text_if_changed(el: Any, value: str) -> None:
     """Set element text only when it changes to avoid UI flicker from timer refresh loops."""
 
     def _normalize_key(element: Any) -> str:
-        return getattr(
-            element,
-            "_pv_text_key",
-            f"{type(element).__name__}@{id(element)}:text",
-        )
+        key = getattr(element, "_pv_text_key", None)
+        if key is None:
+            # Build the fallback key once per element instead of on every tick.
+            key = f"{type(element).__name__}@{id(element)}:text"
+            try:
+                setattr(element, "_pv_text_key", key)
+            except Exception:  # pragma: no cover - defensive
+                pass
+        return key
 
     key = _normalize_key(el)
     previous = _LAST_TEXT_VALUES.get(key)
@@ -133,6 +272,57 @@ def _set_classes_if_changed(el: Any, classes: str) -> None:
     el.classes(classes)
 
 
+async def _spool_upload(file: Any) -> Path:
+    """Copy a browser upload into a private temp file and return its path."""
+    fd, temp_name = tempfile.mkstemp(prefix="pv-ui-upload-", suffix=".md")
+    os.close(fd)
+    spool_path = Path(temp_name)
+    try:
+        await file.save(spool_path)
+    except BaseException:
+        spool_path.unlink(missing_ok=True)
+        raise
+    return spool_path
+
+
+def _is_accepted_upload(name: str) -> bool:
+    """Whether ``name`` carries an accepted extension (a bare ``md`` does not)."""
+    return name.lower().endswith(_ACCEPTED_UPLOAD_SUFFIXES)
+
+
+def _discard_uploads(uploads: Dict[str, UploadFilePayload]) -> None:
+    """Forget pending uploads and delete any temp files backing them."""
+    for upload in uploads.values():
+        if upload.path is not None:
+            upload.path.unlink(missing_ok=True)
+    uploads.clear()
+
+
+_UPLOAD_RESULTS_HEADER = (
+    "### Upload results\n| Filename | Job ID | Details |\n| --- | --- | --- |\n"
+)
+
+
+def _format_upload_result_row(filename: str, job: Dict[str, Any], jobs_url: str) -> str:
+    job_id = job.get("job_id") or "unknown"
+    return f"| {filename} | {job_id} | [View job]({jobs_url}/{job_id}) |\n"
+
+
+_ORJSON_EXACT_TYPES = (str, int, bool)
+
+
+def _json_cell(value: Any) -> str:
+    """Render a job field for the detail metadata table."""
+    # orjson only matches json.dumps for these; its containers are compact and
+    # its floats are spelled differently, so those keep the stdlib rendering.
+    if orjson is not None and (value is None or type(value) in _ORJSON_EXACT_TYPES):
+        try:
+            return orjson.dumps(value).decode()
+        except orjson.JSONEncodeError:  # e.g. ints beyond 64 bits
+            pass
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
 def _style_card(title: str, body: str) -> None:
     ui.label(title).classes("font-semibold text-base")
     ui.label(body).classes("text-sm text-gray-600")
@@ -141,6 +331,13 @@ def _style_card(title: str, body: str) -> None:
 def _parse_iso_timestamp(value: Any) -> Optional[datetime]:
     if not value or not isinstance(value, str):
         return None
+    return _parse_iso_text(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_text(value: str) -> Optional[datetime]:
+    # Sorting and cell formatting parse the same job timestamps several times
+    # per refresh; the strings are immutable, so parse each one once.
     text = value.strip()
     if not text:
         return None
@@ -156,13 +353,29 @@ def _parse_iso_timestamp(value: Any) -> Optional[datetime]:
 
 
 def _format_timestamp(value: Any) -> Optional[str]:
-    parsed = _parse_iso_timestamp(value)
+    if not value or not isinstance(value, str):
+        return None
+    return _format_iso_text(value)
+
+
+@lru_cache(maxsize=4096)
+def _format_iso_text(value: str) -> Optional[str]:
+    parsed = _parse_iso_text(value)
     if parsed is None:
         return None
     return parsed.strftime("%Y-%m-%d %H:%M:%S UTC")
 
 
 def _format_timestamp_label(label: str, value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    return _format_timestamp_label_cached(label, value)
+
+
+@lru_cache(maxsize=512)
+def _format_timestamp_label_cached(label: str, value: str) -> Optional[str]:
+    # Heartbeats and creation times repeat across refresh ticks until a job
+    # advances, so parse/format each (label, timestamp) pair only once.
     formatted = _format_timestamp(value)
     if not formatted:
         return None
@@ -194,12 +407,31 @@ def _normalize_state(state: str | None) -> str:
     return lowered
 
 
-def _format_state_badge(state: str, stalled: bool) -> tuple[str, str]:
+def _build_state_badge(state: str, stalled: bool, size: str) -> tuple[str, str]:
     text = state.capitalize()
     if state == "running" and stalled:
         text = "Running (stalled)"
-    classes = _STATE_BADGE_STYLES.get(state, _STATE_BADGE_STYLES["unknown"])
-    return text, classes
+    colours = _STATE_BADGE_STYLES.get(state, _STATE_BADGE_STYLES["unknown"])
+    return text, f"px-3 py-1 {size} font-semibold rounded-full {colours}"
+
+
+# Every known (state, stalled, size) badge, fully rendered once at import.
+_BADGE_CACHE: Dict[tuple[str, bool, str], tuple[str, str]] = {
+    (state, stalled, size): _build_state_badge(state, stalled, size)
+    for state in _STATE_BADGE_STYLES
+    for stalled in (False, True)
+    for size in ("text-sm", "text-xs")
+}
+
+
+def _format_state_badge(
+    state: str, stalled: bool, size: str = "text-sm"
+) -> tuple[str, str]:
+    """Return the badge text and its complete class string."""
+    badge = _BADGE_CACHE.get((state, stalled, size))
+    if badge is None:
+        badge = _build_state_badge(state, stalled, size)
+    return badge
 
 
 def _repo_display(job: Dict[str, Any]) -> str:
@@ -225,56 +457,137 @@ def _format_time_cell(job: Dict[str, Any]) -> str:
     return " • ".join(pieces) if pieces else "—"
 
 
-def _format_heartbeat_cell(job: Dict[str, Any]) -> str:
+def _format_heartbeat_cell(job: Dict[str, Any], now: datetime) -> str:
     if job.get("stalled"):
         return "⚠ Stalled"
     heartbeat = _parse_iso_timestamp(job.get("heartbeat_at"))
     if heartbeat:
-        delta = datetime.utcnow() - heartbeat
+        delta = now - heartbeat
         return f"HB {_format_relative_age(delta)} ago"
     return "—"
 
 
+_SORT_FALLBACK_FIELDS = ("started_at", "updated_at", "heartbeat_at")
+_SORT_KEY_EPOCH = datetime.utcfromtimestamp(0)
+
+
 def _sort_key_for_job(job: Dict[str, Any]) -> datetime:
-    for field in ("created_at", "started_at", "updated_at", "heartbeat_at"):
+    # Nearly every job carries created_at, so try it before the fallbacks.
+    parsed = _parse_iso_timestamp(job.get("created_at"))
+    if parsed is not None:
+        return parsed
+    for field in _SORT_FALLBACK_FIELDS:
         parsed = _parse_iso_timestamp(job.get(field))
         if parsed is not None:
             return parsed
-    return datetime.utcfromtimestamp(0)
+    return _SORT_KEY_EPOCH
+
+
+def _sort_jobs(jobs: List[Dict[str, Any]], *, descending: bool) -> List[Dict[str, Any]]:
+    # sorted() already decorates: the key runs once per job, not per comparison,
+    # and reverse=True keeps equal keys in their original (stable) order.
+    return sorted(jobs, key=_sort_key_for_job, reverse=descending)
+
+
+def _build_job_row(job: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    state_norm = _normalize_state(job.get("state"))
+    state_display = state_norm.capitalize()
+    if state_norm == "running" and job.get("stalled"):
+        state_display = "Running (stalled)"
+    is_terminal = state_norm in TERMINAL_STATES
+    exit_code = job.get("exit_code")
+    return {
+        "job_id": job.get("job_id") or "—",
+        "repo": _repo_display(job),
+        "branch": job.get("branch_name") or "—",
+        "state": state_display,
+        "time": _format_time_cell(job),
+        "heartbeat": _format_heartbeat_cell(job, now),
+        "exit_code": (str(exit_code) if is_terminal and exit_code is not None else "—"),
+    }
 
 
 def _build_job_rows(
     jobs: List[Dict[str, Any]], *, descending: bool
 ) -> List[Dict[str, Any]]:
-    sorted_jobs = sorted(jobs, key=_sort_key_for_job, reverse=descending)
-    rows: List[Dict[str, Any]] = []
-    for job in sorted_jobs:
-        state_norm = _normalize_state(job.get("state"))
-        state_display = state_norm.capitalize()
-        if state_norm == "running" and job.get("stalled"):
-            state_display = "Running (stalled)"
-        is_terminal = state_norm in TERMINAL_STATES
-        exit_code = job.get("exit_code")
-        rows.append(
-            {
-                "job_id": job.get("job_id") or "—",
-                "repo": _repo_display(job),
-                "branch": job.get("branch_name") or "—",
-                "state": state_display,
-                "time": _format_time_cell(job),
-                "heartbeat": _format_heartbeat_cell(job),
-                "exit_code": (
-                    str(exit_code) if is_terminal and exit_code is not None else "—"
-                ),
-            }
-        )
-    return rows
+    # One clock read per render keeps every heartbeat age on the same baseline.
+    now = datetime.utcnow()
+    return [_build_job_row(job, now) for job in _sort_jobs(jobs, descending=descending)]
+
+
+# Job fields that feed a rendered row; equal values mean equal rows apart from
+# the heartbeat age, which depends on the clock.
+_JOB_ROW_SOURCE_FIELDS = (
+    "job_id",
+    "git_owner",
+    "repo_name",
+    "branch_name",
+    "state",
+    "stalled",
+    "created_at",
+    "started_at",
+    "updated_at",
+    "heartbeat_at",
+    "exit_code",
+)
+
+
+def _jobs_fingerprint(jobs: List[Dict[str, Any]], descending: bool) -> tuple[Any, ...]:
+    return (
+        descending,
+        tuple(
+            tuple(job.get(field) for field in _JOB_ROW_SOURCE_FIELDS) for job in jobs
+        ),
+    )
+
+
+def _job_rows_signature(rows: List[Dict[str, Any]]) -> tuple[tuple[Any, ...], ...]:
+    """Return a hashable snapshot of rendered rows, preserving their order."""
+    return tuple(tuple(row.values()) for row in rows)
 
 
-def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -> None:
+def _merge_job_rows(current: List[Dict[str, Any]], rows: List[Dict[str, Any]]) -> None:
+    """Make ``current`` match ``rows`` in place, keyed by ``job_id``.
+
+    Rows for jobs that are still listed keep their dict and only have changed
+    fields rewritten; new jobs are inserted and vanished ones dropped.
+    """
+    previous: Dict[Any, Dict[str, Any]] = {}
+    for row in current:
+        previous.setdefault(row.get("job_id"), row)
+    merged: List[Dict[str, Any]] = []
+    for new in rows:
+        old = previous.pop(new["job_id"], None)
+        if old is None:
+            # Copy so later in-place patches never alias the caller's rows.
+            merged.append(dict(new))
+            continue
+        for field, value in new.items():
+            if old.get(field) != value:
+                old[field] = value
+        merged.append(old)
+    current[:] = merged
+
+
+def _build_dashboard_panel(
+    settings: UISettings,
+    client: PromptValetAPIClient,
+    poller: _Poller,
+    register_connectivity_listener: Callable[[Callable[[bool], None]], None],
+    register_visibility_listener: Callable[[Callable[[bool], None]], None],
+) -> None:
     jobs_data: List[Dict[str, Any]] = []
     sort_descending = True
     refresh_in_progress = False
+    api_reachable = False
+    rendered_rows_signature: tuple[tuple[Any, ...], ...] | None = None
+    built_fingerprint: tuple[Any, ...] | None = None
+    built_sorted_jobs: List[Dict[str, Any]] = []
+    built_rows: List[Dict[str, Any]] = []
+    # Rows are paged here and only the visible page is sent to the browser;
+    # a page size of 0 means "All" in the Quasar pagination control.
+    jobs_page = 1
+    jobs_page_size = _JOBS_PAGE_SIZE
 
     detail_dialog: Optional[Any] = None
     detail_dialog_open = False
@@ -289,6 +602,8 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
     detail_metadata_table: Optional[Any] = None
 
     jobs_table: Optional[Any] = None
+    jobs_timer: Optional[_PollTask] = None
+    panel_visible = True
     refresh_button: Optional[Any] = None
     sort_button: Optional[Any] = None
     jobs_error_label: Optional[Any] = None
@@ -313,17 +628,72 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
     abort_in_progress = False
 
     def _update_jobs_table() -> None:
+        nonlocal rendered_rows_signature, built_fingerprint
+        nonlocal built_sorted_jobs, built_rows, jobs_page
         if jobs_table is None:
             return
-        rows = _build_job_rows(jobs_data, descending=sort_descending)
-        jobs_table.rows = rows
+        now = datetime.utcnow()
+        fingerprint = _jobs_fingerprint(jobs_data, sort_descending)
+        rebuilt = fingerprint != built_fingerprint
+        if rebuilt:
+            built_fingerprint = fingerprint
+            built_sorted_jobs = _sort_jobs(jobs_data, descending=sort_descending)
+            built_rows = [_build_job_row(job, now) for job in built_sorted_jobs]
+        total = len(built_rows)
+        if jobs_page_size:
+            last_page = max(1, -(-total // jobs_page_size))
+            jobs_page = min(jobs_page, last_page)
+            start = (jobs_page - 1) * jobs_page_size
+            end = start + jobs_page_size
+        else:
+            start, end = 0, total
+        if rebuilt:
+            rows = built_rows[start:end]
+        else:
+            # Same jobs as last time: skip sorting and cell formatting and only
+            # advance the clock-relative heartbeat ages on the visible page.
+            rows = [
+                {**row, "heartbeat": _format_heartbeat_cell(job, now)}
+                for row, job in zip(built_rows[start:end], built_sorted_jobs[start:end])
+            ]
+        pagination = {
+            "page": jobs_page,
+            "rowsPerPage": jobs_page_size,
+            "rowsNumber": total,
+        }
+        if jobs_table.pagination != pagination:
+            jobs_table.pagination = pagination
+        signature = _job_rows_signature(rows)
+        if signature != rendered_rows_signature:
+            # Only push rows over the websocket when the rendered content changed.
+            rendered_rows_signature = signature
+            _merge_job_rows(jobs_table.rows, rows)
+            jobs_table.update()
         if jobs_empty_label is not None:
-            _set_visibility_if_changed(jobs_empty_label, not bool(rows))
+            _set_visibility_if_changed(jobs_empty_label, not total)
+
+    def _handle_jobs_page_request(event: Any) -> None:
+        nonlocal jobs_page, jobs_page_size
+        args = event.args if isinstance(event.args, dict) else {}
+        requested = args.get("pagination") or {}
+        jobs_page = max(1, int(requested.get("page") or 1))
+        jobs_page_size = max(0, int(requested.get("rowsPerPage") or 0))
+        _update_jobs_table()
 
     async def _refresh_jobs() -> None:
         nonlocal refresh_in_progress, jobs_data
         if refresh_in_progress:
             return
+        if not api_reachable:
+            # The request would only wait out its timeout; the connectivity
+            # listener refreshes as soon as the API answers again.
+            if jobs_error_label is not None:
+                _set_text_if_changed(
+                    jobs_error_label,
+                    "API unreachable; jobs will refresh once it is back.",
+                )
+                _set_visibility_if_changed(jobs_error_label, True)
+            return
         refresh_in_progress = True
         if refresh_button is not None:
             refresh_button.disabled = True
@@ -331,10 +701,27 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
             _set_visibility_if_changed(jobs_loading_label, True)
         try:
             jobs_data = await client.list_jobs()
+            if jobs_timer is not None:
+                # Back off while nothing moves; any state or heartbeat change
+                # restores the base polling rate.
+                jobs_timer.note_result(
+                    hash(
+                        tuple(
+                            (
+                                job.get("job_id"),
+                                job.get("state"),
+                                job.get("heartbeat_at"),
+                            )
+                            for job in jobs_data
+                        )
+                    )
+                )
             if jobs_error_label is not None:
                 _set_visibility_if_changed(jobs_error_label, False)
             _update_jobs_table()
         except Exception as exc:  # noqa: BLE001
+            if jobs_timer is not None:
+                jobs_timer.note_failure(60.0)
             if jobs_error_label is not None:
                 _set_text_if_changed(jobs_error_label, f"Failed to load jobs: {exc}")
                 _set_visibility_if_changed(jobs_error_label, True)
@@ -345,6 +732,31 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
             if jobs_loading_label is not None:
                 _set_visibility_if_changed(jobs_loading_label, False)
 
+    def _sync_jobs_polling() -> None:
+        if jobs_timer is None:
+            return
+        polling = panel_visible and not detail_dialog_open
+        if polling and not jobs_timer.active:
+            # Catch up immediately on whatever changed while polling was paused.
+            _schedule_async(_refresh_jobs)
+        jobs_timer.active = polling
+
+    def _on_connectivity_change(reachable: bool) -> None:
+        nonlocal api_reachable
+        regained = reachable and not api_reachable
+        api_reachable = reachable
+        if regained:
+            _schedule_async(_refresh_jobs)
+
+    def _on_panel_visibility(visible: bool) -> None:
+        nonlocal panel_visible
+        panel_visible = visible
+        _sync_jobs_polling()
+        if not visible and live_stream_task is not None:
+            # Closing the dialog stops the stream from its own handlers; this
+            # covers the page or tab going to the background while it is open.
+            _stop_live_stream("Live logs paused (page hidden)")
+
     def _toggle_sort() -> None:
         nonlocal sort_descending
         sort_descending = not sort_descending
@@ -594,10 +1006,7 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
         current_job_state_lower = state_norm
         badge_text, badge_classes = _format_state_badge(state_norm, stalled_flag)
         _set_text_if_changed(detail_state_badge, badge_text)
-        _set_classes_if_changed(
-            detail_state_badge,
-            f"px-3 py-1 text-sm font-semibold rounded-full {badge_classes}",
-        )
+        _set_classes_if_changed(detail_state_badge, badge_classes)
         if detail_stalled_label is not None:
             if stalled_flag:
                 _set_text_if_changed(detail_stalled_label, "Stalled")
@@ -616,25 +1025,16 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
             else:
                 _set_text_if_changed(detail_age_label, "Age: —")
         for field, label in detail_timestamp_labels.items():
-            label_text = _format_timestamp_label(
-                field.replace("_", " ").title(), job.get(field)
-            )
+            label_text = _format_timestamp_label(_FIELD_PRETTY[field], job.get(field))
             if label_text:
                 _set_text_if_changed(label, label_text)
                 _set_visibility_if_changed(label, True)
             else:
                 _set_visibility_if_changed(label, False)
         if detail_metadata_table is not None:
-            rows: List[Dict[str, str]] = []
-            for key in sorted(job.keys()):
-                value = job[key]
-                rows.append(
-                    {
-                        "field": key,
-                        "value": json.dumps(value, ensure_ascii=False, default=str),
-                    }
-                )
-            detail_metadata_table.rows = rows
+            detail_metadata_table.rows = [
+                {"field": key, "value": _json_cell(job[key])} for key in sorted(job)
+            ]
         _update_abort_button_state(current_job_state_lower)
 
     async def _show_job_detail(job_id: str) -> None:
@@ -648,6 +1048,7 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
         if detail_loading_label is not None:
             _set_visibility_if_changed(detail_loading_label, True)
         detail_dialog_open = True
+        _sync_jobs_polling()
         detail_dialog.open()
         try:
             job = await client.get_job_detail(job_id)
@@ -678,6 +1079,7 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
     def _handle_detail_close() -> None:
         nonlocal detail_dialog_open
         detail_dialog_open = False
+        _sync_jobs_polling()
         _stop_live_stream("Live logs paused")
         if detail_dialog is not None:
             detail_dialog.close()
@@ -685,6 +1087,7 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
     def _handle_detail_dialog_closed(_: Any) -> None:
         nonlocal detail_dialog_open
         detail_dialog_open = False
+        _sync_jobs_polling()
         _stop_live_stream("Live logs paused")
 
     detail_dialog = ui.dialog()
@@ -845,40 +1248,44 @@ def _build_dashboard_panel(settings: UISettings, client: PromptValetAPIClient) -
                     },
                 ],
                 row_key="job_id",
-                pagination=None,
+                pagination={
+                    "page": jobs_page,
+                    "rowsPerPage": jobs_page_size,
+                    "rowsNumber": 0,
+                },
                 selection="single",
             ).classes("min-w-[660px]")
         jobs_table.on_select(_handle_job_selection)
+        jobs_table.on("request", _handle_jobs_page_request)
         jobs_empty_label = ui.label("No jobs yet. Check back later.").classes(
             "text-sm text-gray-500"
         )
         _set_visibility_if_changed(jobs_empty_label, False)
 
-    def _stop_live_stream_when_hidden() -> None:
-        nonlocal detail_dialog_open, live_stream_task
-        if detail_dialog_open:
-            return
-        if live_stream_task is None:
-            return
-        _stop_live_stream("Live logs paused (dialog hidden)")
-
-    _schedule_async(_refresh_jobs)
-    ui.timer(2.0, _refresh_jobs, immediate=False)
-    ui.timer(5, _stop_live_stream_when_hidden)
+    jobs_timer = poller.every(2.0, _refresh_jobs)
+    # The first load runs from the listener once the API is known reachable.
+    register_connectivity_listener(_on_connectivity_change)
+    register_visibility_listener(_on_panel_visibility)
 
 
 def _build_submit_panel(
     settings: UISettings,
     client: PromptValetAPIClient,
+    poller: _Poller,
     register_connectivity_listener: Callable[[Callable[[bool], None]], None],
+    register_visibility_listener: Callable[[Callable[[bool], None]], None],
     test_context: Dict[str, Any] | None = None,
 ) -> None:
     targets_by_repo: Dict[str, List[str]] = {}
     selected_repo: str | None = None
     selected_branch: str | None = None
-    selected_uploads: List[UploadFilePayload] = []
+    # Keyed by filename so re-selecting a file replaces it instead of duplicating.
+    selected_uploads: Dict[str, UploadFilePayload] = {}
     select_events_suppressed = False
     api_reachable = False
+    targets_refresh_in_progress = False
+    targets_signature: tuple[tuple[Any, Any], ...] | None = None
+    targets_timer: _PollTask | None = None
 
     with ui.card().classes("w-full"):
         ui.label("Target selection").classes("text-lg font-semibold")
@@ -907,13 +1314,21 @@ def _build_submit_panel(
         ui.label(
             "Write Markdown, optionally name the file, and let the API drop it into the inbox."
         ).classes("text-sm text-gray-500 mb-2")
-        compose_textarea = ui.textarea(
-            value="",
-            label="Markdown prompt",
-        ).classes("w-full")
-        filename_input = ui.input(
-            label="Optional filename (e.g. greet.prompt.md)",
-        ).classes("w-full mt-2")
+        compose_textarea = (
+            ui.textarea(
+                value="",
+                label="Markdown prompt",
+            )
+            .props(f"debounce={_TEXT_INPUT_DEBOUNCE_MS}")
+            .classes("w-full")
+        )
+        filename_input = (
+            ui.input(
+                label="Optional filename (e.g. greet.prompt.md)",
+            )
+            .props(f"debounce={_TEXT_INPUT_DEBOUNCE_MS}")
+            .classes("w-full mt-2")
+        )
         compose_error_label = ui.label("").classes("text-sm text-red-600 mt-2")
         _set_visibility_if_changed(compose_error_label, False)
         with ui.row().classes(
@@ -949,8 +1364,16 @@ def _build_submit_panel(
         upload_submit_button.disabled = True
 
     def _update_compose_button_enabled() -> None:
-        ready_text = bool(compose_textarea.value and compose_textarea.value.strip())
-        ready = bool(api_reachable and selected_repo and selected_branch and ready_text)
+        # Check the cheap flags first and test the prompt with isspace() so the
+        # (possibly large) Markdown body is not copied by strip() on every call.
+        text = compose_textarea.value
+        ready = bool(
+            api_reachable
+            and selected_repo
+            and selected_branch
+            and text
+            and not text.isspace()
+        )
         compose_submit_button.disabled = not ready
 
     def _update_selected_files_label() -> None:
@@ -1017,14 +1440,16 @@ def _build_submit_panel(
 
         _execute_with_select_suppressed(update)
 
-    async def _refresh_targets() -> None:
+    async def _reload_targets() -> None:
         nonlocal selected_repo, selected_branch, targets_by_repo
+        nonlocal targets_signature
         _set_visibility_if_changed(target_error_label, False)
         repo_select.disabled = True
         branch_select.disabled = True
         try:
             discovered = await client.list_targets()
         except Exception as exc:  # noqa: BLE001
+            targets_signature = None
             targets_by_repo.clear()
             _refresh_repo_options([])
             _refresh_branch_options_for_repo(selected_repo)
@@ -1036,6 +1461,7 @@ def _build_submit_panel(
             return
 
         if not discovered:
+            targets_signature = None
             targets_by_repo.clear()
             _refresh_repo_options([])
             _refresh_branch_options_for_repo(selected_repo)
@@ -1045,6 +1471,20 @@ def _build_submit_panel(
             _update_upload_button_enabled()
             return
 
+        signature = tuple(
+            (target.get("full_repo") or target.get("repo"), target.get("branch"))
+            for target in discovered
+        )
+        if signature == targets_signature:
+            # Same targets as last time: keep the sorted options and selection,
+            # only undo the loading state applied above.
+            repo_select.disabled = not bool(targets_by_repo)
+            branch_select.disabled = not bool(targets_by_repo.get(selected_repo or ""))
+            _update_compose_button_enabled()
+            _update_upload_button_enabled()
+            return
+        targets_signature = signature
+
         new_map: Dict[str, List[str]] = {}
         for target in discovered:
             display_repo = target.get("full_repo") or target.get("repo") or ""
@@ -1068,6 +1508,16 @@ def _build_submit_panel(
         _update_compose_button_enabled()
         _update_upload_button_enabled()
 
+    async def _refresh_targets() -> None:
+        nonlocal targets_refresh_in_progress
+        if targets_refresh_in_progress:
+            return
+        targets_refresh_in_progress = True
+        try:
+            await _reload_targets()
+        finally:
+            targets_refresh_in_progress = False
+
     def _on_repo_change(event: Any) -> None:
         nonlocal selected_repo
         if select_events_suppressed:
@@ -1090,30 +1540,31 @@ def _build_submit_panel(
 
     async def _handle_file_selection(event: MultiUploadEventArguments) -> None:
         nonlocal selected_uploads
-        selected_uploads.clear()
+        _discard_uploads(selected_uploads)
         _set_visibility_if_changed(upload_error_label, False)
         for file in event.files:
             name = file.name
-            if not name or not name.lower().endswith(".md"):
+            if not name or not _is_accepted_upload(name):
                 _set_text_if_changed(
                     upload_error_label, "Only '.md' files are accepted."
                 )
                 _set_visibility_if_changed(upload_error_label, True)
                 continue
             try:
-                data = await file.read()
+                spool_path = await _spool_upload(file)
             except Exception as exc:  # noqa: BLE001
                 _set_text_if_changed(
                     upload_error_label, f"Failed to read {name}: {exc}"
                 )
                 _set_visibility_if_changed(upload_error_label, True)
                 continue
-            selected_uploads.append(
-                UploadFilePayload(
-                    filename=name,
-                    data=data,
-                    content_type=getattr(file, "content_type", None),
-                )
+            replaced = selected_uploads.get(name)
+            if replaced is not None and replaced.path is not None:
+                replaced.path.unlink(missing_ok=True)
+            selected_uploads[name] = UploadFilePayload(
+                filename=name,
+                path=spool_path,
+                content_type=getattr(file, "content_type", None),
             )
         _update_selected_files_label()
         _update_upload_button_enabled()
@@ -1165,26 +1616,27 @@ def _build_submit_panel(
             jobs = await client.upload_jobs(
                 selected_repo or "",
                 selected_branch or "",
-                selected_uploads,
+                selected_uploads.values(),
             )
         except Exception as exc:  # noqa: BLE001
             _set_text_if_changed(upload_error_label, f"Upload failed: {exc}")
             _set_visibility_if_changed(upload_error_label, True)
         else:
             if jobs:
-                lines = [
-                    "| Filename | Job ID | Details |",
-                    "| --- | --- | --- |",
-                ]
-                for payload, job in zip(selected_uploads, jobs):
-                    job_id = job.get("job_id") or "unknown"
-                    view_url = f"{settings.api_base_url}/jobs/{job_id}"
-                    lines.append(
-                        f"| {payload.filename} | {job_id} | [View job]({view_url}) |"
-                    )
+                jobs_url = f"{settings.api_base_url}/jobs"
                 _set_text_if_changed(
                     upload_results_markdown,
-                    "### Upload results\n" + "\n".join(lines),
+                    "".join(
+                        [
+                            _UPLOAD_RESULTS_HEADER,
+                            *(
+                                _format_upload_result_row(
+                                    payload.filename, job, jobs_url
+                                )
+                                for payload, job in zip(selected_uploads.values(), jobs)
+                            ),
+                        ]
+                    ),
                 )
                 _set_visibility_if_changed(upload_results_markdown, True)
             else:
@@ -1194,12 +1646,12 @@ def _build_submit_panel(
                 )
                 _set_visibility_if_changed(upload_results_markdown, True)
         finally:
-            selected_uploads.clear()
+            _discard_uploads(selected_uploads)
             upload_control.reset()
             _update_selected_files_label()
         _update_upload_button_enabled()
 
-    compose_textarea.on("input", lambda _: _update_compose_button_enabled())
+    compose_textarea.on_value_change(lambda _: _update_compose_button_enabled())
     repo_select.on("update:model-value", _on_repo_change)
     branch_select.on("update:model-value", _on_branch_change)
     upload_control.on_multi_upload(_handle_file_selection)
@@ -1219,6 +1671,13 @@ def _build_submit_panel(
         _update_compose_button_enabled()
         _update_upload_button_enabled()
 
+    def _on_panel_visibility(visible: bool) -> None:
+        if targets_timer is None:
+            return
+        if visible and not targets_timer.active:
+            _schedule_async(_refresh_targets)
+        targets_timer.active = visible
+
     register_connectivity_listener(_set_connectivity)
     if test_context is not None:
         submit_panel_hooks = test_context.setdefault("submit_panel", {})
@@ -1232,12 +1691,92 @@ def _build_submit_panel(
         submit_panel_hooks["get_selection"] = _get_selection
 
     _schedule_async(_refresh_targets)
-    ui.timer(2.0, _refresh_targets, immediate=False)
+    # Inbox targets only change when the tree builder runs, so poll slowly; the
+    # "Reload targets" button and the catch-up refresh on tab switch cover the rest.
+    targets_timer = poller.every(30.0, _refresh_targets)
+    register_visibility_listener(_on_panel_visibility)
+
+
+class _WatcherCardFields(NamedTuple):
+    state: str
+    stalled: bool
+    status_text: str
+    heartbeat_text: str
+    message: str
+    detail: str
+
+
+class _TreeCardFields(NamedTuple):
+    state: str
+    message: str
+    detail: str
+    count_text: str
+
+
+def _watcher_card_fields(
+    status_payload: dict[str, Any],
+    running_job: dict[str, Any] | None,
+    last_job: dict[str, Any] | None,
+) -> _WatcherCardFields:
+    """Derive every watcher card string so unchanged refreshes skip the DOM."""
+    jobs_section = status_payload.get("jobs") or {}
+    counts = jobs_section.get("counts") or {}
+    running_total = int(counts.get("running") or 0)
+    stalled_running = int(jobs_section.get("stalled_running") or 0)
+    total_runs = int(jobs_section.get("total") or 0)
+    runs_root_exists = status_payload.get("roots", {}).get("runs_root_exists", False)
+    detail_state = running_job or last_job
+    detail_state_value = detail_state.get("state") if detail_state else None
+    status_text = detail_state_value or status_payload.get("status", "ok")
+    heartbeat_value = detail_state.get("heartbeat_at") if detail_state else None
+    heartbeat_label = _format_timestamp_label("Last heartbeat", heartbeat_value)
+    if not runs_root_exists:
+        message = "Runs root missing; watcher cannot persist metadata."
+    elif stalled_running:
+        message = f"{stalled_running} stalled run(s)"
+    elif running_total:
+        message = f"{running_total} running run(s)"
+    elif total_runs:
+        message = "No active runs right now."
+    else:
+        message = "No runs recorded yet."
+    runs_root = status_payload.get("config", {}).get("runs_root") or "unknown"
+    return _WatcherCardFields(
+        state=_normalize_state(detail_state_value),
+        stalled=stalled_running > 0 or bool((running_job or {}).get("stalled")),
+        status_text=status_text.capitalize(),
+        heartbeat_text=heartbeat_label or "Last heartbeat: —",
+        message=message,
+        detail=f"Runs root: {runs_root}",
+    )
+
+
+def _tree_card_fields(status_payload: dict[str, Any], listed: int) -> _TreeCardFields:
+    """Derive the TreeBuilder card strings; ``listed`` is the /targets length."""
+    roots = status_payload.get("roots") or {}
+    config = status_payload.get("config") or {}
+    summary = status_payload.get("targets") or {}
+    root_exists = bool(roots.get("tree_builder_root_exists"))
+    target_count = int(summary.get("count") or listed)
+    if not root_exists:
+        message = "Configured inbox root is missing; TreeBuilder cannot sync."
+    elif target_count:
+        message = f"{target_count} target(s) discovered"
+    else:
+        message = "Root exists but no targets discovered yet."
+    return _TreeCardFields(
+        state="running" if root_exists else "unknown",
+        message=message,
+        detail=f"Inbox root: {config.get('tree_builder_root') or 'unknown'}",
+        count_text=f"Targets: {target_count}",
+    )
 
 
 def _build_services_panel(
     client: PromptValetAPIClient,
-    register_connectivity_listener: Callable[[bool], None],
+    poller: _Poller,
+    register_connectivity_listener: Callable[[Callable[[bool], None]], None],
+    register_visibility_listener: Callable[[Callable[[bool], None]], None],
     test_context: Dict[str, Any] | None = None,
 ) -> None:
     ui.markdown("### Services overview")
@@ -1252,9 +1791,8 @@ def _build_services_panel(
     ).classes("w-full sm:w-auto")
     refresh_button.disabled = True
 
-    CONNECTIVITY_HINT_BASE_CLASSES = "text-sm break-words whitespace-pre-line"
     connectivity_hint_label = ui.label("Awaiting connectivity...").classes(
-        f"{CONNECTIVITY_HINT_BASE_CLASSES} text-gray-500"
+        _CONNECTIVITY_HINT_IDLE
     )
 
     watcher_error_label = ui.label("").classes("text-sm text-rose-600")
@@ -1320,120 +1858,87 @@ def _build_services_panel(
             tree_error_label
 
     services_refresh_in_progress = False
+    rendered_watcher_fields: _WatcherCardFields | None = None
+    rendered_tree_fields: _TreeCardFields | None = None
+    rendered_preview_key: tuple[tuple[Any, Any], ...] | None = None
     api_reachable = False
-    services_timer: Any | None = None
+    services_timer: _PollTask | None = None
     services_auto_refresh_enabled = False
+    services_panel_visible = True
     services_down_message_active = False
     SERVICE_DOWN_MESSAGE = (
         "Service not running\nStart backend services to populate this panel"
     )
 
+    def _sync_services_timer() -> None:
+        if services_timer is not None:
+            services_timer.active = (
+                services_auto_refresh_enabled and services_panel_visible
+            )
+
     def _enable_services_auto_refresh() -> None:
         nonlocal services_auto_refresh_enabled
         if services_timer is None or services_auto_refresh_enabled:
             return
         services_auto_refresh_enabled = True
-        services_timer.active = True
+        _sync_services_timer()
 
     def _disable_services_auto_refresh() -> None:
         nonlocal services_auto_refresh_enabled
         services_auto_refresh_enabled = False
-        if services_timer is not None:
-            services_timer.active = False
+        _sync_services_timer()
+
+    def _on_panel_visibility(visible: bool) -> None:
+        nonlocal services_panel_visible
+        resumed = visible and not services_panel_visible
+        services_panel_visible = visible
+        _sync_services_timer()
+        if resumed and services_auto_refresh_enabled:
+            _schedule_async(_refresh_services)
 
     def _set_badge(label: Any, state: str, stalled: bool) -> None:
-        text, classes = _format_state_badge(state, stalled)
+        text, classes = _format_state_badge(state, stalled, "text-xs")
         _set_text_if_changed(label, text)
-        _set_classes_if_changed(
-            label, f"px-3 py-1 text-xs font-semibold rounded-full {classes}"
-        )
-
-    def _target_display(target: dict[str, str | None]) -> str:
-        repo = target.get("full_repo") or target.get("repo") or "unknown"
-        branch = target.get("branch") or "—"
-        return f"{repo}:{branch}"
+        _set_classes_if_changed(label, classes)
 
     def _update_watcher_card(
         status_payload: dict[str, Any],
         running_job: dict[str, Any] | None,
         last_job: dict[str, Any] | None,
     ) -> None:
-        jobs_section = status_payload.get("jobs") or {}
-        counts = jobs_section.get("counts") or {}
-        running_total = int(counts.get("running") or 0)
-        stalled_running = int(jobs_section.get("stalled_running") or 0)
-        total_runs = int(jobs_section.get("total") or 0)
-        runs_root_exists = status_payload.get("roots", {}).get(
-            "runs_root_exists", False
-        )
-        detail_state = running_job or last_job
-        detail_state_value = detail_state.get("state") if detail_state else None
-        state_value = _normalize_state(detail_state_value)
-        _set_badge(
-            watcher_status_badge,
-            state_value,
-            stalled_running > 0 or bool((running_job or {}).get("stalled")),
-        )
-        status_text = detail_state_value or status_payload.get("status", "ok")
-        _set_text_if_changed(watcher_status_detail, status_text.capitalize())
-        heartbeat_value = (running_job or last_job) and (running_job or last_job).get(
-            "heartbeat_at"
-        )
-        heartbeat_label = _format_timestamp_label("Last heartbeat", heartbeat_value)
-        _set_text_if_changed(
-            watcher_heartbeat_label, heartbeat_label or "Last heartbeat: —"
-        )
-        if not runs_root_exists:
-            _set_text_if_changed(
-                watcher_message_label,
-                "Runs root missing; watcher cannot persist metadata.",
-            )
-        elif stalled_running:
-            _set_text_if_changed(
-                watcher_message_label, f"{stalled_running} stalled run(s)"
-            )
-        elif running_total:
-            _set_text_if_changed(
-                watcher_message_label, f"{running_total} running run(s)"
-            )
-        elif total_runs:
-            _set_text_if_changed(watcher_message_label, "No active runs right now.")
-        else:
-            _set_text_if_changed(watcher_message_label, "No runs recorded yet.")
-        runs_root = status_payload.get("config", {}).get("runs_root") or "unknown"
-        _set_text_if_changed(watcher_detail_label, f"Runs root: {runs_root}")
+        nonlocal rendered_watcher_fields
+        fields = _watcher_card_fields(status_payload, running_job, last_job)
+        if fields == rendered_watcher_fields:
+            return
+        rendered_watcher_fields = fields
+        _set_badge(watcher_status_badge, fields.state, fields.stalled)
+        _set_text_if_changed(watcher_status_detail, fields.status_text)
+        _set_text_if_changed(watcher_heartbeat_label, fields.heartbeat_text)
+        _set_text_if_changed(watcher_message_label, fields.message)
+        _set_text_if_changed(watcher_detail_label, fields.detail)
 
     def _update_tree_card(
         status_payload: dict[str, Any], targets: list[dict[str, str | None]]
     ) -> None:
-        roots = status_payload.get("roots") or {}
-        config = status_payload.get("config") or {}
-        summary = status_payload.get("targets") or {}
-        root_exists = bool(roots.get("tree_builder_root_exists"))
-        target_count = int(summary.get("count") or len(targets))
-        _set_badge(tree_status_badge, "running" if root_exists else "unknown", False)
-        if root_exists:
-            _set_text_if_changed(
-                tree_message_label,
-                (
-                    f"{target_count} target(s) discovered"
-                    if target_count
-                    else "Root exists but no targets discovered yet."
-                ),
-            )
-        else:
-            _set_text_if_changed(
-                tree_message_label,
-                "Configured inbox root is missing; TreeBuilder cannot sync.",
-            )
-        _set_text_if_changed(
-            tree_detail_label,
-            f"Inbox root: {config.get('tree_builder_root') or 'unknown'}",
+        nonlocal rendered_tree_fields, rendered_preview_key
+        fields = _tree_card_fields(status_payload, len(targets))
+        if fields != rendered_tree_fields:
+            rendered_tree_fields = fields
+            _set_badge(tree_status_badge, fields.state, False)
+            _set_text_if_changed(tree_message_label, fields.message)
+            _set_text_if_changed(tree_detail_label, fields.detail)
+            _set_text_if_changed(tree_target_count_label, fields.count_text)
+        preview_key = tuple(
+            (target.get("full_repo") or target.get("repo"), target.get("branch"))
+            for target in targets[:_SERVICE_TARGET_PREVIEW]
         )
-        _set_text_if_changed(tree_target_count_label, f"Targets: {target_count}")
-        if targets:
-            preview = targets[:_SERVICE_TARGET_PREVIEW]
-            list_text = "\n".join(f"- {_target_display(target)}" for target in preview)
+        if preview_key == rendered_preview_key:
+            return
+        rendered_preview_key = preview_key
+        if preview_key:
+            list_text = "\n".join(
+                f"- {repo or 'unknown'}:{branch or '—'}" for repo, branch in preview_key
+            )
             _set_text_if_changed(target_list_markdown, list_text)
         else:
             _set_text_if_changed(
@@ -1446,19 +1951,31 @@ def _build_services_panel(
             return
         services_refresh_in_progress = True
         refresh_button.disabled = True
-        _set_visibility_if_changed(watcher_error_label, False)
-        _set_visibility_if_changed(tree_error_label, False)
         refresh_success = False
         try:
-            status_payload = await client.get_status()
+            # The three endpoints are independent, so fetch them concurrently and
+            # route each failure to the card that depends on it. Every card
+            # mutation below runs after the last await, so NiceGUI's outbox ships
+            # the whole refresh as one batched update instead of hiding the error
+            # labels up front and re-showing them a round-trip later.
+            status_result, running_result, targets_result = await asyncio.gather(
+                client.get_status(),
+                client.list_jobs(state="running", limit=1),
+                client.list_targets(),
+                return_exceptions=True,
+            )
+            if isinstance(status_result, BaseException):
+                raise status_result
+            status_payload = status_result
             services_down_message_active = False
             running_job: dict[str, Any] | None = None
             last_job: dict[str, Any] | None = None
             job_error: str | None = None
             try:
-                running_jobs = await client.list_jobs(state="running", limit=1)
-                if running_jobs:
-                    running_job = running_jobs[0]
+                if isinstance(running_result, BaseException):
+                    raise running_result
+                if running_result:
+                    running_job = running_result[0]
                     last_job = running_job
                 else:
                     fallback_jobs = await client.list_jobs(limit=1)
@@ -1472,14 +1989,20 @@ def _build_services_panel(
                 _set_text_if_changed(watcher_error_label, job_error)
             targets: list[dict[str, str | None]] = []
             target_error: str | None = None
-            try:
-                targets = await client.list_targets()
-            except Exception as exc:  # noqa: BLE001
-                target_error = f"Failed to load targets: {exc}"
+            if isinstance(targets_result, BaseException):
+                target_error = f"Failed to load targets: {targets_result}"
+            else:
+                targets = targets_result
             _update_tree_card(status_payload, targets)
             _set_visibility_if_changed(tree_error_label, bool(target_error))
             if target_error:
                 _set_text_if_changed(tree_error_label, target_error)
+            if services_timer is not None:
+                # Poll a flaky backend less often; a clean refresh restores 2s.
+                if job_error or target_error:
+                    services_timer.note_failure(30.0)
+                else:
+                    services_timer.reset_backoff()
             refresh_success = True
         except Exception as exc:  # noqa: BLE001
             services_down_message_active = True
@@ -1490,7 +2013,7 @@ def _build_services_panel(
             _set_visibility_if_changed(tree_error_label, True)
             _set_classes_if_changed(
                 connectivity_hint_label,
-                f"{CONNECTIVITY_HINT_BASE_CLASSES} text-rose-600",
+                _CONNECTIVITY_HINT_BAD,
             )
             _set_text_if_changed(connectivity_hint_label, SERVICE_DOWN_MESSAGE)
             _disable_services_auto_refresh()
@@ -1505,7 +2028,7 @@ def _build_services_panel(
                 if now_label:
                     _set_classes_if_changed(
                         connectivity_hint_label,
-                        f"{CONNECTIVITY_HINT_BASE_CLASSES} text-gray-500",
+                        _CONNECTIVITY_HINT_IDLE,
                     )
                     _set_text_if_changed(connectivity_hint_label, now_label)
                 _enable_services_auto_refresh()
@@ -1527,42 +2050,88 @@ def _build_services_panel(
             _set_text_if_changed(connectivity_hint_label, "API reachable")
             _set_classes_if_changed(
                 connectivity_hint_label,
-                f"{CONNECTIVITY_HINT_BASE_CLASSES} text-emerald-600",
+                _CONNECTIVITY_HINT_OK,
             )
         else:
             _set_text_if_changed(connectivity_hint_label, "API unreachable")
             _set_classes_if_changed(
                 connectivity_hint_label,
-                f"{CONNECTIVITY_HINT_BASE_CLASSES} text-rose-600",
+                _CONNECTIVITY_HINT_BAD,
             )
             _disable_services_auto_refresh()
         if reachable and not previous_reachable:
             _schedule_async(_refresh_services)
 
-    services_timer = ui.timer(2.0, _refresh_services, active=False, immediate=False)
+    services_timer = poller.every(2.0, _refresh_services, active=False)
     if test_context is not None:
         services_panel_hooks = test_context.setdefault("services_panel", {})
         services_panel_hooks["connectivity_hint_label"] = connectivity_hint_label
         services_panel_hooks["watcher_status_detail"] = watcher_status_detail
         services_panel_hooks["refresh_services"] = _refresh_services
+    # The first refresh is scheduled by the listener once the API answers.
     register_connectivity_listener(_on_connectivity_change)
-    _schedule_async(_refresh_services)
+    register_visibility_listener(_on_panel_visibility)
 
 
 def create_ui_app(
     settings: UISettings | None = None,
     test_context: Dict[str, Any] | None = None,
 ) -> None:
-    settings = settings or UISettings.load()
+    settings = settings or get_ui_settings()
     client = PromptValetAPIClient(
         settings.api_base_url, timeout_seconds=settings.api_timeout_seconds
     )
-    connectivity_listeners: List[Callable[[bool], None]] = []
+    # Every panel polls through this one client so they share its connection pool.
+    # The builder runs once per page connection, so the pool is closed when that
+    # page goes away rather than piling up until the process exits.
+    ui.context.client.on_delete(client.aclose)
+    # Copy-on-write: registration swaps in a new tuple, so the probe can iterate
+    # the current snapshot even if a listener registers another one.
+    connectivity_listeners: tuple[_ConnectivityListener, ...] = ()
     api_connectivity_reachable = False
-
-    def register_connectivity_listener(listener: Callable[[bool], None]) -> None:
-        connectivity_listeners.append(listener)
-        listener(api_connectivity_reachable)
+    visibility_listeners: Dict[str, List[Callable[[bool], None]]] = {}
+    page_visible = True
+    active_tab = "Dashboard"
+    connectivity_timer: _PollTask | None = None
+    rendered_connectivity_status: tuple[str, bool] | None = None
+    unreachable_streak = 0
+
+    def register_connectivity_listener(listener: _ConnectivityListener) -> None:
+        nonlocal connectivity_listeners
+        connectivity_listeners = (*connectivity_listeners, listener)
+        result = listener(api_connectivity_reachable)
+        if result is not None:
+            _schedule_async(lambda: result)
+
+    def _visibility_registrar(
+        tab: str,
+    ) -> Callable[[Callable[[bool], None]], None]:
+        """Return a registrar that reports whether ``tab`` is currently on screen."""
+
+        def register(listener: Callable[[bool], None]) -> None:
+            visibility_listeners.setdefault(tab, []).append(listener)
+            listener(page_visible and active_tab == tab)
+
+        return register
+
+    def _notify_visibility_listeners() -> None:
+        for tab, listeners in visibility_listeners.items():
+            visible = page_visible and active_tab == tab
+            for listener in listeners:
+                listener(visible)
+
+    def _on_tab_change(event: Any) -> None:
+        nonlocal active_tab
+        active_tab = event.value
+        _notify_visibility_listeners()
+
+    def _on_page_visibility(event: Any) -> None:
+        nonlocal page_visible
+        page_visible = event.args != "hidden"
+        # A hidden page needs no probes or refreshes at all, so stop the shared
+        # tick itself rather than only pausing the individual panel tasks.
+        poller.active = page_visible
+        _notify_visibility_listeners()
 
     with ui.header().classes("justify-between px-6"):
         ui.label("Prompt Valet UI").classes("text-lg font-semibold")
@@ -1573,41 +2142,99 @@ def create_ui_app(
             )
 
     async def refresh_connectivity() -> None:
-        nonlocal api_connectivity_reachable
+        nonlocal api_connectivity_reachable, unreachable_streak
         report = await client.ping()
+        if report.reachable:
+            unreachable_streak = 0
+        else:
+            unreachable_streak += 1
+            if api_connectivity_reachable and unreachable_streak < 2:
+                # A single missed probe is treated as a blip: listeners only see
+                # "down" after two in a row, so a flapping network does not
+                # toggle every panel off and on. Probe again at the base rate.
+                if connectivity_timer is not None:
+                    connectivity_timer.reset_backoff()
+                return
         api_connectivity_reachable = report.reachable
-        for listener in connectivity_listeners:
-            listener(api_connectivity_reachable)
+        if connectivity_timer is not None:
+            # A steady API is probed less often (5s up to 30s); a reachability
+            # or version flip drops straight back to the base interval.
+            connectivity_timer.note_result(report)
+        pending = [
+            result
+            for listener in connectivity_listeners
+            if (result := listener(api_connectivity_reachable)) is not None
+        ]
         if report.reachable:
-            color = "text-emerald-500"
-            _set_text_if_changed(
-                status_label,
-                (
-                    f"API reachable (v{report.version})"
-                    if report.version
-                    else "API reachable"
-                ),
+            text = (
+                f"API reachable (v{report.version})"
+                if report.version
+                else "API reachable"
             )
         else:
-            color = "text-red-500"
             detail = f" ({report.detail})" if report.detail else ""
-            _set_text_if_changed(status_label, f"API unreachable{detail}")
-        _set_classes_if_changed(status_icon, f"text-xl {color}")
-        _set_classes_if_changed(status_label, f"font-medium {color}")
-
+            text = f"API unreachable{detail}"
+        _render_connectivity_status(text, report.reachable)
+        if pending:
+            # Async listeners run side by side so the probe waits for the
+            # slowest one rather than the sum of all of them.
+            results = await asyncio.gather(*pending, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning("Connectivity listener failed: %s", result)
+
+    def _render_connectivity_status(text: str, reachable: bool) -> None:
+        nonlocal rendered_connectivity_status
+        # Apply the header as one unit: a steady probe result skips all three
+        # element updates instead of checking each one separately.
+        if (text, reachable) == rendered_connectivity_status:
+            return
+        rendered_connectivity_status = (text, reachable)
+        icon_classes, label_classes = _API_STATUS_CLASSES[reachable]
+        _set_text_if_changed(status_label, text)
+        _set_classes_if_changed(status_icon, icon_classes)
+        _set_classes_if_changed(status_label, label_classes)
+
+    # One shared tick drives the connectivity probe and every panel's polling.
+    poller = _Poller()
     _schedule_async(refresh_connectivity)
-    ui.timer(5.0, refresh_connectivity)
+    connectivity_timer = poller.every(5.0, refresh_connectivity)
     with ui.tabs().classes("w-full").props("pills") as tabs:
         ui.tab("Dashboard")
         ui.tab("Submit")
         ui.tab("Services")
 
-    with ui.tab_panels(tabs, value="Dashboard").classes("w-full"):
+    # Background tabs keep their timers paused until they are shown again.
+    ui.add_body_html(
+        "<script>document.addEventListener('visibilitychange', () => "
+        "emitEvent('pv_page_visibility', document.visibilityState));</script>"
+    )
+    ui.on("pv_page_visibility", _on_page_visibility)
+    with ui.tab_panels(tabs, value=active_tab, on_change=_on_tab_change).classes(
+        "w-full"
+    ):
         with ui.tab_panel("Dashboard"):
-            _build_dashboard_panel(settings, client)
+            _build_dashboard_panel(
+                settings,
+                client,
+                poller,
+                register_connectivity_listener,
+                _visibility_registrar("Dashboard"),
+            )
         with ui.tab_panel("Submit"):
             _build_submit_panel(
-                settings, client, register_connectivity_listener, test_context
+                settings,
+                client,
+                poller,
+                register_connectivity_listener,
+                _visibility_registrar("Submit"),
+                test_context,
             )
         with ui.tab_panel("Services"):
-            _build_services_panel(client, register_connectivity_listener, test_context)
+            _build_services_panel(
+                client,
+                poller,
+                register_connectivity_listener,
+                _visibility_registrar("Services"),
+                test_context,
+            )
@@ -2,9 +2,59 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import time
+from contextlib import ExitStack
 from dataclasses import dataclass
+from pathlib import Path
 import httpx
-from typing import Any, AsyncIterator, Dict, List, Sequence
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    TypeVar,
+)
+
+try:  # orjson ships with NiceGUI on CPython; stdlib json is the fallback.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the platform build
+    orjson = None  # type: ignore[assignment]
+
+# httpx only speaks HTTP/2 when the optional ``h2`` package is installed
+# (``pip install prompt-valet[http2]``); it then negotiates h2 via TLS ALPN and
+# falls back to HTTP/1.1 for servers, or plain-http URLs, that do not offer it.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+_T = TypeVar("_T")
+
+
+def _json_body(response: httpx.Response) -> Any:
+    """Decode a JSON response; decode errors are raised as ``ValueError``."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _sse_data(line: bytes) -> str:
+    """Return the text of a ``data:`` line without its field name or CR."""
+    if line.endswith(b"\r"):
+        line = line[:-1]
+    return line[5:].lstrip().decode("utf-8", errors="replace")
+
+
+def _jobs_list(payload: Dict[str, Any], error: str) -> List[Dict[str, Any]]:
+    jobs = payload.get("jobs")
+    if not isinstance(jobs, list):
+        raise ValueError(error)
+    return jobs
 
 
 @dataclass(frozen=True)
@@ -16,12 +66,21 @@ class HealthReport:
 
 @dataclass(frozen=True)
 class UploadFilePayload:
+    """A file to forward to the upload endpoint.
+
+    When ``path`` is set the body is streamed from disk and ``data`` is ignored.
+    """
+
     filename: str
-    data: bytes
+    data: bytes = b""
     content_type: str | None = None
+    path: Path | None = None
 
 
 class PromptValetAPIClient:
+    # Health reports younger than this are shared by every caller.
+    PING_TTL_SECONDS = 1.0
+
     def __init__(
         self,
         base_url: str,
@@ -33,27 +92,144 @@ class PromptValetAPIClient:
             raise ValueError("API base URL must not be empty")
         self.base_url = trimmed
         self.timeout_seconds = timeout_seconds
+        # Built once and shared: the pooled client applies ``_timeout`` to every
+        # request, and log streams override it with ``_stream_timeout``.
+        self._timeout = httpx.Timeout(timeout_seconds)
+        self._stream_timeout = httpx.Timeout(None)
         self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._health_etag: str | None = None
+        self._health_version: str | None = None
+        self._ping_cache: tuple[float, HealthReport] | None = None
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
 
-    def _httpx_client(self, timeout: httpx.Timeout) -> httpx.AsyncClient:
-        kwargs: dict[str, Any] = {"timeout": timeout}
-        if self._transport is not None:
-            kwargs["transport"] = self._transport
-        return httpx.AsyncClient(**kwargs)
+    def _httpx_client(self) -> httpx.AsyncClient:
+        """Return the pooled client shared by every call on the running loop.
+
+        Keeping one ``AsyncClient`` lets the UI's polling reuse keep-alive
+        connections instead of reconnecting per request; request paths are
+        relative to ``base_url``. Connections cannot
+        migrate between event loops, so a new loop gets a fresh client.
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_loop is not loop
+        ):
+            kwargs: dict[str, Any] = {
+                "base_url": self.base_url,
+                "timeout": self._timeout,
+                "limits": httpx.Limits(
+                    max_connections=100, max_keepalive_connections=20
+                ),
+                "http2": _HTTP2_AVAILABLE,
+            }
+            if self._transport is not None:
+                kwargs["transport"] = self._transport
+            self._client = httpx.AsyncClient(**kwargs)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled connections; the next call reopens them."""
+        client = self._client
+        self._client = None
+        self._client_loop = None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    async def __aenter__(self) -> PromptValetAPIClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def _single_flight(
+        self, key: Hashable, factory: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Run ``factory`` once for all concurrent callers that share ``key``.
+
+        Callers that arrive while a request for ``key`` is in flight await the
+        same task instead of sending a duplicate; the entry is dropped as soon
+        as it finishes, so later calls always fetch fresh data.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+
+            async def _run() -> _T:
+                return await factory()
+
+            task = loop.create_task(_run())
+            self._inflight[key] = task
+
+            def _forget(done: asyncio.Task[Any]) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            task.add_done_callback(_forget)
+        # Shield the shared task so one cancelled caller does not abort it
+        # for everyone else waiting on it.
+        return await asyncio.shield(task)
+
+    async def _request_json(
+        self, method: str, url: str, shape: type, error: str, **kwargs: Any
+    ) -> Any:
+        """Send a request and return its JSON body, checked once against ``shape``.
+
+        Non-2xx responses raise ``httpx.HTTPStatusError``; a body that is not
+        JSON or not of the expected top-level type raises ``ValueError(error)``.
+        """
+        client = self._httpx_client()
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        payload = _json_body(response)
+        if not isinstance(payload, shape):
+            raise ValueError(error)
+        return payload
+
+    def invalidate_health(self) -> None:
+        """Forget the cached health report so the next ``ping`` probes again."""
+        self._ping_cache = None
 
     async def ping(self) -> HealthReport:
-        timeout = httpx.Timeout(self.timeout_seconds)
+        """Probe ``/healthz``, collapsing bursts of callers onto one request.
+
+        Concurrent callers share the in-flight probe and later callers reuse
+        its report for ``PING_TTL_SECONDS``.
+        """
+        cached = self._ping_cache
+        if cached is not None and time.monotonic() - cached[0] < self.PING_TTL_SECONDS:
+            return cached[1]
+        return await self._single_flight("healthz", self._probe_health)
+
+    async def _probe_health(self) -> HealthReport:
+        report = await self._fetch_health()
+        self._ping_cache = (time.monotonic(), report)
+        return report
+
+    async def _fetch_health(self) -> HealthReport:
         try:
-            async with self._httpx_client(timeout) as client:
-                response = await client.get(f"{self.base_url}/healthz")
-                response.raise_for_status()
-                payload = response.json()
-                version = None
-                if isinstance(payload, dict):
-                    version_value = payload.get("version")
-                    if version_value is not None:
-                        version = str(version_value)
-                return HealthReport(reachable=True, version=version)
+            client = self._httpx_client()
+            headers = (
+                {"If-None-Match": self._health_etag} if self._health_etag else None
+            )
+            response = await client.get("/healthz", headers=headers)
+            if response.status_code == 304:
+                # Unchanged since the last full probe: skip the body entirely.
+                return HealthReport(reachable=True, version=self._health_version)
+            response.raise_for_status()
+            payload = _json_body(response)
+            version = None
+            if isinstance(payload, dict):
+                version_value = payload.get("version")
+                if version_value is not None:
+                    version = str(version_value)
+            self._health_etag = response.headers.get("ETag")
+            self._health_version = version
+            return HealthReport(reachable=True, version=version)
         except httpx.HTTPStatusError as exc:
             return HealthReport(
                 reachable=False,
@@ -75,56 +251,46 @@ class PromptValetAPIClient:
         stalled: bool | None = None,
         limit: int | None = None,
     ) -> List[Dict[str, Any]]:
-        timeout = httpx.Timeout(self.timeout_seconds)
-        async with self._httpx_client(timeout) as client:
-            params: dict[str, str] = {}
-            if state is not None:
-                params["state"] = state
-            if repo is not None:
-                params["repo"] = repo
-            if branch is not None:
-                params["branch"] = branch
-            if stalled is not None:
-                params["stalled"] = "true" if stalled else "false"
-            if limit is not None:
-                params["limit"] = str(limit)
-            response = await client.get(f"{self.base_url}/jobs", params=params or None)
-            response.raise_for_status()
-            payload = response.json()
-        jobs = payload.get("jobs")
-        if not isinstance(jobs, list):
-            raise ValueError("invalid jobs payload")
-        return jobs
+        params: dict[str, str] = {}
+        if state is not None:
+            params["state"] = state
+        if repo is not None:
+            params["repo"] = repo
+        if branch is not None:
+            params["branch"] = branch
+        if stalled is not None:
+            params["stalled"] = "true" if stalled else "false"
+        if limit is not None:
+            params["limit"] = str(limit)
+
+        async def _fetch() -> List[Dict[str, Any]]:
+            payload = await self._request_json(
+                "GET", "/jobs", dict, "invalid jobs payload", params=params or None
+            )
+            return _jobs_list(payload, "invalid jobs payload")
+
+        return await self._single_flight(("jobs", *sorted(params.items())), _fetch)
 
     async def get_status(self) -> Dict[str, Any]:
-        timeout = httpx.Timeout(self.timeout_seconds)
-        async with self._httpx_client(timeout) as client:
-            response = await client.get(f"{self.base_url}/status")
-            response.raise_for_status()
-            payload = response.json()
-        if not isinstance(payload, dict):
-            raise ValueError("invalid status payload")
-        return payload
+        return await self._request_json(
+            "GET", "/status", dict, "invalid status payload"
+        )
 
     async def get_job_detail(self, job_id: str) -> Dict[str, Any]:
-        timeout = httpx.Timeout(self.timeout_seconds)
-        async with self._httpx_client(timeout) as client:
-            response = await client.get(f"{self.base_url}/jobs/{job_id}")
-            response.raise_for_status()
-            payload = response.json()
-        if not isinstance(payload, dict):
-            raise ValueError("invalid job detail payload")
-        return payload
+        return await self._single_flight(
+            ("job", job_id),
+            lambda: self._request_json(
+                "GET", f"/jobs/{job_id}", dict, "invalid job detail payload"
+            ),
+        )
 
     async def list_targets(self) -> List[Dict[str, str | None]]:
-        timeout = httpx.Timeout(self.timeout_seconds)
-        async with self._httpx_client(timeout) as client:
-            response = await client.get(f"{self.base_url}/targets")
-            response.raise_for_status()
-            payload = response.json()
-        if not isinstance(payload, list):
-            raise ValueError("invalid targets payload")
-        return payload
+        return await self._single_flight(
+            "targets",
+            lambda: self._request_json(
+                "GET", "/targets", list, "invalid targets payload"
+            ),
+        )
 
     async def submit_job(
         self,
@@ -133,7 +299,6 @@ class PromptValetAPIClient:
         markdown_text: str,
         filename: str | None = None,
     ) -> Dict[str, str]:
-        timeout = httpx.Timeout(self.timeout_seconds)
         data = {
             "repo": repo,
             "branch": branch,
@@ -141,72 +306,70 @@ class PromptValetAPIClient:
         }
         if filename is not None:
             data["filename"] = filename
-        async with self._httpx_client(timeout) as client:
-            response = await client.post(f"{self.base_url}/jobs", json=data)
-            response.raise_for_status()
-            payload = response.json()
-        if not isinstance(payload, dict):
-            raise ValueError("invalid submit job payload")
-        return payload
+        return await self._request_json(
+            "POST", "/jobs", dict, "invalid submit job payload", json=data
+        )
 
     async def upload_jobs(
         self,
         repo: str,
         branch: str,
-        files: Sequence[UploadFilePayload],
+        files: Iterable[UploadFilePayload],
     ) -> List[Dict[str, str]]:
-        timeout = httpx.Timeout(self.timeout_seconds)
-        multipart_files: list[tuple[str, tuple[str, bytes, str]]] = []
-        for upload in files:
-            content_type = upload.content_type or "text/markdown"
-            multipart_files.append(
-                ("files", (upload.filename, upload.data, content_type)),
-            )
-        async with self._httpx_client(timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/jobs/upload",
+        with ExitStack() as stack:
+            multipart_files: list[tuple[str, tuple[str, bytes | IO[bytes], str]]] = []
+            for upload in files:
+                content_type = upload.content_type or "text/markdown"
+                content: bytes | IO[bytes] = upload.data
+                if upload.path is not None:
+                    content = stack.enter_context(upload.path.open("rb"))
+                multipart_files.append(
+                    ("files", (upload.filename, content, content_type)),
+                )
+            payload = await self._request_json(
+                "POST",
+                "/jobs/upload",
+                dict,
+                "invalid upload response",
                 data={"repo": repo, "branch": branch},
                 files=multipart_files,
             )
-            response.raise_for_status()
-            payload = response.json()
-        jobs = payload.get("jobs")
-        if not isinstance(jobs, list):
-            raise ValueError("invalid upload response")
-        return jobs
+        return _jobs_list(payload, "invalid upload response")
 
     async def abort_job(self, job_id: str) -> Dict[str, str]:
-        timeout = httpx.Timeout(self.timeout_seconds)
-        async with self._httpx_client(timeout) as client:
-            response = await client.post(f"{self.base_url}/jobs/{job_id}/abort")
-            response.raise_for_status()
-            payload = response.json()
-        if not isinstance(payload, dict):
-            raise ValueError("invalid abort payload")
-        return payload
+        return await self._request_json(
+            "POST", f"/jobs/{job_id}/abort", dict, "invalid abort payload"
+        )
 
     async def tail_job_log(self, job_id: str, lines: int | None = None) -> str:
-        timeout = httpx.Timeout(self.timeout_seconds)
         params: dict[str, Any] = {}
         if lines is not None:
             params["lines"] = lines
-        async with self._httpx_client(timeout) as client:
-            response = await client.get(
-                f"{self.base_url}/jobs/{job_id}/log",
-                params=params or None,
-            )
-            response.raise_for_status()
-            return response.text
+        client = self._httpx_client()
+        response = await client.get(
+            f"/jobs/{job_id}/log",
+            params=params or None,
+        )
+        response.raise_for_status()
+        return response.text
 
     async def stream_job_log(self, job_id: str) -> AsyncIterator[str]:
-        timeout = httpx.Timeout(None)
-        async with self._httpx_client(timeout) as client:
-            async with client.stream(
-                "GET", f"{self.base_url}/jobs/{job_id}/log/stream"
-            ) as response:
-                response.raise_for_status()
-                async for raw_line in response.aiter_lines():
-                    if not raw_line:
-                        continue
-                    if raw_line.startswith("data:"):
-                        yield raw_line[5:].lstrip()
+        client = self._httpx_client()
+        async with client.stream(
+            "GET", f"/jobs/{job_id}/log/stream", timeout=self._stream_timeout
+        ) as response:
+            response.raise_for_status()
+            # Split the raw byte stream ourselves and decode only the payload of
+            # ``data:`` lines; keepalives and other SSE fields never become str.
+            pending = b""
+            async for chunk in response.aiter_bytes():
+                if b"\n" not in chunk:
+                    pending += chunk
+                    continue
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    if line.startswith(b"data:"):
+                        yield _sse_data(line)
+            if pending.startswith(b"data:"):
+                yield _sse_data(pending)
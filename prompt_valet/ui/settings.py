@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 DEFAULT_API_BASE_URL = "http://127.0.0.1:8888/api/v1"
 DEFAULT_UI_BIND_HOST = "0.0.0.0"
@@ -51,3 +52,8 @@ class UISettings:
                 "PV_UI_API_TIMEOUT_SECONDS", DEFAULT_API_TIMEOUT_SECONDS
             ),
         )
+
+
+@lru_cache(maxsize=1)
+def get_ui_settings() -> UISettings:
+    return UISettings.load()
@@ -15,24 +15,55 @@ This version:
 """
 
 import argparse
+import collections
 import copy
 import datetime as dt
+import heapq
 import json
 import logging
 import os
 import queue
 import shutil
 import signal
+import sqlite3
 import subprocess
 import threading
 import time
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
 import textwrap
-from typing import Any, Dict, Literal, Optional, Sequence, Tuple
+from typing import (
+    Any,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import yaml  # type: ignore
 
+try:  # libyaml's C loader when PyYAML was built against it.
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on the install
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+try:  # Optional: libgit2 bindings answer local repo queries without forking git.
+    import pygit2
+except ImportError:  # pragma: no cover - depends on the install
+    pygit2 = None  # type: ignore[assignment]
+
+try:  # Optional: inotify/FSEvents-backed inbox events instead of a full rescan.
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - depends on the install
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None  # type: ignore[assignment,misc]
+
 from scripts import queue_runtime
 
 
@@ -44,6 +75,9 @@ DEFAULT_CONFIG_PATH = Path("/srv/prompt-valet/config/prompt-valet.yaml")
 DEFAULT_PV_ROOT = Path("/srv/prompt-valet")
 DEBOUNCE_SECONDS = 2
 POLL_INTERVAL_SECONDS = 1.0
+# With filesystem events, the full inbox walk only runs this often to retry
+# deferred jobs and to pick up anything the observer missed.
+RECONCILE_INTERVAL_SECONDS = 60.0
 
 DEFAULT_CONFIG: Dict[str, Any] = {
     "inbox": str(DEFAULT_PV_ROOT / "inbox"),
@@ -65,8 +99,14 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "runner_cmd": "codex",
         "runner_model": "gpt-5.1-codex-mini",
         "runner_sandbox": "danger-full-access",
+        "ls_remote_ttl_seconds": 1800,
+        "parallelism": 1,
+        "partial_clone": True,
     },
 }
+# DEFAULT_CONFIG is plain JSON data, so a json round trip copies it much more
+# cheaply than copy.deepcopy; see _clone_defaults().
+_DEFAULT_CONFIG_JSON = json.dumps(DEFAULT_CONFIG)
 
 RUNS_DIR_NAME = "runs"
 JOB_METADATA_FILENAME = "job.json"
@@ -74,16 +114,118 @@ STATE_FILENAME = "state"
 JOB_LOG_NAME = "job.log"
 ABORT_FILENAME = "ABORT"
 HEARTBEAT_INTERVAL_SECONDS = 5.0
+# How often streamed Codex output is flushed to job.log and the watcher log.
+JOB_LOG_FLUSH_SECONDS = 1.0
+# Lines of git stderr kept for the error raised by run_git().
+GIT_STDERR_TAIL_LINES = 50
 
 # Simple global-ish config; populated in main()
 CONFIG: Dict[str, Any] = {}
 INBOX_MODE = "legacy_single_owner"
-JOB_STATES: Dict[str, str] = {}
 
 STATUS_RUNNING = "running"
 STATUS_DONE = "done"
 STATUS_ERROR = "error"
 
+# Job states that mean a running file needs no further startup work.
+_SETTLED_STATES = frozenset({STATUS_RUNNING, STATUS_DONE, STATUS_ERROR})
+
+PROMPT_SUFFIX = ".prompt.md"
+RUNNING_SUFFIX = f".{STATUS_RUNNING}.md"
+_PROMPT_SUFFIX_LEN = len(PROMPT_SUFFIX)
+_RUNNING_SUFFIX_LEN = len(RUNNING_SUFFIX)
+
+
+# ---------------------------------------------------------------------------
+# Job state
+# ---------------------------------------------------------------------------
+
+
+class JobStates(Dict[str, str]):
+    """
+    Job key -> status, optionally written through to a SQLite database.
+
+    Reads stay plain dict lookups; once open() attaches a database, every
+    update is also stored so a restarted watcher can finish prompts whose
+    job completed just before it stopped.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    def open(self, db_path: Path, inbox_root: Path, finished_root: Path) -> None:
+        """
+        Attach ``db_path`` and settle what the previous watcher left behind.
+
+        Rows for jobs that were running when the watcher stopped are dropped so
+        the job is retried. A done/error row whose *.running.md file is still
+        in the inbox means the watcher stopped between recording the result
+        and finalizing the prompt, so the prompt is finalized now; the row is
+        then dropped as well. Call this before any worker starts.
+        """
+        db = sqlite3.connect(
+            str(db_path), isolation_level=None, check_same_thread=False
+        )
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS job_states"
+            "(key TEXT PRIMARY KEY, state TEXT, ts REAL)"
+        )
+        rows = db.execute("SELECT key, state FROM job_states").fetchall()
+        for key, state in rows:
+            if state not in (STATUS_DONE, STATUS_ERROR):
+                continue
+            rel = Path(key)
+            running = inbox_root / rel.with_name(
+                _statusified_name(rel.name, STATUS_RUNNING)
+            )
+            if running.is_file():
+                log(f"Finalizing {rel} as {state} (recorded before last shutdown).")
+                finalize_inbox_prompt(
+                    inbox_root=inbox_root,
+                    finished_root=finished_root,
+                    rel=rel,
+                    status=state,
+                    delay_seconds=0.0,
+                )
+        db.execute("DELETE FROM job_states")
+        with self._db_lock:
+            self._db = db
+
+    def close(self) -> None:
+        with self._db_lock:
+            db, self._db = self._db, None
+        if db is not None:
+            db.close()
+
+    def __setitem__(self, key: str, state: str) -> None:
+        super().__setitem__(key, state)
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO job_states(key, state, ts)"
+                    " VALUES (?, ?, ?)",
+                    (key, state, time.time()),
+                )
+
+    def pop(self, key: str, *default: Any) -> Any:  # type: ignore[override]
+        value = super().pop(key, *default)
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM job_states WHERE key = ?", (key,))
+        return value
+
+    def clear(self) -> None:
+        super().clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM job_states")
+
+
+JOB_STATES = JobStates()
+
 
 # ---------------------------------------------------------------------------
 # Logging helpers
@@ -99,13 +241,19 @@ def log(msg: str) -> None:
     print(f"[codex_watcher] [{ts}] {msg}", flush=True)
 
 
-def _emit_job_event(
+def _log_lines(messages: Sequence[str]) -> None:
+    """Like log(), for several messages written out in a single write."""
+    ts = now_utc_iso()
+    print("\n".join(f"[codex_watcher] [{ts}] {msg}" for msg in messages), flush=True)
+
+
+def _format_job_event(
     event: str,
     *,
     job_record: queue_runtime.JobRecord,
     reason: Optional[str] = None,
     extra: Optional[Dict[str, Any]] = None,
-) -> None:
+) -> str:
     repo = f"{job_record.git_owner}/{job_record.repo_name}"
     parts = [
         f"event={event}",
@@ -119,7 +267,28 @@ def _emit_job_event(
     if extra:
         for key, value in extra.items():
             parts.append(f"{key}={value}")
-    log("[prompt-valet] " + " ".join(parts))
+    return "[prompt-valet] " + " ".join(parts)
+
+
+def _emit_job_event(
+    event: str,
+    *,
+    job_record: queue_runtime.JobRecord,
+    reason: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
+    log(_format_job_event(event, job_record=job_record, reason=reason, extra=extra))
+
+
+def _emit_job_events(events: Sequence[str]) -> None:
+    """
+    Emit several already formatted job events (see _format_job_event) at once.
+
+    Each event is formatted when it happens, so it records the job state at
+    that point; the lines then go out in a single write, which also keeps a
+    transition's events adjacent when several workers log at the same time.
+    """
+    _log_lines(events)
 
 
 def _atomic_write_text(path: Path, text: str) -> None:
@@ -141,6 +310,17 @@ def _atomic_write_json(path: Path, data: Dict[str, Any]) -> None:
 # ---------------------------------------------------------------------------
 
 
+def _decode_output(data: Optional[bytes]) -> str:
+    """
+    Decode captured process output.
+
+    Output is captured as bytes and only decoded here: empty streams (the usual
+    case for quiet git commands) skip the codec entirely, and non-UTF-8 bytes
+    (e.g. in file names) are replaced instead of raising.
+    """
+    return data.decode("utf-8", "replace") if data else ""
+
+
 def run_cmd(cmd: list[str], cwd: Path | None = None) -> tuple[int, str, str]:
     """Run a shell command, returning (returncode, stdout, stderr)."""
 
@@ -149,9 +329,8 @@ def run_cmd(cmd: list[str], cwd: Path | None = None) -> tuple[int, str, str]:
         cwd=str(cwd) if cwd is not None else None,
         check=False,
         capture_output=True,
-        text=True,
     )
-    return proc.returncode, proc.stdout, proc.stderr
+    return proc.returncode, _decode_output(proc.stdout), _decode_output(proc.stderr)
 
 
 def _run_git(
@@ -169,12 +348,17 @@ def _run_git(
 
     cmd = ["git", *args]
     logger.debug("Running git command: %s (cwd=%s)", " ".join(cmd), cwd)
-    proc = subprocess.run(
+    raw = subprocess.run(
         cmd,
         cwd=str(cwd),
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
+    )
+    proc = subprocess.CompletedProcess(
+        cmd,
+        raw.returncode,
+        stdout=_decode_output(raw.stdout),
+        stderr=_decode_output(raw.stderr),
     )
     if proc.returncode != 0:
         logger.warning(
@@ -203,44 +387,200 @@ def run_git(
 
     cmd = ["git"] + normalized_args
     log(f"RUN: {cmd!r} (cwd={cwd})")
-    proc = subprocess.run(
+    popen = subprocess.Popen(
         cmd,
         cwd=str(cwd),
-        text=True,
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     )
 
-    if proc.stdout:
-        log(f"STDOUT:\n{proc.stdout.rstrip()}")
-    if proc.stderr:
-        log(f"STDERR:\n{proc.stderr.rstrip()}")
+    # Log output as it arrives so a slow clone/fetch is visible while it runs.
+    # stderr (where git reports progress) only keeps a tail for the error
+    # message; stdout is kept whole because callers parse it.
+    stderr_tail: collections.deque[str] = collections.deque(
+        maxlen=GIT_STDERR_TAIL_LINES
+    )
 
-    if proc.returncode != 0 and not allow_failure:
-        err_msg = f"Command failed with code {proc.returncode}: {cmd!r}"
-        if proc.stderr:
-            err_msg += f" stderr: {proc.stderr.rstrip()}"
+    def _drain_stderr() -> None:
+        assert popen.stderr is not None
+        for raw_line in popen.stderr:
+            line = _decode_output(raw_line).rstrip("\n")
+            stderr_tail.append(line)
+            log(f"STDERR: {line}")
+
+    stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
+    stderr_thread.start()
+    stdout_lines: list[str] = []
+    assert popen.stdout is not None
+    for raw_line in popen.stdout:
+        line = _decode_output(raw_line)
+        stdout_lines.append(line)
+        log(f"STDOUT: {line.rstrip()}")
+    returncode = popen.wait()
+    stderr_thread.join()
+
+    stderr = "\n".join(stderr_tail)
+    proc = subprocess.CompletedProcess(
+        cmd, returncode, stdout="".join(stdout_lines), stderr=stderr
+    )
+    if returncode != 0 and not allow_failure:
+        err_msg = f"Command failed with code {returncode}: {cmd!r}"
+        if stderr:
+            err_msg += f" stderr: {stderr.rstrip()}"
         raise RuntimeError(err_msg)
     return proc
 
 
+# One pygit2.Repository per worker checkout, keyed by resolved path.
+_PYGIT2_REPOS: Dict[Path, Any] = {}
+_PYGIT2_REPOS_LOCK = threading.Lock()
+
+
+def _pygit2_repo(repo_dir: Path) -> Any:
+    """
+    Return a cached pygit2.Repository for ``repo_dir``.
+
+    Returns None when pygit2 is not installed or ``repo_dir`` is not a
+    repository libgit2 can open, so callers fall back to the git CLI.
+    """
+    if pygit2 is None:
+        return None
+    key = repo_dir.resolve()
+    with _PYGIT2_REPOS_LOCK:
+        repo = _PYGIT2_REPOS.get(key)
+        if repo is None:
+            try:
+                repo = pygit2.Repository(str(key))
+            except (pygit2.GitError, KeyError, ValueError):
+                return None
+            _PYGIT2_REPOS[key] = repo
+        return repo
+
+
+def _forget_pygit2_repo(repo_dir: Path) -> None:
+    with _PYGIT2_REPOS_LOCK:
+        _PYGIT2_REPOS.pop(repo_dir.resolve(), None)
+
+
+def _pygit2_is_dirty(repo_dir: Path) -> Optional[bool]:
+    """Return whether the worktree has changes, or None if pygit2 can't tell."""
+    repo = _pygit2_repo(repo_dir)
+    if repo is None:
+        return None
+    try:
+        statuses = repo.status()
+    except pygit2.GitError:
+        return None
+    # Match `git status --porcelain`, which leaves ignored files out.
+    return any(flags != pygit2.GIT_STATUS_IGNORED for flags in statuses.values())
+
+
+def _pygit2_remote_branch_names(repo_dir: Path) -> Optional[set[str]]:
+    """
+    List origin's heads in-process via pygit2.
+
+    Returns None when pygit2 is unavailable or libgit2 cannot reach the remote
+    (it does not use git's credential helpers), so callers fall back to
+    ``git ls-remote``.
+    """
+    repo = _pygit2_repo(repo_dir)
+    if repo is None:
+        return None
+    try:
+        heads = repo.remotes["origin"].list_heads()
+    except (pygit2.GitError, KeyError, ValueError, AttributeError) as exc:
+        # AttributeError covers pygit2 builds without Remote.list_heads (<1.15).
+        log(f"pygit2 could not list heads for {repo_dir}: {exc}; using git.")
+        return None
+    prefix = "refs/heads/"
+    return {head.name[len(prefix) :] for head in heads if head.name.startswith(prefix)}
+
+
+# origin's heads per worker checkout: (repo_dir, remote) -> (listed_at, names).
+_LS_REMOTE_CACHE: Dict[Tuple[str, str], Tuple[float, frozenset[str]]] = {}
+_LS_REMOTE_CACHE_LOCK = threading.Lock()
+
+
+def invalidate_remote_branch_names(repo_dir: Path) -> None:
+    """Drop the cached origin heads for ``repo_dir`` (e.g. after a push)."""
+    with _LS_REMOTE_CACHE_LOCK:
+        _LS_REMOTE_CACHE.pop((str(repo_dir.resolve()), "origin"), None)
+
+
 def get_remote_branch_names(repo_dir: Path, logger: logging.Logger) -> set[str]:
     """
     Return the set of remote branch names known on origin for this repo.
+
+    Results are reused for ``watcher.ls_remote_ttl_seconds`` (0 disables the
+    cache), so back-to-back jobs against one repo share a single ls-remote.
     """
-    proc = run_git(["ls-remote", "--heads", "origin"], cwd=repo_dir)
-    branches: set[str] = set()
-    for line in proc.stdout.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        parts = line.split()
-        if len(parts) != 2:
-            continue
-        _, ref = parts
-        prefix = "refs/heads/"
-        if ref.startswith(prefix):
-            branches.add(ref[len(prefix) :])
-    logger.debug("Remote branches for %s: %s", repo_dir, ", ".join(sorted(branches)))
+    key = (str(repo_dir.resolve()), "origin")
+    with _LS_REMOTE_CACHE_LOCK:
+        cached = _LS_REMOTE_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _ls_remote_ttl():
+        return set(cached[1])
+
+    branches = _list_remote_branch_names(repo_dir, logger)
+    _remember_remote_branch_names(repo_dir, branches)
+    return branches
+
+
+def _ls_remote_ttl() -> float:
+    return float(CONFIG.get("watcher", {}).get("ls_remote_ttl_seconds", 1800))
+
+
+def _remember_remote_branch_names(repo_dir: Path, branches: Iterable[str]) -> None:
+    if _ls_remote_ttl() <= 0:
+        return
+    key = (str(repo_dir.resolve()), "origin")
+    with _LS_REMOTE_CACHE_LOCK:
+        _LS_REMOTE_CACHE[key] = (time.monotonic(), frozenset(branches))
+
+
+def _remember_fetched_heads(repo_dir: Path) -> None:
+    """
+    Seed the origin heads cache from refs/remotes/origin/* after a full fetch.
+
+    A ``--prune`` fetch of every head leaves the local remote-tracking refs
+    matching origin, so the later base-branch check needs no ls-remote.
+    """
+    prefix = "refs/remotes/origin/"
+    repo = _pygit2_repo(repo_dir)
+    if repo is not None:
+        refs = repo.listall_references()
+    else:
+        rc, out, _ = run_cmd(
+            ["git", "for-each-ref", "--format=%(refname)", prefix], cwd=repo_dir
+        )
+        if rc != 0:
+            return
+        refs = out.split()
+    _remember_remote_branch_names(
+        repo_dir,
+        (
+            ref[len(prefix) :]
+            for ref in refs
+            if ref.startswith(prefix) and ref != f"{prefix}HEAD"
+        ),
+    )
+
+
+def _list_remote_branch_names(repo_dir: Path, logger: logging.Logger) -> set[str]:
+    branches = _pygit2_remote_branch_names(repo_dir)
+    if branches is None:
+        proc = run_git(["ls-remote", "--heads", "origin"], cwd=repo_dir)
+        # Each line is "<sha>\trefs/heads/<name>"; one partition per line.
+        branches = {
+            name
+            for _, sep, name in (
+                line.partition("\trefs/heads/") for line in proc.stdout.splitlines()
+            )
+            if sep and name
+        }
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Remote branches for %s: %s", repo_dir, ", ".join(sorted(branches))
+        )
     return branches
 
 
@@ -265,6 +605,7 @@ def ensure_worker_repo_clean_and_synced(
                 repo_path,
             )
             shutil.rmtree(repo_path)
+            _forget_pygit2_repo(repo_path)
         try:
             ensure_repo_cloned(repo_root, git_owner, repo_name)
         except Exception:
@@ -275,6 +616,22 @@ def ensure_worker_repo_clean_and_synced(
             return False
         return True
 
+    def _discard_local_changes() -> bool:
+        # Resetting in place keeps the object store, so a dirty checkout costs a
+        # reset instead of a full re-download; only reclone if that fails.
+        # -ffdx also drops ignored build output and nested repos, leaving the
+        # same pristine tree a fresh clone would.
+        for args in (["reset", "--hard", "HEAD"], ["clean", "-ffdx"]):
+            proc = _run_git(args, cwd=repo_path, logger=logger)
+            if proc.returncode != 0:
+                logger.warning(
+                    "Git preflight: git %s failed in %s; recloning instead.",
+                    " ".join(args),
+                    repo_path,
+                )
+                return _fresh_clone()
+        return True
+
     def _checkout_base_and_pull() -> bool:
         for args in (["checkout", base_branch], ["pull", "--ff-only"]):
             proc = _run_git(args, cwd=repo_path, logger=logger)
@@ -293,18 +650,21 @@ def ensure_worker_repo_clean_and_synced(
         if not _fresh_clone():
             return False
     else:
-        status = _run_git(["status", "--porcelain"], cwd=repo_path, logger=logger)
-        if status.returncode != 0:
-            logger.error(
-                "Git preflight: `git status` failed in %s; skipping Codex run.",
-                repo_path,
-            )
-            return False
-        if status.stdout.strip():
+        dirty = _pygit2_is_dirty(repo_path)
+        if dirty is None:
+            status = _run_git(["status", "--porcelain"], cwd=repo_path, logger=logger)
+            if status.returncode != 0:
+                logger.error(
+                    "Git preflight: `git status` failed in %s; skipping Codex run.",
+                    repo_path,
+                )
+                return False
+            dirty = bool(status.stdout.strip())
+        if dirty:
             logger.info(
-                "Git preflight: repo dirty; removing and recloning to discard local changes."
+                "Git preflight: repo dirty; resetting to discard local changes."
             )
-            if not _fresh_clone():
+            if not _discard_local_changes():
                 return False
 
     if not git_dir.is_dir():
@@ -321,6 +681,22 @@ def ensure_worker_repo_clean_and_synced(
     return True
 
 
+@lru_cache(maxsize=32)
+def _path_of(raw: str) -> Path:
+    return Path(raw)
+
+
+def _config_path(key: str) -> Path:
+    """``Path(CONFIG[key])``, built once per distinct configured value."""
+    return _path_of(str(CONFIG[key]))
+
+
+@lru_cache(maxsize=32)
+def _resolved_root(raw: str) -> Path:
+    """Resolve a configured root directory once; roots do not move at runtime."""
+    return Path(os.path.realpath(os.path.expanduser(raw)))
+
+
 def resolve_prompt_repo(
     config: dict, prompt_path: str
 ) -> Tuple[str, str, str, Path, Path]:
@@ -343,12 +719,12 @@ def resolve_prompt_repo(
 
         repos_root/<owner>/<repo_name>
     """
-    inbox_root = Path(config["inbox"]).expanduser().resolve()
-    repos_root = Path(config["repos_root"]).expanduser().resolve()
+    inbox_root = _resolved_root(str(config["inbox"]))
+    repos_root = _resolved_root(str(config["repos_root"]))
 
     mode = config.get("inbox_mode", "legacy_single_owner")
 
-    prompt = Path(prompt_path).expanduser().resolve()
+    prompt = Path(os.path.realpath(os.path.expanduser(prompt_path)))
     try:
         rel = prompt.relative_to(inbox_root)
     except ValueError as exc:
@@ -432,7 +808,12 @@ def ensure_repo_cloned(repo_root: Path, git_owner: str, repo_name: str) -> Path:
     url = f"{proto}://{host}/{owner}/{repo_name}.git"
     log(f"Cloning missing repo {repo_name!r} from {url!r} into {target}")
     target.parent.mkdir(parents=True, exist_ok=True)
-    run_git(["clone", url, str(target)], cwd=repo_root)
+    clone_args = ["clone"]
+    if watcher_cfg.get("partial_clone", True):
+        # Blobless clone: full commit/tree history (so any branch can still be
+        # checked out) but file contents are only fetched when needed.
+        clone_args += ["--filter=blob:none", "--no-tags"]
+    run_git([*clone_args, url, str(target)], cwd=repo_root)
     return target
 
 
@@ -457,15 +838,23 @@ def prepare_branch(
     """
     Make sure the repo is on a clean job branch derived from base_branch.
 
-    - Fetches origin.
+    - Fetches every head from origin (one round trip, pruning deleted ones).
     - Checks out and fast-forwards base_branch.
     - Creates job_branch from base_branch if missing, otherwise reuses it.
     """
-    # Ensure repo exists & has remotes (non-fatal if this fails)
-    run_git(["remote", "-v"], cwd=repo_dir, allow_failure=True)
-
-    # Fetch latest and get onto base branch
-    run_git(["fetch", "origin", base_branch], cwd=repo_dir)
+    # Fetch latest and get onto base branch. A missing origin fails here, so
+    # there is no separate `git remote -v` probe.
+    run_git(
+        [
+            "fetch",
+            "--prune",
+            "--no-tags",
+            "origin",
+            "+refs/heads/*:refs/remotes/origin/*",
+        ],
+        cwd=repo_dir,
+    )
+    _remember_fetched_heads(repo_dir)
     run_git(["checkout", base_branch], cwd=repo_dir)
     run_git(["reset", "--hard", f"origin/{base_branch}"], cwd=repo_dir)
     run_git(["clean", "-fd"], cwd=repo_dir)
@@ -538,9 +927,8 @@ def _statusified_name(name: str, status: str) -> str:
     """
     # We deliberately replace only the first '.prompt' occurrence to avoid
     # weird multi-dot filenames, but keep the overall pattern simple:
-    if name.endswith(".prompt.md"):
-        base = name[: -len(".prompt.md")]
-        return f"{base}.{status}.md"
+    if name.endswith(PROMPT_SUFFIX):
+        return f"{name[:-_PROMPT_SUFFIX_LEN]}.{status}.md"
     # Fallback: just insert before the last dot
     stem, dot, ext = name.rpartition(".")
     if not dot:
@@ -555,33 +943,299 @@ def _job_key(rel: Path) -> str:
 
 def _prompt_rel_from_running(rel_running: Path) -> Path:
     """Return the original *.prompt.md relative path for a running file."""
-    if rel_running.name.endswith(".running.md"):
-        prompt_name = rel_running.name[: -len(".running.md")] + ".prompt.md"
+    if rel_running.name.endswith(RUNNING_SUFFIX):
+        prompt_name = rel_running.name[:-_RUNNING_SUFFIX_LEN] + PROMPT_SUFFIX
         return rel_running.with_name(prompt_name)
     return rel_running
 
 
+def _iter_inbox_files(inbox_root: Path, suffix: str) -> Iterator[os.DirEntry[str]]:
+    """
+    Yield directory entries for files under ``inbox_root`` ending in ``suffix``.
+
+    Walks with ``os.scandir``, which reports entry types from the directory
+    listing itself, so non-matching files cost no ``stat`` and no ``Path``.
+    The processed/finished/failed trees are skipped if they live inside the
+    inbox.
+    """
+    pruned = {
+        str(_config_path(key))
+        for key in ("processed", "finished", "failed")
+        if CONFIG.get(key)
+    }
+    stack = [str(inbox_root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in pruned:
+                        stack.append(entry.path)
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    yield entry
+
+
+class InboxEvents:
+    """
+    Inbox paths reported by the filesystem observer, waiting to be processed.
+
+    The observer thread adds *.prompt.md / *.running.md paths; the watcher loop
+    drains them each tick, so it only looks at files that actually changed.
+
+    Prompt paths are debounced: each event (re)arms a deadline
+    ``debounce_seconds`` in the future, kept in a heap, and a prompt is only
+    handed out once its latest deadline has passed. Prompts whose latest event
+    showed the file complete (closed after writing, or renamed into place) are
+    handed out separately from those only seen being created, which still need
+    the mtime debounce.
+    """
+
+    def __init__(self, debounce_seconds: Optional[float] = None) -> None:
+        self._cond = threading.Condition()
+        self._debounce = (
+            DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+        )
+        self._deadlines: dict[Path, float] = {}
+        self._heap: list[tuple[float, Path]] = []
+        self._complete: set[Path] = set()
+        self._running: set[Path] = set()
+
+    def add(
+        self, path: Path, delay: Optional[float] = None, complete: bool = False
+    ) -> None:
+        name = path.name
+        with self._cond:
+            if name.endswith(PROMPT_SUFFIX):
+                deadline = time.monotonic() + (
+                    self._debounce if delay is None else delay
+                )
+                # A newer event for the same path moves its deadline forward;
+                # the older heap entry is skipped as stale when popped.
+                self._deadlines[path] = deadline
+                heapq.heappush(self._heap, (deadline, path))
+                if complete:
+                    self._complete.add(path)
+                else:
+                    self._complete.discard(path)
+            elif name.endswith(RUNNING_SUFFIX):
+                self._running.add(path)
+            else:
+                return
+            self._cond.notify()
+
+    def wait(self, timeout: float) -> None:
+        """Block until an event is due or ``timeout`` seconds pass."""
+        with self._cond:
+            if self._running:
+                return
+            heap = self._heap
+            while heap and self._deadlines.get(heap[0][1]) != heap[0][0]:
+                heapq.heappop(heap)
+            if heap:
+                timeout = min(timeout, heap[0][0] - time.monotonic())
+            if timeout > 0:
+                self._cond.wait(timeout)
+
+    def drain(self) -> tuple[set[Path], set[Path], set[Path]]:
+        """
+        Return and clear the due prompts and pending running paths.
+
+        Due prompts come back as (complete, created): complete ones can be
+        claimed straight away, created-only ones may still be being written.
+        """
+        now = time.monotonic()
+        complete: set[Path] = set()
+        created: set[Path] = set()
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, path = heapq.heappop(self._heap)
+                if self._deadlines.get(path) == deadline:
+                    del self._deadlines[path]
+                    if path in self._complete:
+                        self._complete.remove(path)
+                        complete.add(path)
+                    else:
+                        created.add(path)
+            running, self._running = self._running, set()
+        return complete, created, running
+
+
+# Only these event kinds can introduce a prompt or running file; modified,
+# opened, deleted etc. are dropped before any per-event work happens.
+_INBOX_EVENT_TYPES = frozenset({"created", "moved", "closed"})
+_INBOX_EVENT_SUFFIXES = (PROMPT_SUFFIX, RUNNING_SUFFIX)
+
+
+class _InboxEventHandler(FileSystemEventHandler):
+    def __init__(self, events: InboxEvents) -> None:
+        super().__init__()
+        self._events = events
+
+    def dispatch(self, event: Any) -> None:
+        # New subdirectories need no handling here: the observer's recursive
+        # watch already covers them.
+        if event.is_directory or event.event_type not in _INBOX_EVENT_TYPES:
+            return
+        if event.event_type == "created":
+            # The writer may still be going: wait for the debounce window (or
+            # its close event, whichever comes first). Modified events are not
+            # delivered, so the claim still checks the file's mtime.
+            self._add(event.src_path, None, complete=False)
+        elif event.event_type == "moved":
+            # A rename lands a complete file.
+            self._add(event.dest_path, 0.0, complete=True)
+        else:
+            # IN_CLOSE_WRITE: the writer closed the file, so it is complete.
+            self._add(event.src_path, 0.0, complete=True)
+
+    def _add(self, path: str, delay: Optional[float], complete: bool) -> None:
+        if path.endswith(_INBOX_EVENT_SUFFIXES):
+            self._events.add(Path(path), delay, complete)
+
+
+def _start_inbox_observer(inbox_root: Path) -> tuple[Any, Optional[InboxEvents]]:
+    """
+    Start a recursive watchdog observer on the inbox, if watchdog is installed.
+
+    Returns (observer, events); both are None when the watcher must fall back to
+    walking the inbox every tick.
+    """
+    if Observer is None:
+        return None, None
+    events = InboxEvents()
+    observer = Observer()
+    try:
+        # One recursive watch on the root, not one schedule() per directory.
+        observer.schedule(_InboxEventHandler(events), str(inbox_root), recursive=True)
+        observer.start()
+    except OSError as exc:
+        log(f"Inbox observer unavailable ({exc}); falling back to polling.")
+        return None, None
+    log(f"Watching {inbox_root} for filesystem events.")
+    return observer, events
+
+
 def claim_inbox_prompt(inbox_root: Path, rel: Path) -> Path:
     """
-    Atomically claim a prompt in the inbox by renaming:
+    Atomically claim a prompt in the inbox by moving:
 
         xyz.prompt.md -> xyz.running.md
 
     Returns the full path to the new .running file.
 
-    Raises FileNotFoundError if the original .prompt.md is missing.
+    Raises FileNotFoundError if the original .prompt.md is missing, and
+    FileExistsError if xyz.running.md already exists (another watcher, or an
+    earlier run of the same prompt, owns it).
     """
     src = inbox_root / rel
-    if not src.exists():
-        raise FileNotFoundError(src)
-
     running_name = _statusified_name(src.name, STATUS_RUNNING)
     dst = src.with_name(running_name)
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    src.replace(dst)
+    # link() is a test-and-set: exactly one watcher can create dst, and the
+    # winner then drops the prompt name. A rename would silently replace an
+    # existing running file instead.
+    try:
+        os.link(src, dst)
+    except (FileExistsError, FileNotFoundError):
+        raise
+    except OSError:
+        # Filesystem without hard links; fall back to the plain rename.
+        src.replace(dst)
+        return dst
+    try:
+        src.unlink()
+    except FileNotFoundError:
+        pass
     return dst
 
 
+class DeferredMoves:
+    """
+    Move finished inbox files into the finished tree after a grace period.
+
+    A single reaper thread pops due moves off a heap, so workers hand off the
+    move and go straight to the next job. Moves still pending at shutdown are
+    saved to ``state_path`` and carried out on the next start.
+    """
+
+    def __init__(self, state_path: Path) -> None:
+        self._state_path = state_path
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, str, str]] = []
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._restore()
+        self._thread.start()
+
+    def schedule(self, src: Path, dst: Path, delay_seconds: float) -> None:
+        with self._cond:
+            due = time.monotonic() + delay_seconds
+            heapq.heappush(self._heap, (due, str(src), str(dst)))
+            self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+        self._persist()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                # Due moves are carried out even when stopping; only the ones
+                # still inside their grace period are left for _persist().
+                while True:
+                    wait = self._heap[0][0] - time.monotonic() if self._heap else None
+                    if wait is not None and wait <= 0:
+                        break
+                    if self._stopped:
+                        return
+                    self._cond.wait(wait)
+                _, src, dst = heapq.heappop(self._heap)
+            _move_to_finished(Path(src), Path(dst))
+
+    def _persist(self) -> None:
+        with self._cond:
+            pending = [[src, dst] for _, src, dst in sorted(self._heap)]
+            self._heap.clear()
+        if pending:
+            _atomic_write_json(self._state_path, {"moves": pending})
+            log(f"Saved {len(pending)} pending finalize move(s) to {self._state_path}")
+        elif self._state_path.exists():
+            self._state_path.unlink()
+
+    def _restore(self) -> None:
+        if not self._state_path.is_file():
+            return
+        try:
+            data = json.loads(self._state_path.read_text(encoding="utf-8"))
+            moves = [(Path(src), Path(dst)) for src, dst in data.get("moves", [])]
+        except (OSError, ValueError, TypeError) as exc:
+            log(f"Ignoring unreadable {self._state_path}: {exc}")
+            return
+        for src, dst in moves:
+            self.schedule(src, dst, 0.0)
+        self._state_path.unlink()
+
+
+# Set by main() while the long-running watcher is up; None means
+# finalize_inbox_prompt waits out the grace period inline.
+_DEFERRED_MOVES: Optional[DeferredMoves] = None
+
+
+def _move_to_finished(src: Path, dst: Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        src.replace(dst)
+    except FileNotFoundError:
+        log(f"[prompt-valet] Warning: {src} vanished before it could be finished.")
+
+
 def finalize_inbox_prompt(
     inbox_root: Path,
     finished_root: Path,
@@ -606,49 +1260,82 @@ def finalize_inbox_prompt(
     final_name = _statusified_name(original.name, status)
     final_inbox_path = original.with_name(final_name)
 
-    if running_path.exists():
+    try:
         running_path.replace(final_inbox_path)
-    elif final_inbox_path.exists():
+    except FileNotFoundError:
+        if not final_inbox_path.exists():
+            # File is missing entirely; nothing to move. Log and exit quietly.
+            print(
+                f"[prompt-valet] Warning: expected inbox file for {rel} in status "
+                f"{STATUS_RUNNING}, but none found; skipping finalize."
+            )
+            return
         # Idempotency / partial runs: if it's already renamed, just continue.
-        pass
-    else:
-        # File is missing entirely; nothing to move. Log and exit quietly.
-        print(
-            f"[prompt-valet] Warning: expected inbox file for {rel} in status "
-            f"{STATUS_RUNNING}, but none found; skipping finalize."
-        )
-        return
+
+    # Move to finished tree, preserving the relative path structure.
+    finished_rel = rel.with_name(final_name)
+    finished_path = finished_root / finished_rel
 
     # Short grace period so operators can see the .done/.error in inbox.
     if delay_seconds > 0:
+        if _DEFERRED_MOVES is not None:
+            _DEFERRED_MOVES.schedule(final_inbox_path, finished_path, delay_seconds)
+            return
         time.sleep(delay_seconds)
 
-    # Move to finished tree, preserving the relative path structure.
-    finished_rel = rel.with_name(final_name)
-    finished_path = finished_root / finished_rel
     finished_path.parent.mkdir(parents=True, exist_ok=True)
     final_inbox_path.replace(finished_path)
 
 
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """
+    Give the run directory its own name for the prompt file.
+
+    A hard link costs no data copy; the inbox file is only ever renamed after
+    this point, never rewritten, so both names keep the same content. A
+    retried job reuses its run directory: an existing ``dst`` that already is
+    ``src`` is left alone, any other one is replaced. Falls back to copy2
+    across filesystems or where links are unsupported. Raises
+    FileNotFoundError if ``src`` is gone.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        if os.path.samefile(src, dst):
+            return
+        dst.unlink()
+        _link_or_copy(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
 def start_jobs_from_running(
     inbox_root: Path,
     processed_root: Path,
-    job_queue: Optional["queue.Queue[Job]"],
+    job_queue: Optional["queue.Queue[Job] | ShardedJobQueue"],
     *,
     queue_enabled: bool = False,
     queue_root: Optional[Path] = None,
+    candidates: Optional[Iterable[Path]] = None,
 ) -> None:
     """
     Phase B of the watcher loop: start jobs based on *.running.md files.
 
     All job metadata is derived from the running file; the job is only marked
     RUNNING after the file has been copied into the run directory.
-    """
 
-    for running_path in inbox_root.rglob("*.running.md"):
-        if not running_path.is_file():
-            continue
+    ``candidates`` limits the pass to those running files (as reported by the
+    inbox observer); by default the whole inbox is walked.
+    """
 
+    # Entries from the walk are known to be files; only observed paths (which
+    # may have moved on since the event) need a stat.
+    walked = candidates is None
+    if candidates is None:
+        candidates = (
+            Path(entry.path) for entry in _iter_inbox_files(inbox_root, RUNNING_SUFFIX)
+        )
+    for running_path in candidates:
         try:
             rel_running = running_path.relative_to(inbox_root)
         except ValueError:
@@ -656,7 +1343,11 @@ def start_jobs_from_running(
 
         prompt_rel = _prompt_rel_from_running(rel_running)
         key = _job_key(prompt_rel)
-        if JOB_STATES.get(key) in {STATUS_RUNNING, STATUS_DONE, STATUS_ERROR}:
+        # Checked before touching the filesystem: on a busy inbox most running
+        # files already belong to a job.
+        if JOB_STATES.get(key) in _SETTLED_STATES:
+            continue
+        if not walked and not running_path.is_file():
             continue
 
         try:
@@ -690,7 +1381,7 @@ def start_jobs_from_running(
 
         prompt_copy_path = run_root / "prompt.md"
         try:
-            shutil.copy2(running_path, prompt_copy_path)
+            _link_or_copy(running_path, prompt_copy_path)
         except FileNotFoundError:
             log(
                 "[prompt-valet] Warning: running prompt missing during job "
@@ -714,6 +1405,11 @@ def start_jobs_from_running(
         job_queue.put(job)
 
 
+# Set whenever a job is enqueued so the queue executor picks it up right away
+# instead of at its next poll; every enqueue happens in this process.
+_QUEUE_WAKEUP = threading.Event()
+
+
 def _enqueue_queue_job(
     running_path: Path,
     prompt_rel: Path,
@@ -739,6 +1435,7 @@ def _enqueue_queue_job(
     )
 
     JOB_STATES[key] = STATUS_RUNNING
+    _QUEUE_WAKEUP.set()
     log("[prompt-valet] enqueued job " f"prompt={prompt_rel} queue={job_record.job_id}")
     _emit_job_event(
         "job.created",
@@ -748,39 +1445,69 @@ def _enqueue_queue_job(
     )
 
 
-def claim_new_prompts(inbox_root: Path) -> None:
+def claim_new_prompts(
+    inbox_root: Path,
+    candidates: Optional[Iterable[Path]] = None,
+    debounce_seconds: Optional[float] = None,
+) -> set[Path]:
     """
     Phase A of the watcher loop: claim *.prompt.md files after a short debounce.
 
     The debounce protects against race conditions where the file is still being
     written; real job creation is deferred to processing of *.running.md files.
+
+    ``candidates`` limits the pass to those prompt files (as reported by the
+    inbox observer); by default the whole inbox is walked. Candidates the
+    observer saw closed or renamed into place are complete, so the loop passes
+    ``debounce_seconds=0`` for them. Returns the prompts that were skipped
+    because they are still inside the debounce window.
     """
 
+    if debounce_seconds is None:
+        debounce_seconds = DEBOUNCE_SECONDS
     now = time.time()
-    for path in inbox_root.rglob("*.prompt.md"):
-        if not path.is_file():
+    deferred: set[Path] = set()
+    scanned: Iterable[tuple[Path, Optional[os.DirEntry[str]]]]
+    if candidates is None:
+        scanned = (
+            (Path(entry.path), entry)
+            for entry in _iter_inbox_files(inbox_root, PROMPT_SUFFIX)
+        )
+    else:
+        scanned = ((path, None) for path in candidates)
+    for path, entry in scanned:
+        if entry is None and not path.is_file():
             continue
 
         running_candidate = path.with_name(_statusified_name(path.name, STATUS_RUNNING))
         if running_candidate.exists():
             continue
 
-        try:
-            mtime = path.stat().st_mtime
-        except FileNotFoundError:
-            continue
+        if debounce_seconds > 0:
+            try:
+                mtime = (entry or path).stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if now - mtime < debounce_seconds:
+                deferred.add(path)
+                continue
 
-        if now - mtime < DEBOUNCE_SECONDS:
+        try:
+            rel = path.relative_to(inbox_root)
+        except ValueError:
             continue
-
-        rel = path.relative_to(inbox_root)
         try:
             running_path = claim_inbox_prompt(inbox_root, rel)
         except FileNotFoundError:
             continue
+        except FileExistsError:
+            log(f"Prompt {rel} is already claimed; leaving it in place.")
+            continue
         else:
             log(f"Claimed prompt {rel} as {running_path.name}")
 
+    return deferred
+
 
 # ---------------------------------------------------------------------------
 # Config loading
@@ -818,8 +1545,29 @@ def _queue_root_from_config(cfg: Dict[str, Any]) -> Path:
     return pv_root / ".queue" / "jobs"
 
 
+def _clone_defaults() -> Dict[str, Any]:
+    """Return a fresh, independently mutable copy of DEFAULT_CONFIG."""
+    return json.loads(_DEFAULT_CONFIG_JSON)
+
+
+# Last parsed config file, keyed by (path, st_mtime_ns).
+_USER_CONFIG_CACHE: Dict[Tuple[str, int], Any] = {}
+
+
+def _read_user_config(path: Path) -> Any:
+    """Parse the YAML config at ``path``, reusing the result while unchanged."""
+    key = (str(path), path.stat().st_mtime_ns)
+    cached = _USER_CONFIG_CACHE.get(key)
+    if cached is None:
+        cached = yaml.load(path.read_text(encoding="utf-8"), Loader=_YamlLoader)
+        _USER_CONFIG_CACHE.clear()
+        _USER_CONFIG_CACHE[key] = cached
+    # Callers merge into and mutate the result, so never hand out the cached one.
+    return copy.deepcopy(cached)
+
+
 def load_config() -> tuple[Dict[str, Any], Path]:
-    cfg = copy.deepcopy(DEFAULT_CONFIG)
+    cfg = _clone_defaults()
     path = DEFAULT_CONFIG_PATH
 
     loaded_path: str = "<defaults>"
@@ -827,7 +1575,7 @@ def load_config() -> tuple[Dict[str, Any], Path]:
 
     if path.is_file():
         try:
-            user_cfg = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+            user_cfg = _read_user_config(path) or {}
             if not isinstance(user_cfg, dict):
                 raise ValueError("YAML config is not a mapping at the top level")
             for key, value in user_cfg.items():
@@ -911,7 +1659,7 @@ def load_config() -> tuple[Dict[str, Any], Path]:
 
 def load_config_from_dict(cfg: Dict[str, Any]) -> Dict[str, Any]:
     """Normalize an existing config dict (primarily for tests)."""
-    normalized = copy.deepcopy(DEFAULT_CONFIG)
+    normalized = _clone_defaults()
     for key, value in cfg.items():
         if isinstance(value, dict) and isinstance(normalized.get(key), dict):
             normalized[key].update(value)  # type: ignore[arg-type]
@@ -940,6 +1688,17 @@ class Job:
     run_root: Path
     prompt_path: Path
 
+    # Derived from inbox_rel once per job rather than on every lookup.
+    @cached_property
+    def key(self) -> str:
+        """JOB_STATES key for this job (see _job_key)."""
+        return _job_key(self.inbox_rel)
+
+    @cached_property
+    def prompt_slug(self) -> str:
+        """Branch-safe form of the prompt file stem."""
+        return self.inbox_rel.stem.replace(" ", "-").replace("_", "-").replace(".", "-")
+
 
 class JobAbortedError(RuntimeError):
     """Raised when a job is terminated via the ABORT handshake."""
@@ -1041,16 +1800,54 @@ def _start_job_heartbeat(
     return thread
 
 
-def _append_to_job_log(log_path: Path, stdout: str, stderr: str) -> None:
-    if not stdout and not stderr:
-        return
-    with log_path.open("a", encoding="utf-8") as fp:
-        if stdout:
-            fp.write("=== STDOUT ===\n")
-            fp.write(stdout.rstrip("\n") + "\n")
-        if stderr:
-            fp.write("=== STDERR ===\n")
-            fp.write(stderr.rstrip("\n") + "\n")
+class _JobLogSink:
+    """
+    Codex output on its way to job.log and the watcher log, written in batches.
+
+    The tee threads only append; flush() pushes job.log to disk and logs the
+    pending lines with one write. The runner calls it every
+    JOB_LOG_FLUSH_SECONDS while Codex runs and once at exit, so job.log can
+    still be tailed live without a flush per output line.
+    """
+
+    def __init__(self, log_fp: IO[bytes]) -> None:
+        self._log_fp = log_fp
+        self._lock = threading.Lock()
+        self._pending: list[str] = []
+
+    def write(self, label: str, line: bytes) -> None:
+        with self._lock:
+            self._log_fp.write(label.encode() + b": " + line)
+            self._pending.append(f"codex {label}: {_decode_output(line).rstrip()}")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._log_fp.flush()
+            pending, self._pending = self._pending, []
+        if pending:
+            _log_lines(pending)
+
+
+def _start_output_tee(
+    stream: IO[bytes], label: str, sink: _JobLogSink
+) -> threading.Thread:
+    """
+    Copy ``stream`` line by line into ``sink``.
+
+    Draining as output arrives keeps the child from blocking on a full pipe and
+    avoids holding the whole run's output in memory. Lines go into job.log as
+    raw bytes; only the watcher log line is decoded.
+    """
+
+    def _tee() -> None:
+        for line in stream:
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            sink.write(label, line)
+
+    thread = threading.Thread(target=_tee, daemon=True)
+    thread.start()
+    return thread
 
 
 def get_job_base_branch(job: Job) -> str:
@@ -1092,17 +1889,8 @@ def run_codex_for_job(
     stamp = dt.datetime.utcnow().strftime("%Y%m%d-%H%M-%S")
     out_file = runs_dir / f"codex-run-{stamp}.md"
 
-    env = os.environ.copy()
     prompt_path = Path(job.prompt_path)
 
-    env.update(
-        {
-            "PV_RUN_ID": job.job_id,
-            "PV_RUN_ROOT": str(run_root),
-            "PV_PROMPT_FILE": str(prompt_path),
-        }
-    )
-
     cli_cmd = [
         cmd,
         "exec",
@@ -1121,30 +1909,42 @@ def run_codex_for_job(
     log(f"Running Codex CLI for job {job!r}")
     proc = subprocess.Popen(
         cli_cmd,
-        text=True,
+        stdin=subprocess.DEVNULL,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        env=env,
+        env={
+            **os.environ,
+            "PV_RUN_ID": job.job_id,
+            "PV_RUN_ROOT": str(run_root),
+            "PV_PROMPT_FILE": str(prompt_path),
+        },
     )
     job_writer.update(pid=proc.pid)
     stop_event = threading.Event()
     abort_event = threading.Event()
     heartbeat_thread = _start_job_heartbeat(proc, job_writer, stop_event, abort_event)
 
-    stdout = ""
-    stderr = ""
-    try:
-        stdout, stderr = proc.communicate()
-    finally:
-        stop_event.set()
-        heartbeat_thread.join()
-
-    _append_to_job_log(job_writer.log_path, stdout, stderr)
-
-    if stdout:
-        log(f"codex STDOUT:\n{stdout.rstrip()}")
-    if stderr:
-        log(f"codex STDERR:\n{stderr.rstrip()}")
+    assert proc.stdout is not None and proc.stderr is not None
+    with job_writer.log_path.open("ab") as log_fp:
+        sink = _JobLogSink(log_fp)
+        tees = [
+            _start_output_tee(proc.stdout, "STDOUT", sink),
+            _start_output_tee(proc.stderr, "STDERR", sink),
+        ]
+        try:
+            while True:
+                try:
+                    proc.wait(timeout=JOB_LOG_FLUSH_SECONDS)
+                except subprocess.TimeoutExpired:
+                    sink.flush()
+                else:
+                    break
+        finally:
+            stop_event.set()
+            heartbeat_thread.join()
+            for tee in tees:
+                tee.join()
+            sink.flush()
 
     exit_code = proc.returncode
     finished_at = now_utc_iso()
@@ -1165,6 +1965,140 @@ def run_codex_for_job(
     job_writer.finalize(state="succeeded", exit_code=exit_code, finished_at=finished_at)
 
 
+def _fast_forward_to_origin(
+    repo_dir: Path, base_branch: str, logger: logging.Logger
+) -> bool:
+    """
+    Bring the checked-out base branch up to origin's tip, like ``pull --ff-only``.
+
+    prepare_branch already reset the checkout to origin at job start, so the
+    tips usually still match and the merge step is skipped.
+    """
+    rc, out, err = run_cmd(
+        ["git", "fetch", "--quiet", "origin", base_branch], cwd=repo_dir
+    )
+    if rc != 0:
+        logger.error("PR: git fetch failed (rc=%s): %s\n%s", rc, out, err)
+        return False
+
+    upstream = f"origin/{base_branch}"
+    rc, out, err = run_cmd(["git", "rev-parse", "HEAD", upstream], cwd=repo_dir)
+    if rc != 0:
+        logger.error("PR: git rev-parse failed (rc=%s): %s\n%s", rc, out, err)
+        return False
+    head, _, upstream_sha = out.strip().partition("\n")
+    if head == upstream_sha:
+        return True
+
+    rc, out, err = run_cmd(["git", "merge", "--ff-only", upstream], cwd=repo_dir)
+    if rc != 0:
+        logger.error("PR: git merge --ff-only failed (rc=%s): %s\n%s", rc, out, err)
+        return False
+    return True
+
+
+def _pygit2_commit_on_new_branch(
+    repo_dir: Path, branch_name: str, message: str
+) -> Optional[bool]:
+    """
+    Stage everything and commit it onto a new ``branch_name``, in-process.
+
+    Replaces the ``checkout -b`` / ``add -A`` / ``commit`` subprocesses. Returns
+    True once committed, False if there was nothing to commit, and None when
+    pygit2 cannot do it (not installed, no committer identity, ...) so the
+    caller falls back to the git CLI.
+    """
+    repo = _pygit2_repo(repo_dir)
+    if repo is None:
+        return None
+    index = repo.index
+    try:
+        # The cached repository may predate the CLI checkout/pull just run.
+        index.read(False)
+        parent = repo.head.peel(pygit2.Commit)
+        index.add_all()
+        tree = index.write_tree()
+        if tree == parent.tree_id:
+            index.read(True)
+            return False
+        signature = repo.default_signature
+        ref = f"refs/heads/{branch_name}"
+        if ref in repo.references:
+            index.read(True)
+            return None
+        repo.create_commit(ref, signature, signature, message, tree, [parent.id])
+        repo.set_head(ref)
+        index.write()
+    except (pygit2.GitError, KeyError, ValueError) as exc:
+        # Drop the in-memory staging so the CLI fallback starts from disk.
+        index.read(True)
+        log(f"pygit2 could not commit in {repo_dir}: {exc}; using git.")
+        return None
+    return True
+
+
+def _cli_commit_on_new_branch(
+    repo_dir: Path, branch_name: str, message: str, logger: logging.Logger
+) -> bool:
+    """``checkout -b`` / ``add -A`` / ``commit`` via git; False on any failure."""
+    rc, out, err = run_cmd(["git", "checkout", "-b", branch_name], cwd=repo_dir)
+    if rc != 0:
+        logger.error(
+            "PR: git checkout -b %s failed (rc=%s): %s\n%s",
+            branch_name,
+            rc,
+            out,
+            err,
+        )
+        return False
+
+    rc, out, err = run_cmd(["git", "add", "-A"], cwd=repo_dir)
+    if rc != 0:
+        logger.error("PR: git add -A failed (rc=%s): %s\n%s", rc, out, err)
+        return False
+
+    rc, out, err = run_cmd(["git", "commit", "-m", message], cwd=repo_dir)
+    if rc != 0:
+        if "nothing to commit" in out.lower() or "nothing to commit" in err.lower():
+            logger.info("PR: nothing to commit after git add; skipping PR.")
+        else:
+            logger.error("PR: git commit failed (rc=%s): %s\n%s", rc, out, err)
+        return False
+    return True
+
+
+def _worktree_has_changes(repo_dir: Path, logger: logging.Logger) -> Optional[bool]:
+    """
+    Return whether ``repo_dir`` has anything to commit, or None if git failed.
+
+    Cheaper than ``git status --porcelain``: each probe stops at the first
+    difference, and later probes only run while the tree still looks clean.
+    """
+    for probe in (["git", "diff", "--quiet"], ["git", "diff", "--cached", "--quiet"]):
+        rc, out, err = run_cmd(probe, cwd=repo_dir)
+        if rc == 1:
+            return True
+        if rc != 0:
+            logger.error("PR: %s failed (rc=%s): %s\n%s", " ".join(probe), rc, out, err)
+            return None
+    rc, out, err = run_cmd(
+        [
+            "git",
+            "ls-files",
+            "--others",
+            "--exclude-standard",
+            "--directory",
+            "--no-empty-directory",
+            "-z",
+        ],
+        cwd=repo_dir,
+    )
+    if rc != 0:
+        logger.error("PR: git ls-files failed (rc=%s): %s\n%s", rc, out, err)
+        return None
+    return bool(out)
+
+
 def create_pr_for_job(job: Job, repo_dir: Path, logger: logging.Logger) -> None:
     """
     From a clean repo with Codex changes applied, create a branch, commit, push,
@@ -1174,12 +2108,11 @@ def create_pr_for_job(job: Job, repo_dir: Path, logger: logging.Logger) -> None:
     watcher can continue processing future jobs.
     """
 
-    rc, out, err = run_cmd(["git", "status", "--porcelain"], cwd=repo_dir)
-    if rc != 0:
-        logger.error("PR: git status failed (rc=%s): %s\n%s", rc, out, err)
+    has_changes = _worktree_has_changes(repo_dir, logger)
+    if has_changes is None:
         return
 
-    if not out.strip():
+    if not has_changes:
         logger.info("PR: no changes detected, skipping PR creation.")
         return
 
@@ -1199,11 +2132,8 @@ def create_pr_for_job(job: Job, repo_dir: Path, logger: logging.Logger) -> None:
         base_branch,
     )
 
-    prompt_slug = (
-        job.inbox_rel.stem.replace(" ", "-").replace("_", "-").replace(".", "-")
-    )
     timestamp = job.job_id
-    branch_name = f"codex/{prompt_slug}-{timestamp}"
+    branch_name = f"codex/{job.prompt_slug}-{timestamp}"
 
     logger.info("PR: preparing branch %s", branch_name)
 
@@ -1218,25 +2148,7 @@ def create_pr_for_job(job: Job, repo_dir: Path, logger: logging.Logger) -> None:
         )
         return
 
-    rc, out, err = run_cmd(["git", "pull", "--ff-only"], cwd=repo_dir)
-    if rc != 0:
-        logger.error("PR: git pull failed (rc=%s): %s\n%s", rc, out, err)
-        return
-
-    rc, out, err = run_cmd(["git", "checkout", "-b", branch_name], cwd=repo_dir)
-    if rc != 0:
-        logger.error(
-            "PR: git checkout -b %s failed (rc=%s): %s\n%s",
-            branch_name,
-            rc,
-            out,
-            err,
-        )
-        return
-
-    rc, out, err = run_cmd(["git", "add", "-A"], cwd=repo_dir)
-    if rc != 0:
-        logger.error("PR: git add -A failed (rc=%s): %s\n%s", rc, out, err)
+    if not _fast_forward_to_origin(repo_dir, base_branch, logger):
         return
 
     title = f"Codex: {job.inbox_rel.name}"
@@ -1253,18 +2165,20 @@ def create_pr_for_job(job: Job, repo_dir: Path, logger: logging.Logger) -> None:
 
     commit_msg = f"{title} (job {job.job_id})"
 
-    rc, out, err = run_cmd(["git", "commit", "-m", commit_msg], cwd=repo_dir)
-    if rc != 0:
-        if "nothing to commit" in out.lower() or "nothing to commit" in err.lower():
-            logger.info("PR: nothing to commit after git add; skipping PR.")
-        else:
-            logger.error("PR: git commit failed (rc=%s): %s\n%s", rc, out, err)
+    committed = _pygit2_commit_on_new_branch(repo_dir, branch_name, commit_msg)
+    if committed is False:
+        logger.info("PR: nothing to commit after git add; skipping PR.")
+        return
+    if committed is None and not _cli_commit_on_new_branch(
+        repo_dir, branch_name, commit_msg, logger
+    ):
         return
 
     rc, out, err = run_cmd(["git", "push", "-u", "origin", branch_name], cwd=repo_dir)
     if rc != 0:
         logger.error("PR: git push failed (rc=%s): %s\n%s", rc, out, err)
         return
+    invalidate_remote_branch_names(repo_dir)
 
     rc, out, err = run_cmd(
         [
@@ -1297,11 +2211,11 @@ def run_prompt_job(job: Job) -> bool:
     - run Codex
     - create a PR if Codex changed anything
     """
-    repos_root = Path(CONFIG["repos_root"]).expanduser().resolve()
+    repos_root = _resolved_root(str(CONFIG["repos_root"]))
 
     logger = logging.getLogger("codex_watcher")
 
-    original_prompt_path = Path(CONFIG["inbox"]) / job.inbox_rel
+    original_prompt_path = _config_path("inbox") / job.inbox_rel
     repo_dir = derive_repo_root_from_prompt(CONFIG, str(original_prompt_path))
     repo_dir = ensure_repo_cloned(repos_root, job.git_owner, job.repo_name)
 
@@ -1311,13 +2225,13 @@ def run_prompt_job(job: Job) -> bool:
             "Git preflight: unrecoverable git error; skipping Codex run for %s.",
             job.prompt_path,
         )
-        JOB_STATES.pop(_job_key(job.inbox_rel), None)
+        JOB_STATES.pop(job.key, None)
         return False
 
     job_branch = job.branch_name
     prepare_branch(repo_dir, job_branch, base_branch=base_branch)
 
-    runs_root = Path(CONFIG["runs"])
+    runs_root = _config_path("runs")
     job_meta_dir = runs_root / job.job_id
     job_meta_dir.mkdir(parents=True, exist_ok=True)
     job_log_path = job_meta_dir / JOB_LOG_NAME
@@ -1410,7 +2324,7 @@ def worker(job_queue: "queue.Queue[Job]", stop_event: threading.Event) -> None:
             success = run_prompt_job(job)
         except Exception as exc:
             log(f"Error processing {job.inbox_path}: {exc!r}")
-            JOB_STATES[_job_key(job.inbox_rel)] = STATUS_ERROR
+            JOB_STATES[job.key] = STATUS_ERROR
             finalize_inbox_prompt(
                 inbox_root=inbox_root,
                 finished_root=finished_root,
@@ -1424,7 +2338,7 @@ def worker(job_queue: "queue.Queue[Job]", stop_event: threading.Event) -> None:
                     job.inbox_rel,
                 )
                 continue
-            JOB_STATES[_job_key(job.inbox_rel)] = STATUS_DONE
+            JOB_STATES[job.key] = STATUS_DONE
             finalize_inbox_prompt(
                 inbox_root=inbox_root,
                 finished_root=finished_root,
@@ -1435,6 +2349,68 @@ def worker(job_queue: "queue.Queue[Job]", stop_event: threading.Event) -> None:
             job_queue.task_done()
 
 
+class _ShardQueue(queue.Queue):
+    """One worker's queue; reports finished jobs back to its ShardedJobQueue."""
+
+    def __init__(self, owner: "ShardedJobQueue", index: int) -> None:
+        super().__init__()
+        self._owner = owner
+        self._index = index
+        # Jobs handed to the (single) consumer and not yet marked done.
+        self._in_hand: collections.deque[Job] = collections.deque()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Job:
+        job = super().get(block, timeout)
+        self._in_hand.append(job)
+        return job
+
+    def task_done(self) -> None:
+        super().task_done()
+        self._owner._finished(self._index, self._in_hand.popleft())
+
+
+class ShardedJobQueue:
+    """
+    Fan jobs out to one queue per worker thread, keyed by (owner, repo).
+
+    Jobs for different repos run concurrently, while every job for a given
+    repo lands on the same worker, so two jobs never share a checkout (or its
+    index lock) at the same time. A repo with no outstanding jobs is placed on
+    the least-loaded worker, so two busy repos never end up queued behind each
+    other just because their keys collide.
+    """
+
+    def __init__(self, shards: int) -> None:
+        self.queues: list["queue.Queue[Job]"] = [
+            _ShardQueue(self, index) for index in range(max(1, shards))
+        ]
+        self._lock = threading.Lock()
+        self._load = [0] * len(self.queues)
+        # (owner, repo) -> [shard index, outstanding jobs]
+        self._repos: Dict[Tuple[str, str], list[int]] = {}
+
+    def put(self, job: Job) -> None:
+        key = (job.git_owner, job.repo_name)
+        with self._lock:
+            entry = self._repos.get(key)
+            if entry is None:
+                idlest = min(range(len(self._load)), key=self._load.__getitem__)
+                entry = self._repos[key] = [idlest, 0]
+            entry[1] += 1
+            shard = entry[0]
+            self._load[shard] += 1
+        self.queues[shard].put(job)
+
+    def _finished(self, shard: int, job: Job) -> None:
+        key = (job.git_owner, job.repo_name)
+        with self._lock:
+            self._load[shard] -= 1
+            entry = self._repos[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._repos[key]
+
+
 def _prepare_run_copy(
     job_record: queue_runtime.JobRecord, processed_root: Path
 ) -> tuple[Path, Path]:
@@ -1447,7 +2423,7 @@ def _prepare_run_copy(
     )
     run_root.mkdir(parents=True, exist_ok=True)
     prompt_copy = run_root / "prompt.md"
-    shutil.copy2(job_record.inbox_file, prompt_copy)
+    _link_or_copy(Path(job_record.inbox_file), prompt_copy)
     return run_root, prompt_copy
 
 
@@ -1498,7 +2474,7 @@ def _handle_queue_failure(
         queue_job = queue_runtime.mark_failed(
             queue_job, retryable=True, reason=failure_reason
         )
-        _emit_job_event(
+        failed_event = _format_job_event(
             "job.failed.retryable",
             job_record=queue_job,
             extra={
@@ -1507,10 +2483,15 @@ def _handle_queue_failure(
             },
         )
         queue_job = queue_runtime.requeue(queue_job)
-        _emit_job_event(
-            "job.requeued",
-            job_record=queue_job,
-            extra={"retries": queue_job.retries},
+        _emit_job_events(
+            [
+                failed_event,
+                _format_job_event(
+                    "job.requeued",
+                    job_record=queue_job,
+                    extra={"retries": queue_job.retries},
+                ),
+            ]
         )
         return queue_job
 
@@ -1524,17 +2505,23 @@ def _handle_queue_failure(
         reason=failure_reason,
         archived_path=str(archived_path) if archived_path else None,
     )
+    events = []
     if archived_path:
-        _emit_job_event(
-            "job.archived",
+        events.append(
+            _format_job_event(
+                "job.archived",
+                job_record=queue_job,
+                extra={"archived_path": str(archived_path)},
+            )
+        )
+    events.append(
+        _format_job_event(
+            "job.failed.final",
             job_record=queue_job,
-            extra={"archived_path": str(archived_path)},
+            extra={"failure_reason": failure_reason},
         )
-    _emit_job_event(
-        "job.failed.final",
-        job_record=queue_job,
-        extra={"failure_reason": failure_reason},
     )
+    _emit_job_events(events)
     job_rel = job.inbox_rel if job else Path(queue_job.inbox_rel)
     JOB_STATES[_job_key(job_rel)] = STATUS_ERROR
     return queue_job
@@ -1621,20 +2608,24 @@ def _process_queue_job(
         queue_job, processed_path=str(archived_path)
     )
     duration = (dt.datetime.utcnow() - started_at).total_seconds()
-    _emit_job_event(
-        "job.succeeded",
-        job_record=queue_job,
-        extra={
-            "duration": duration,
-            "processed_path": str(archived_path),
-        },
-    )
-    _emit_job_event(
-        "job.archived",
-        job_record=queue_job,
-        extra={"archived_path": str(archived_path)},
+    _emit_job_events(
+        [
+            _format_job_event(
+                "job.succeeded",
+                job_record=queue_job,
+                extra={
+                    "duration": duration,
+                    "processed_path": str(archived_path),
+                },
+            ),
+            _format_job_event(
+                "job.archived",
+                job_record=queue_job,
+                extra={"archived_path": str(archived_path)},
+            ),
+        ]
     )
-    JOB_STATES[_job_key(job.inbox_rel)] = STATUS_DONE
+    JOB_STATES[job.key] = STATUS_DONE
 
 
 def _queue_executor_loop(
@@ -1647,9 +2638,12 @@ def _queue_executor_loop(
     stop_event: threading.Event,
 ) -> None:
     while not stop_event.is_set():
+        # Clear before looking, so an enqueue racing with an empty scan still
+        # cuts the wait short.
+        _QUEUE_WAKEUP.clear()
         job_record = queue_runtime.get_next_queued_job(queue_root)
         if job_record is None:
-            time.sleep(POLL_INTERVAL_SECONDS)
+            _QUEUE_WAKEUP.wait(POLL_INTERVAL_SECONDS)
             continue
         try:
             _process_queue_job(
@@ -1697,7 +2691,7 @@ def _drain_queue_once(
 
 
 def main(argv: Optional[list] = None) -> int:
-    global CONFIG, INBOX_MODE
+    global CONFIG, INBOX_MODE, _DEFERRED_MOVES
 
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -1768,7 +2762,7 @@ def main(argv: Optional[list] = None) -> int:
                 success = run_prompt_job(job)
             except Exception as exc:  # pragma: no cover
                 log(f"Error processing {job.inbox_path}: {exc!r}")
-                JOB_STATES[_job_key(job.inbox_rel)] = STATUS_ERROR
+                JOB_STATES[job.key] = STATUS_ERROR
                 finalize_inbox_prompt(
                     inbox_root=inbox_root,
                     finished_root=finished_root,
@@ -1784,7 +2778,7 @@ def main(argv: Optional[list] = None) -> int:
                     )
                     job_queue.task_done()
                     continue
-                JOB_STATES[_job_key(job.inbox_rel)] = STATUS_DONE
+                JOB_STATES[job.key] = STATUS_DONE
                 finalize_inbox_prompt(
                     inbox_root=inbox_root,
                     finished_root=finished_root,
@@ -1797,7 +2791,8 @@ def main(argv: Optional[list] = None) -> int:
         return 0
 
     stop_event = threading.Event()
-    job_queue: Optional["queue.Queue[Job]"] = None
+    job_queue: Optional[ShardedJobQueue] = None
+    threads: list[threading.Thread] = []
     log(f"Starting Codex watcher on {inbox_root}")
 
     if queue_enabled:
@@ -1811,11 +2806,16 @@ def main(argv: Optional[list] = None) -> int:
             },
             daemon=True,
         )
+        threads.append(t)
     else:
-        job_queue = queue.Queue()
-        t = threading.Thread(target=worker, args=(job_queue, stop_event), daemon=True)
-
-    t.start()
+        parallelism = int(CONFIG.get("watcher", {}).get("parallelism", 1))
+        job_queue = ShardedJobQueue(parallelism)
+        for shard_queue in job_queue.queues:
+            threads.append(
+                threading.Thread(
+                    target=worker, args=(shard_queue, stop_event), daemon=True
+                )
+            )
 
     def _handle_sigterm(signum, frame):  # pragma: no cover
         log(f"Received signal {signum}, stopping watcher...")
@@ -1824,20 +2824,76 @@ def main(argv: Optional[list] = None) -> int:
     signal.signal(signal.SIGTERM, _handle_sigterm)
     signal.signal(signal.SIGINT, _handle_sigterm)
 
+    observer: Any = None
     try:
+        # Load the persisted job states before any worker can write to them.
+        JOB_STATES.open(pv_root / ".watcher_state.db", inbox_root, finished_root)
+        _DEFERRED_MOVES = DeferredMoves(pv_root / ".pending_finalize.json")
+        _DEFERRED_MOVES.start()
+        for t in threads:
+            t.start()
+        observer, events = _start_inbox_observer(inbox_root)
+        next_reconcile = 0.0
+
         while not stop_event.is_set():
-            claim_new_prompts(inbox_root)
-            start_jobs_from_running(
-                inbox_root,
-                processed_root,
-                job_queue,
-                queue_enabled=queue_enabled,
-                queue_root=queue_root,
-            )
-            time.sleep(POLL_INTERVAL_SECONDS)
+            if events is None:
+                claim_new_prompts(inbox_root)
+                start_jobs_from_running(
+                    inbox_root,
+                    processed_root,
+                    job_queue,
+                    queue_enabled=queue_enabled,
+                    queue_root=queue_root,
+                )
+                time.sleep(POLL_INTERVAL_SECONDS)
+                continue
+
+            events.wait(POLL_INTERVAL_SECONDS)
+            complete, created, running = events.drain()
+            if time.monotonic() >= next_reconcile:
+                # Cold start, then periodically: walk the whole inbox to pick up
+                # files written while we were down and jobs left for retry.
+                for path in claim_new_prompts(inbox_root):
+                    events.add(path)
+                start_jobs_from_running(
+                    inbox_root,
+                    processed_root,
+                    job_queue,
+                    queue_enabled=queue_enabled,
+                    queue_root=queue_root,
+                )
+                next_reconcile = time.monotonic() + RECONCILE_INTERVAL_SECONDS
+                continue
+
+            if complete:
+                claim_new_prompts(inbox_root, complete, debounce_seconds=0.0)
+            if created:
+                # Only seen being created: keep the mtime debounce, and look
+                # again later at prompts that are still being written.
+                for path in claim_new_prompts(inbox_root, created):
+                    events.add(path)
+            if running:
+                start_jobs_from_running(
+                    inbox_root,
+                    processed_root,
+                    job_queue,
+                    queue_enabled=queue_enabled,
+                    queue_root=queue_root,
+                    candidates=running,
+                )
     finally:
         stop_event.set()
-        t.join()
+        _QUEUE_WAKEUP.set()
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        for t in threads:
+            if t.is_alive():
+                t.join()
+        if _DEFERRED_MOVES is not None:
+            _DEFERRED_MOVES.stop()
+            _DEFERRED_MOVES = None
+        JOB_STATES.close()
 
     return 0
 
@@ -5,11 +5,11 @@ from __future__ import annotations
 
 from nicegui import ui
 
-from prompt_valet.ui import UISettings, create_ui_app
+from prompt_valet.ui import create_ui_app, get_ui_settings
 
 
 def main() -> None:
-    settings = UISettings.load()
+    settings = get_ui_settings()
     create_ui_app(settings)
     ui.run(
         host=settings.ui_bind_host, port=settings.ui_bind_port, reload=False, workers=1
@@ -69,6 +69,9 @@ import os
 import re
 import shutil
 import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable, Dict, Any, List, Set, Tuple
 
@@ -78,6 +81,16 @@ from urllib.error import HTTPError, URLError
 
 import yaml
 
+try:  # libyaml's C loader when PyYAML was built against it.
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on the install
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+try:  # Optional: libgit2 bindings let us list heads without forking git.
+    import pygit2
+except ImportError:  # pragma: no cover - depends on the install
+    pygit2 = None  # type: ignore[assignment]
+
 # Filesystem layout
 DEFAULT_INBOX_ROOT = Path("/srv/prompt-valet/inbox")
 DEFAULT_REPOS_ROOT = Path("/srv/repos")
@@ -88,13 +101,45 @@ CONFIG_ENV_VAR = "PV_CONFIG_PATH"
 
 REPO_KEY_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
 
+# Upper bound on concurrent ``git ls-remote`` calls for local clones.
+LS_REMOTE_WORKERS = 16
+# Upper bound on concurrent ``shutil.rmtree`` calls for stale inbox branches.
+RMTREE_WORKERS = 8
+
 
 def is_valid_repo_key(repo_key: str) -> bool:
     return bool(REPO_KEY_PATTERN.fullmatch(repo_key))
 
 
+# While main() runs, log lines are buffered and written out at phase boundaries
+# (or every _LOG_FLUSH_LINES lines); a full rebuild logs several lines per branch
+# and one write+flush each adds up under journald. Library callers get each line
+# straight away. ls-remote and rmtree worker threads log too, so the buffer is
+# only touched under _LOG_LOCK.
+_LOG_BUF: List[str] = []
+_LOG_LOCK = threading.Lock()
+_LOG_BUFFERED = False
+_LOG_FLUSH_LINES = 200
+
+
 def log(msg: str) -> None:
-    print(f"[rebuild_inbox_tree] {msg}", flush=True)
+    if not _LOG_BUFFERED:
+        print(f"[rebuild_inbox_tree] {msg}", flush=True)
+        return
+    with _LOG_LOCK:
+        _LOG_BUF.append(f"[rebuild_inbox_tree] {msg}\n")
+        full = len(_LOG_BUF) >= _LOG_FLUSH_LINES
+    if full:
+        _flush_log()
+
+
+def _flush_log() -> None:
+    # Writing under the lock keeps concurrent flushes from interleaving batches.
+    with _LOG_LOCK:
+        if _LOG_BUF:
+            sys.stdout.write("".join(_LOG_BUF))
+            _LOG_BUF.clear()
+        sys.stdout.flush()
 
 
 # --- Config loading (YAML) --------------------------------------------------
@@ -170,7 +215,9 @@ def load_config() -> tuple[Dict[str, Any], bool]:
     else:
         loaded_path = str(path)
         try:
-            user_cfg = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+            user_cfg = (
+                yaml.load(path.read_text(encoding="utf-8"), Loader=_YamlLoader) or {}
+            )
             if not isinstance(user_cfg, dict):
                 raise ValueError("YAML config is not a mapping at the top level.")
 
@@ -209,8 +256,26 @@ def load_config() -> tuple[Dict[str, Any], bool]:
 # --- Git / inbox helpers ----------------------------------------------------
 
 
-def is_git_repo(path: Path) -> bool:
-    return (path / ".git").is_dir()
+def is_git_repo(path: str | Path) -> bool:
+    return os.path.isdir(os.path.join(path, ".git"))
+
+
+def _subdir_entries(path: Path) -> List[os.DirEntry[str]]:
+    """
+    Return the directory entries directly under ``path``, sorted by name.
+
+    ``os.scandir`` reports the entry type from the directory listing itself,
+    so this avoids a separate ``stat`` per child that ``Path.is_dir`` costs.
+    """
+    with os.scandir(path) as entries:
+        return sorted(
+            (entry for entry in entries if entry.is_dir()), key=lambda e: e.name
+        )
+
+
+def _is_empty_dir(path: Path) -> bool:
+    with os.scandir(path) as entries:
+        return next(entries, None) is None
 
 
 def repo_missing_from_stderr(stderr: str) -> bool:
@@ -230,15 +295,13 @@ def discover_repos(root: Path) -> Iterable[Path]:
     if not root.is_dir():
         log(f"Repos root {root} does not exist or is not a directory.")
         return []
-    for child in sorted(root.iterdir()):
-        if not child.is_dir():
-            continue
-        if is_git_repo(child):
-            yield child
+    for child in _subdir_entries(root):
+        if is_git_repo(child.path):
+            yield Path(child.path)
             continue
-        for grandchild in sorted(child.iterdir()):
-            if grandchild.is_dir() and is_git_repo(grandchild):
-                yield grandchild
+        for grandchild in _subdir_entries(Path(child.path)):
+            if is_git_repo(grandchild.path):
+                yield Path(grandchild.path)
 
 
 def _extract_next_link(link_header: str | None) -> str | None:
@@ -337,7 +400,6 @@ def run_git_ls_remote(
         result = subprocess.run(
             args,
             cwd=str(cwd) if cwd else None,
-            text=True,
             capture_output=True,
             check=False,
         )
@@ -345,31 +407,55 @@ def run_git_ls_remote(
         log(f"git ls-remote failed for {target}: {exc}")
         return False, [], str(exc)
 
+    stderr = result.stderr.decode("utf-8", errors="replace")
     success = result.returncode == 0
     if not success:
         log(
             "git ls-remote for "
-            f"{target} failed (exit {result.returncode}): {result.stderr.strip()}"
+            f"{target} failed (exit {result.returncode}): {stderr.strip()}"
         )
     refs: List[str] = []
     if success:
-        for line in result.stdout.splitlines():
-            parts = line.strip().split()
-            if len(parts) < 2:
+        # Each line is b"<sha>\t<ref>"; parse the raw bytes and decode only the
+        # ref names we keep instead of decoding the whole listing up front.
+        prefix = b"refs/heads/" if heads_only else b""
+        for line in result.stdout.split(b"\n"):
+            _, tab, ref = line.partition(b"\t")
+            if not tab:
                 continue
-            ref = parts[1]
-            if heads_only and ref.startswith("refs/heads/"):
-                refs.append(ref[len("refs/heads/") :])
-            elif heads_only:
-                continue
-            else:
-                refs.append(ref)
+            ref = ref.strip()
+            if ref and ref.startswith(prefix):
+                refs.append(ref[len(prefix) :].decode("utf-8", errors="replace"))
+
+    return success, refs, stderr
 
-    return success, refs, result.stderr
+
+def _pygit2_remote_branches(repo_path: Path) -> List[str] | None:
+    """
+    List origin's heads in-process via pygit2.
+
+    Returns None when pygit2 is not installed or libgit2 cannot reach the
+    remote (e.g. it needs git's credential helpers), so callers fall back to
+    the ``git ls-remote`` subprocess.
+    """
+    if pygit2 is None:
+        return None
+    try:
+        remote = pygit2.Repository(str(repo_path)).remotes["origin"]
+        heads = remote.list_heads()
+    except (pygit2.GitError, KeyError, ValueError, AttributeError) as exc:
+        # AttributeError covers pygit2 builds without Remote.list_heads (<1.15).
+        log(f"pygit2 could not list heads for {repo_path}: {exc}; using git.")
+        return None
+    prefix = "refs/heads/"
+    return [head.name[len(prefix) :] for head in heads if head.name.startswith(prefix)]
 
 
 def list_remote_branches(repo_path: Path) -> List[str]:
     """Return a list of remote branch names (without 'origin/' prefix)."""
+    branches = _pygit2_remote_branches(repo_path)
+    if branches is not None:
+        return branches
     success, branches, _ = run_git_ls_remote("origin", heads_only=True, cwd=repo_path)
     if not success:
         log(f"Failed to list remote branches for {repo_path}")
@@ -377,35 +463,53 @@ def list_remote_branches(repo_path: Path) -> List[str]:
     return branches
 
 
+def prefetch_remote_branches(repo_paths: Iterable[Path]) -> Dict[Path, List[str]]:
+    """
+    List remote branches for several repos at once.
+
+    Each ``git ls-remote`` is dominated by network round-trips, so the calls
+    run on a thread pool and the total wait is roughly the slowest remote
+    rather than the sum of all of them.
+    """
+    paths = list(repo_paths)
+    if not paths:
+        return {}
+    workers = min(LS_REMOTE_WORKERS, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(list_remote_branches, paths)))
+
+
 def filter_branches_for_inbox(
     branches: List[str],
     *,
     branch_mode: str,
-    whitelist: List[str],
-    blacklist: List[str],
-    name_blacklist: List[str],
+    whitelist: Iterable[str],
+    blacklist: Iterable[str],
+    name_blacklist: Iterable[str],
 ) -> List[str]:
     """
     Apply config-driven filters and path-safety rules to decide which
     branch names should get an inbox directory.
     """
+    # Membership tests run once per remote head, so hash the lists up front.
+    wl_set = frozenset(whitelist)
+    name_blocked = frozenset(name_blacklist)
+
     filtered: List[str] = []
     for br in branches:
-        if br in name_blacklist:
+        if br in name_blocked:
             log(f"  Dropping branch {br!r} (name_blacklist)")
             continue
         filtered.append(br)
     branches = filtered
 
     if branch_mode == "whitelist":
-        wl = set(whitelist)
-        branches = [b for b in branches if b in wl]
+        branches = [b for b in branches if b in wl_set]
     elif branch_mode == "blacklist":
         bl_prefixes = tuple(blacklist)
         branches = [b for b in branches if not b.startswith(bl_prefixes)]
 
     safe: List[str] = []
-    wl_set = set(whitelist)
     for br in branches:
         if "/" in br and br not in wl_set:
             log(
@@ -427,17 +531,33 @@ def ensure_inbox_dir(repo_key: str, branch: str) -> Path:
 
 def remove_inbox_dir(path: Path, reason: str) -> None:
     """Remove an inbox branch directory and write an ERROR.md explaining why."""
-    if not path.is_dir():
+    remove_inbox_dirs([path], reason)
+
+
+def remove_inbox_dirs(paths: Iterable[Path], reason: str) -> None:
+    """
+    Remove several inbox branch directories, leaving an ERROR.md in each.
+
+    The subtrees are independent, so the deletes fan out on a thread pool;
+    the markers are only written once every ``rmtree`` has finished.
+    """
+    doomed = [path for path in paths if path.is_dir()]
+    if not doomed:
         return
 
-    log(
-        f"Removing inbox branch {path} because it no longer maps to a valid "
-        f"upstream branch ({reason})."
-    )
-    shutil.rmtree(path)
-    path.mkdir(parents=True, exist_ok=True)
+    for path in doomed:
+        log(
+            f"Removing inbox branch {path} because it no longer maps to a valid "
+            f"upstream branch ({reason})."
+        )
+    # An empty folder (nothing was ever uploaded to the branch) only needs the
+    # marker, so skip the rmtree/mkdir round-trip for it.
+    populated = [path for path in doomed if not _is_empty_dir(path)]
+    if populated:
+        workers = min(RMTREE_WORKERS, len(populated))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(shutil.rmtree, populated))
 
-    error_path = path / "ERROR.md"
     error_text = (
         "# Invalid inbox branch\n\n"
         f"This folder did not correspond to any real git branch.\n\n"
@@ -446,8 +566,12 @@ def remove_inbox_dir(path: Path, reason: str) -> None:
         "If you believe this is an error, check your repo's branch names "
         "and the tree_builder configuration.\n"
     )
-    error_path.write_text(error_text, encoding="utf-8")
-    log(f"Wrote error marker: {error_path}")
+    for path in populated:
+        path.mkdir(parents=True, exist_ok=True)
+    for path in doomed:
+        error_path = path / "ERROR.md"
+        error_path.write_text(error_text, encoding="utf-8")
+        log(f"Wrote error marker: {error_path}")
 
 
 def _write_repo_error(path: Path, reason: str) -> Path:
@@ -535,16 +659,20 @@ def sync_inbox_branches(repo_key: str, wanted: Iterable[str], reason: str) -> No
     for br in sorted(wanted_set):
         ensure_inbox_dir(repo_key, br)
 
-    existing = {child.name for child in repo_root.iterdir() if child.is_dir()}
-    for stale in sorted(existing - wanted_set):
-        remove_inbox_dir(repo_root / stale, reason=reason)
+    existing = {entry.name for entry in _subdir_entries(repo_root)}
+    remove_inbox_dirs(
+        (repo_root / stale for stale in sorted(existing - wanted_set)), reason=reason
+    )
 
 
-def reconcile_local_repo(repo_path: Path, tb_cfg: Dict[str, Any]) -> None:
+def reconcile_local_repo(
+    repo_path: Path, tb_cfg: Dict[str, Any], branches: List[str] | None = None
+) -> None:
     repo_key = repo_path.name
     log(f"Processing local repo {repo_key}")
 
-    branches = list_remote_branches(repo_path)
+    if branches is None:
+        branches = list_remote_branches(repo_path)
     if not branches:
         log(f"  No remote branches found for {repo_key}.")
 
@@ -602,6 +730,16 @@ def reconcile_upstream_repo(
 
 
 def main() -> None:
+    global _LOG_BUFFERED
+    _LOG_BUFFERED = True
+    try:
+        _rebuild_inbox_tree()
+    finally:
+        _LOG_BUFFERED = False
+        _flush_log()
+
+
+def _rebuild_inbox_tree() -> None:
     cfg, upstream_enabled = load_config()
     tb_cfg = cfg.get("tree_builder", {})
     watcher_cfg = cfg.get("watcher", {})
@@ -619,7 +757,7 @@ def main() -> None:
     local_repos = {repo.name: repo for repo in discover_repos(REPOS_ROOT)}
     repo_keys: Set[str] = set(local_repos)
     if INBOX_ROOT.is_dir():
-        repo_keys.update(child.name for child in INBOX_ROOT.iterdir() if child.is_dir())
+        repo_keys.update(entry.name for entry in _subdir_entries(INBOX_ROOT))
     existing_repo_keys = set(repo_keys)
 
     upstream_only_repos: Set[str] = set()
@@ -657,6 +795,14 @@ def main() -> None:
             repo_root.mkdir(parents=True, exist_ok=True)
             log(f"Eager mode: ensured inbox repo root {repo_root}")
 
+    _flush_log()
+
+    remote_branches = prefetch_remote_branches(
+        local_repos[repo_key]
+        for repo_key in sorted(repo_keys)
+        if repo_key in local_repos and is_valid_repo_key(repo_key)
+    )
+
     for repo_key in sorted(repo_keys):
         repo_root = INBOX_ROOT / repo_key
         if not is_valid_repo_key(repo_key):
@@ -665,7 +811,8 @@ def main() -> None:
             )
             continue
         if repo_key in local_repos:
-            reconcile_local_repo(local_repos[repo_key], tb_cfg)
+            repo_path = local_repos[repo_key]
+            reconcile_local_repo(repo_path, tb_cfg, remote_branches[repo_path])
         else:
             if repo_key in upstream_only_repos:
                 log(
@@ -684,6 +831,7 @@ def main() -> None:
                     f"Inbox root '{repo_key}' has no local clone and upstream is disabled; "
                     "leaving it untouched."
                 )
+        _flush_log()
 
     log("Inbox tree rebuild complete.")
 
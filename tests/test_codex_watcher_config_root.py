@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 import pytest
@@ -37,3 +38,49 @@ def test_load_config_respects_pv_root(
     assert resolved_root == pv_root.resolve()
     assert cfg["pv_root"] == str(resolved_root)
     assert Path("/srv/prompt-valet").resolve() not in created_paths
+
+
+def test_load_config_reparses_only_when_file_changes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    pv_root = tmp_path / "prompt-valet"
+    config_path = tmp_path / "prompt-valet.yaml"
+    config_path.write_text(f'pv_root: "{pv_root}"\n', encoding="utf-8")
+    monkeypatch.setattr(codex_watcher, "DEFAULT_CONFIG_PATH", config_path)
+    monkeypatch.setattr(codex_watcher, "_USER_CONFIG_CACHE", {})
+
+    parses: list[str] = []
+    original_load = codex_watcher.yaml.load
+
+    def counting_load(stream, Loader):
+        parses.append(stream)
+        return original_load(stream, Loader=Loader)
+
+    monkeypatch.setattr(codex_watcher.yaml, "load", counting_load)
+
+    first, _ = codex_watcher.load_config()
+    first["watcher"]["runner_cmd"] = "mutated"
+    second, _ = codex_watcher.load_config()
+    assert len(parses) == 1
+    assert second["watcher"]["runner_cmd"] == "codex"
+
+    config_path.write_text(
+        f'pv_root: "{pv_root}"\ninbox_mode: multi_owner\n', encoding="utf-8"
+    )
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    third, _ = codex_watcher.load_config()
+    assert len(parses) == 2
+    assert third["inbox_mode"] == "multi_owner"
+
+
+def test_clone_defaults_returns_independent_copies() -> None:
+    first = codex_watcher._clone_defaults()
+    assert first == codex_watcher.DEFAULT_CONFIG
+
+    first["watcher"]["parallelism"] = 8
+    first["queue"]["enabled"] = True
+    second = codex_watcher._clone_defaults()
+    assert second["watcher"]["parallelism"] == 1
+    assert second["queue"]["enabled"] is False
+    assert codex_watcher.DEFAULT_CONFIG["watcher"]["parallelism"] == 1
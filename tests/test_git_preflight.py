@@ -1,5 +1,6 @@
 from pathlib import Path
 import logging
+from types import SimpleNamespace
 
 from scripts import codex_watcher
 
@@ -26,6 +27,8 @@ def test_ensure_worker_repo_clean_and_synced_dirty_repo(tmp_path, monkeypatch):
             "stdout": " M docs/example.md\n",
             "stderr": "",
         },
+        {"args": ["reset", "--hard", "HEAD"], "rc": 0, "stdout": "", "stderr": ""},
+        {"args": ["clean", "-ffdx"], "rc": 0, "stdout": "", "stderr": ""},
         {"args": ["checkout", base_branch], "rc": 0, "stdout": "", "stderr": ""},
         {"args": ["pull", "--ff-only"], "rc": 0, "stdout": "", "stderr": ""},
     ]
@@ -126,3 +129,42 @@ def test_ensure_worker_repo_clean_and_synced_status_failure(
     assert ok is False
     assert "git status" in caplog.text
     assert "Git preflight" in caplog.text
+
+
+def test_ensure_worker_repo_clean_and_synced_uses_pygit2_status(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / ".git").mkdir()
+
+    ignored = 1 << 14
+
+    class FakeRepository:
+        def __init__(self, path: str) -> None:
+            self.path = path
+
+        def status(self):
+            return {"build/output.log": ignored}
+
+    fake_pygit2 = SimpleNamespace(
+        Repository=FakeRepository,
+        GitError=RuntimeError,
+        GIT_STATUS_IGNORED=ignored,
+    )
+    monkeypatch.setattr(codex_watcher, "pygit2", fake_pygit2)
+    monkeypatch.setattr(codex_watcher, "_PYGIT2_REPOS", {})
+
+    calls = []
+
+    def fake_run_git(args, *, cwd, logger, check=False):
+        calls.append(list(args))
+        return SimpleNamespace(returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(codex_watcher, "_run_git", fake_run_git)
+    monkeypatch.setattr(codex_watcher, "ensure_repo_cloned", _fake_ensure_repo_cloned)
+    logger = logging.getLogger("test")
+
+    ok = codex_watcher.ensure_worker_repo_clean_and_synced(repo, "main", logger)
+
+    assert ok is True
+    assert calls == [["checkout", "main"], ["pull", "--ff-only"]]
+    assert codex_watcher._pygit2_repo(repo) is codex_watcher._pygit2_repo(repo)
@@ -1,5 +1,10 @@
 from pathlib import Path
+import logging
+import shutil
 import subprocess
+import sys
+
+import pytest
 
 from scripts import codex_watcher
 
@@ -51,3 +56,131 @@ def test_git_sync_rejects_non_git_directory(tmp_path):
         ) or "Git synchronization failed" in str(exc)
     else:
         raise AssertionError("Expected run_git_sync to fail on a non-git directory.")
+
+
+def test_run_git_streams_output_and_keeps_stderr_tail(tmp_path):
+    repo_root = _create_repo_with_origin(tmp_path)
+
+    proc = codex_watcher.run_git(["ls-remote", "--heads", "origin"], cwd=repo_root)
+    assert proc.returncode == 0
+    assert proc.stdout.rstrip().endswith("refs/heads/main")
+
+    try:
+        codex_watcher.run_git(["checkout", "no-such-branch"], cwd=repo_root)
+    except RuntimeError as exc:
+        assert "no-such-branch" in str(exc)
+    else:
+        raise AssertionError("Expected run_git to raise on a failing command.")
+
+    failed = codex_watcher.run_git(
+        ["checkout", "no-such-branch"], cwd=repo_root, allow_failure=True
+    )
+    assert failed.returncode != 0
+    assert "no-such-branch" in failed.stderr
+
+
+def test_prepare_branch_fetch_seeds_remote_branch_names(tmp_path, monkeypatch):
+    repo_root = _create_repo_with_origin(tmp_path)
+    monkeypatch.setattr(codex_watcher, "_LS_REMOTE_CACHE", {})
+
+    codex_watcher.prepare_branch(repo_root, "job-branch", base_branch="main")
+
+    def fail_ls_remote(repo_dir, logger):
+        raise AssertionError("origin heads should come from the fetch")
+
+    monkeypatch.setattr(codex_watcher, "_list_remote_branch_names", fail_ls_remote)
+    logger = logging.getLogger("test")
+    assert codex_watcher.get_remote_branch_names(repo_root, logger) == {"main"}
+
+
+def test_run_cmd_decodes_non_utf8_output(tmp_path):
+    rc, out, err = codex_watcher.run_cmd(
+        [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'caf\\xe9\\n')"],
+        cwd=tmp_path,
+    )
+    assert rc == 0
+    assert out == "caf\ufffd\n"
+    assert err == ""
+
+
+def test_worktree_has_changes_probes(tmp_path):
+    repo_root = _create_repo_with_origin(tmp_path)
+    logger = logging.getLogger("test")
+
+    assert codex_watcher._worktree_has_changes(repo_root, logger) is False
+
+    (repo_root / ".gitignore").write_text("*.log\n")
+    subprocess.run(["git", "add", ".gitignore"], cwd=repo_root, check=True)
+    assert codex_watcher._worktree_has_changes(repo_root, logger) is True
+    subprocess.run(["git", "commit", "-qm", "ignore"], cwd=repo_root, check=True)
+
+    (repo_root / "build.log").write_text("ignored\n")
+    assert codex_watcher._worktree_has_changes(repo_root, logger) is False
+
+    (repo_root / "new" / "dir").mkdir(parents=True)
+    (repo_root / "new" / "dir" / "file.txt").write_text("untracked\n")
+    assert codex_watcher._worktree_has_changes(repo_root, logger) is True
+    shutil.rmtree(repo_root / "new")
+
+    (repo_root / "README.md").write_text("changed\n")
+    assert codex_watcher._worktree_has_changes(repo_root, logger) is True
+
+    not_a_repo = tmp_path / "plain"
+    not_a_repo.mkdir()
+    assert codex_watcher._worktree_has_changes(not_a_repo, logger) is None
+
+
+def test_fast_forward_to_origin_merges_only_when_behind(tmp_path, monkeypatch):
+    repo_root = _create_repo_with_origin(tmp_path)
+    other = tmp_path / "other"
+    subprocess.run(
+        ["git", "clone", "-q", "-b", "main", str(tmp_path / "origin.git"), str(other)],
+        check=True,
+    )
+    (other / "NEW.md").write_text("upstream change\n")
+    for args in (
+        ["add", "NEW.md"],
+        ["-c", "user.name=CI", "-c", "user.email=ci@example.invalid"]
+        + ["commit", "-qm", "up"],
+        ["push", "-q", "origin", "main"],
+    ):
+        subprocess.run(["git", *args], cwd=other, check=True)
+
+    calls: list[list[str]] = []
+    original_run_cmd = codex_watcher.run_cmd
+
+    def recording_run_cmd(cmd, cwd=None):
+        calls.append(cmd)
+        return original_run_cmd(cmd, cwd=cwd)
+
+    monkeypatch.setattr(codex_watcher, "run_cmd", recording_run_cmd)
+    logger = logging.getLogger("test")
+
+    assert codex_watcher._fast_forward_to_origin(repo_root, "main", logger)
+    assert (repo_root / "NEW.md").exists()
+    assert [cmd[1] for cmd in calls] == ["fetch", "rev-parse", "merge"]
+
+    calls.clear()
+    assert codex_watcher._fast_forward_to_origin(repo_root, "main", logger)
+    assert [cmd[1] for cmd in calls] == ["fetch", "rev-parse"]
+
+
+def test_remote_branch_names_listed_in_process_with_pygit2(tmp_path, monkeypatch):
+    pytest.importorskip("pygit2")
+    repo_root = _create_repo_with_origin(tmp_path)
+    subprocess.run(
+        ["git", "push", "-q", "origin", "main:feature/x"], cwd=repo_root, check=True
+    )
+    monkeypatch.setattr(codex_watcher, "_PYGIT2_REPOS", {})
+    monkeypatch.setattr(codex_watcher, "_LS_REMOTE_CACHE", {})
+    monkeypatch.setitem(codex_watcher.CONFIG, "watcher", {"ls_remote_ttl_seconds": 0})
+
+    def fail_run_git(*args, **kwargs):
+        raise AssertionError("pygit2 should have listed the heads")
+
+    monkeypatch.setattr(codex_watcher, "run_git", fail_run_git)
+    logger = logging.getLogger("test")
+    assert codex_watcher.get_remote_branch_names(repo_root, logger) == {
+        "main",
+        "feature/x",
+    }
@@ -2,6 +2,7 @@ import os
 import queue
 import time
 from pathlib import Path
+from types import SimpleNamespace
 
 from scripts import codex_watcher
 
@@ -146,3 +147,339 @@ def test_start_jobs_idempotent(tmp_path):
     first_count = job_queue.qsize()
     codex_watcher.start_jobs_from_running(inbox, processed, job_queue)
     assert job_queue.qsize() == first_count
+
+
+def test_claim_new_prompts_from_event_candidates(tmp_path):
+    inbox = tmp_path / "inbox"
+    branch = inbox / "prompt-valet" / "main"
+    branch.mkdir(parents=True)
+
+    settled = branch / "settled.prompt.md"
+    settled.write_text("# settled")
+    old = time.time() - (codex_watcher.DEBOUNCE_SECONDS + 1)
+    os.utime(settled, (old, old))
+    fresh = branch / "fresh.prompt.md"
+    fresh.write_text("# fresh")
+    untouched = branch / "untouched.prompt.md"
+    untouched.write_text("# not reported")
+    os.utime(untouched, (old, old))
+
+    events = codex_watcher.InboxEvents(debounce_seconds=0.0)
+    handler = codex_watcher._InboxEventHandler(events)
+    handler.dispatch(
+        SimpleNamespace(event_type="created", is_directory=False, src_path=str(settled))
+    )
+    handler.dispatch(
+        SimpleNamespace(
+            event_type="moved",
+            is_directory=False,
+            src_path="x.tmp",
+            dest_path=str(fresh),
+        )
+    )
+    handler.dispatch(
+        SimpleNamespace(event_type="created", is_directory=True, src_path=str(branch))
+    )
+    handler.dispatch(
+        SimpleNamespace(
+            event_type="modified", is_directory=False, src_path=str(untouched)
+        )
+    )
+    complete, created, running = events.drain()
+    assert complete == {fresh}
+    assert created == {settled}
+    assert running == set()
+
+    deferred = codex_watcher.claim_new_prompts(inbox, complete | created)
+
+    assert deferred == {fresh}
+    assert (branch / "settled.running.md").exists()
+    assert fresh.exists()
+    assert untouched.exists()
+
+
+def test_inbox_events_hold_prompts_until_latest_deadline(tmp_path):
+    events = codex_watcher.InboxEvents(debounce_seconds=3600.0)
+    prompt = tmp_path / "a.prompt.md"
+    running = tmp_path / "b.running.md"
+
+    events.add(prompt)
+    events.add(running)
+    assert events.drain() == (set(), set(), {running})
+
+    events.add(prompt, delay=0.0)
+    events.add(prompt, delay=3600.0)
+    started = time.monotonic()
+    events.wait(0.05)
+    assert time.monotonic() - started >= 0.04
+    assert events.drain() == (set(), set(), set())
+
+    events.add(prompt, delay=0.0)
+    events.wait(5.0)
+    assert events.drain() == (set(), {prompt}, set())
+    assert events.drain() == (set(), set(), set())
+
+    events.add(prompt, delay=0.0, complete=True)
+    assert events.drain() == ({prompt}, set(), set())
+
+
+def test_closed_and_moved_prompts_are_claimed_without_debounce(tmp_path):
+    inbox = tmp_path / "inbox"
+    branch = inbox / "prompt-valet" / "main"
+    branch.mkdir(parents=True)
+    closed = branch / "closed.prompt.md"
+    closed.write_text("# written and closed")
+    renamed = branch / "renamed.prompt.md"
+    renamed.write_text("# renamed into place")
+    created = branch / "created.prompt.md"
+    created.write_text("# still being written")
+
+    events = codex_watcher.InboxEvents(debounce_seconds=3600.0)
+    handler = codex_watcher._InboxEventHandler(events)
+    for event_type, path in (("created", closed), ("closed", closed)):
+        handler.dispatch(
+            SimpleNamespace(
+                event_type=event_type, is_directory=False, src_path=str(path)
+            )
+        )
+    handler.dispatch(
+        SimpleNamespace(
+            event_type="moved",
+            is_directory=False,
+            src_path=str(branch / ".renamed.tmp"),
+            dest_path=str(renamed),
+        )
+    )
+    handler.dispatch(
+        SimpleNamespace(event_type="created", is_directory=False, src_path=str(created))
+    )
+
+    complete, pending, _ = events.drain()
+    assert complete == {closed, renamed}
+    assert pending == set()
+
+    codex_watcher.claim_new_prompts(inbox, complete, debounce_seconds=0.0)
+    assert (branch / "closed.running.md").exists()
+    assert (branch / "renamed.running.md").exists()
+    assert created.exists()
+
+
+def test_created_only_prompts_keep_the_mtime_debounce(tmp_path):
+    inbox = tmp_path / "inbox"
+    branch = inbox / "prompt-valet" / "main"
+    branch.mkdir(parents=True)
+    growing = branch / "growing.prompt.md"
+    growing.write_text("# first lines of a slow write")
+
+    # The debounce window has passed, but no close event arrived and modified
+    # events are not delivered, so the file may still be growing.
+    events = codex_watcher.InboxEvents(debounce_seconds=0.0)
+    handler = codex_watcher._InboxEventHandler(events)
+    handler.dispatch(
+        SimpleNamespace(event_type="created", is_directory=False, src_path=str(growing))
+    )
+    complete, created, _ = events.drain()
+    assert complete == set()
+    assert created == {growing}
+
+    assert codex_watcher.claim_new_prompts(inbox, created) == {growing}
+    assert growing.exists()
+
+    old = time.time() - (codex_watcher.DEBOUNCE_SECONDS + 1)
+    os.utime(growing, (old, old))
+    assert codex_watcher.claim_new_prompts(inbox, created) == set()
+    assert (branch / "growing.running.md").exists()
+
+
+def test_finalize_defers_move_and_persists_pending(tmp_path, monkeypatch):
+    inbox = tmp_path / "inbox"
+    finished = tmp_path / "finished"
+    state_path = tmp_path / ".pending_finalize.json"
+    rels = [
+        Path("prompt-valet/main/a.prompt.md"),
+        Path("prompt-valet/main/b.prompt.md"),
+    ]
+    for rel in rels:
+        src = inbox / rel
+        src.parent.mkdir(parents=True, exist_ok=True)
+        src.write_text("# test")
+        codex_watcher.claim_inbox_prompt(inbox, rel)
+
+    moves = codex_watcher.DeferredMoves(state_path)
+    monkeypatch.setattr(codex_watcher, "_DEFERRED_MOVES", moves)
+    moves.start()
+    started = time.monotonic()
+    for rel, delay in zip(rels, (0.05, 3600.0)):
+        codex_watcher.finalize_inbox_prompt(
+            inbox_root=inbox,
+            finished_root=finished,
+            rel=rel,
+            status=codex_watcher.STATUS_DONE,
+            delay_seconds=delay,
+        )
+    assert time.monotonic() - started < 1.0
+    assert (inbox / "prompt-valet/main/b.done.md").exists()
+
+    done_a = finished / "prompt-valet/main/a.done.md"
+    deadline = time.monotonic() + 5.0
+    while not done_a.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert done_a.exists()
+
+    moves.stop()
+    assert state_path.is_file()
+
+    restarted = codex_watcher.DeferredMoves(state_path)
+    restarted.start()
+    restarted.stop()
+    assert (finished / "prompt-valet/main/b.done.md").exists()
+    assert not state_path.exists()
+
+
+def test_iter_inbox_files_skips_archive_trees_inside_inbox(tmp_path, monkeypatch):
+    inbox = tmp_path / "inbox"
+    nested = inbox / "repo" / "main" / "sub"
+    nested.mkdir(parents=True)
+    (nested / "deep.prompt.md").write_text("# deep")
+    (nested / "notes.md").write_text("ignore me")
+    archived = inbox / "finished" / "repo" / "main"
+    archived.mkdir(parents=True)
+    (archived / "old.prompt.md").write_text("# archived")
+
+    monkeypatch.setattr(codex_watcher, "CONFIG", {"finished": str(inbox / "finished")})
+
+    found = [
+        entry.path for entry in codex_watcher._iter_inbox_files(inbox, ".prompt.md")
+    ]
+    assert found == [str(nested / "deep.prompt.md")]
+
+
+def test_claim_missing_prompt_and_repeat_finalize(tmp_path):
+    inbox = tmp_path / "inbox"
+    finished = tmp_path / "finished"
+    rel = Path("prompt-valet/main/gone.prompt.md")
+    (inbox / rel).parent.mkdir(parents=True)
+
+    try:
+        codex_watcher.claim_inbox_prompt(inbox, rel)
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("claiming a missing prompt should raise")
+
+    (inbox / rel).write_text("# back")
+    codex_watcher.claim_inbox_prompt(inbox, rel)
+    (inbox / rel).with_name("gone.running.md").rename(
+        (inbox / rel).with_name("gone.error.md")
+    )
+    codex_watcher.finalize_inbox_prompt(
+        inbox_root=inbox,
+        finished_root=finished,
+        rel=rel,
+        status=codex_watcher.STATUS_ERROR,
+        delay_seconds=0.0,
+    )
+    assert (finished / rel.with_name("gone.error.md")).exists()
+
+
+def test_job_states_restart_finalizes_leftover_running_files(tmp_path):
+    inbox = tmp_path / "inbox"
+    finished = tmp_path / "finished"
+    branch = inbox / "prompt-valet" / "main"
+    branch.mkdir(parents=True)
+    (branch / "done.running.md").write_text("# finished, not yet renamed")
+    (branch / "inflight.running.md").write_text("# interrupted")
+    db_path = tmp_path / ".watcher_state.db"
+
+    states = codex_watcher.JobStates()
+    states.open(db_path, inbox, finished)
+    states["prompt-valet/main/done.prompt.md"] = codex_watcher.STATUS_DONE
+    states["prompt-valet/main/inflight.prompt.md"] = codex_watcher.STATUS_RUNNING
+    states["prompt-valet/main/archived.prompt.md"] = codex_watcher.STATUS_ERROR
+    states["prompt-valet/main/retry.prompt.md"] = codex_watcher.STATUS_ERROR
+    states.pop("prompt-valet/main/retry.prompt.md")
+    states.close()
+
+    restarted = codex_watcher.JobStates()
+    restarted.open(db_path, inbox, finished)
+    assert dict(restarted) == {}
+    assert not (branch / "done.running.md").exists()
+    assert (finished / "prompt-valet" / "main" / "done.done.md").exists()
+    # The interrupted job is left for start_jobs_from_running to rerun.
+    assert (branch / "inflight.running.md").exists()
+    restarted.close()
+
+    again = codex_watcher.JobStates()
+    again.open(db_path, inbox, finished)
+    assert dict(again) == {}
+    again.close()
+
+
+def test_start_jobs_skips_settled_running_files_without_stat(tmp_path, monkeypatch):
+    inbox = tmp_path / "inbox"
+    processed = tmp_path / "processed"
+    branch = inbox / "prompt-valet" / "main"
+    branch.mkdir(parents=True)
+    for name in ("a", "b"):
+        (branch / f"{name}.running.md").write_text("# claimed")
+
+    config = codex_watcher.load_config_from_dict(
+        {
+            "inbox": str(inbox),
+            "processed": str(processed),
+            "repos_root": str(tmp_path / "repos"),
+            "git_owner": "prompt-valet",
+        }
+    )
+    monkeypatch.setattr(codex_watcher, "CONFIG", config)
+    monkeypatch.setattr(codex_watcher, "JOB_STATES", codex_watcher.JobStates())
+    for name in ("a", "b"):
+        codex_watcher.JOB_STATES[f"prompt-valet/main/{name}.prompt.md"] = (
+            codex_watcher.STATUS_DONE
+        )
+
+    stats: list[Path] = []
+    original_is_file = Path.is_file
+
+    def counting_is_file(self):
+        stats.append(self)
+        return original_is_file(self)
+
+    monkeypatch.setattr(Path, "is_file", counting_is_file)
+    job_queue: "queue.Queue[codex_watcher.Job]" = queue.Queue()
+    codex_watcher.start_jobs_from_running(inbox, processed, job_queue)
+    codex_watcher.start_jobs_from_running(
+        inbox, processed, job_queue, candidates=[branch / "a.running.md"]
+    )
+
+    assert job_queue.empty()
+    assert stats == []
+
+
+def test_claim_refuses_to_replace_existing_running_file(tmp_path, monkeypatch):
+    inbox = tmp_path / "inbox"
+    rel = Path("prompt-valet/main/dup.prompt.md")
+    prompt = inbox / rel
+    prompt.parent.mkdir(parents=True)
+    prompt.write_text("# new")
+    running = prompt.with_name("dup.running.md")
+    running.write_text("# owned by another watcher")
+
+    try:
+        codex_watcher.claim_inbox_prompt(inbox, rel)
+    except FileExistsError:
+        pass
+    else:
+        raise AssertionError("claim should not replace an existing running file")
+    assert prompt.read_text() == "# new"
+    assert running.read_text() == "# owned by another watcher"
+
+    running.unlink()
+
+    def no_hard_links(src, dst):
+        raise PermissionError(1, "Operation not permitted")
+
+    monkeypatch.setattr(codex_watcher.os, "link", no_hard_links)
+    assert codex_watcher.claim_inbox_prompt(inbox, rel) == running
+    assert running.read_text() == "# new"
+    assert not prompt.exists()
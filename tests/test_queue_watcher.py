@@ -4,6 +4,7 @@ import queue
 import subprocess
 import time
 from pathlib import Path
+from types import SimpleNamespace
 
 from scripts import codex_watcher, queue_runtime
 
@@ -103,6 +104,10 @@ def test_queue_executor_processes_job(tmp_path, monkeypatch):
         return True
 
     monkeypatch.setattr(codex_watcher, "run_prompt_job", fake_run)
+    writes: list[str] = []
+    monkeypatch.setattr(
+        codex_watcher, "print", lambda msg, **_: writes.append(msg), raising=False
+    )
 
     codex_watcher.start_jobs_from_running(
         tmp_path / "inbox",
@@ -132,6 +137,13 @@ def test_queue_executor_processes_job(tmp_path, monkeypatch):
     assert Path(job_record.processed_path).exists()
     assert not running.exists()
     assert ran
+    succeeded = [w for w in writes if "job.succeeded" in w]
+    assert len(succeeded) == 1
+    first, second = succeeded[0].splitlines()
+    assert first.startswith("[codex_watcher] ")
+    assert second.startswith("[codex_watcher] ")
+    assert "event=job.succeeded" in first
+    assert "event=job.archived" in second
 
 
 def test_queue_executor_requeues_on_retryable_failure(tmp_path, monkeypatch):
@@ -169,6 +181,45 @@ def test_queue_executor_requeues_on_retryable_failure(tmp_path, monkeypatch):
     assert running.exists()
 
 
+def test_queue_executor_retries_preflight_failure_then_succeeds(tmp_path, monkeypatch):
+    cfg = _setup_config(tmp_path, queue_enabled=True, max_retries=2)
+    running = _claim_prompt(tmp_path, Path("repo/main/retry.prompt.md"))
+    results = [False, True]
+
+    def flaky_run(job):
+        assert job.prompt_path.read_text() == running.read_text()
+        return results.pop(0)
+
+    monkeypatch.setattr(codex_watcher, "run_prompt_job", flaky_run)
+
+    queue_root = codex_watcher._queue_root_from_config(cfg)
+    codex_watcher.start_jobs_from_running(
+        tmp_path / "inbox",
+        tmp_path / "processed",
+        None,
+        queue_enabled=True,
+        queue_root=queue_root,
+    )
+
+    for _ in range(2):
+        job_record = queue_runtime.get_next_queued_job(queue_root)
+        assert job_record is not None
+        codex_watcher._process_queue_job(
+            job_record,
+            processed_root=tmp_path / "processed",
+            failed_root=tmp_path / "failed",
+            failure_archive=False,
+            max_retries=cfg["queue"]["max_retries"],
+        )
+
+    assert results == []
+    job_record = queue_runtime.find_job_for_inbox(queue_root, str(running))
+    assert job_record is not None
+    assert job_record.state == queue_runtime.STATE_SUCCEEDED
+    assert job_record.retries == 1
+    assert not running.exists()
+
+
 def test_queue_executor_archives_final_failure(tmp_path, monkeypatch):
     cfg = _setup_config(
         tmp_path,
@@ -256,8 +307,8 @@ def test_create_pr_uses_job_branch_as_base(tmp_path, monkeypatch):
 
     def fake_run_cmd(cmd, cwd=None):
         run_cmd_calls.append(cmd)
-        if cmd == ["git", "status", "--porcelain"]:
-            return 0, "M docs/example.md\n", ""
+        if cmd == ["git", "diff", "--quiet"]:
+            return 1, "", ""
         return 0, "", ""
 
     def fake_run_git(args, *, cwd, allow_failure=False):
@@ -282,3 +333,372 @@ def test_create_pr_uses_job_branch_as_base(tmp_path, monkeypatch):
     base_index = gh_cmd.index("--base") + 1
     assert base_index < len(gh_cmd)
     assert gh_cmd[base_index] == "feature-xyz"
+
+
+def test_remote_branch_names_are_cached_until_invalidated(tmp_path, monkeypatch):
+    _setup_config(tmp_path)
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    calls: list[list[str]] = []
+
+    def fake_run_git(args, *, cwd, allow_failure=False):
+        calls.append(list(args))
+        return subprocess.CompletedProcess(
+            args, 0, stdout="deadbeef\trefs/heads/main\n", stderr=""
+        )
+
+    monkeypatch.setattr(codex_watcher, "run_git", fake_run_git)
+    monkeypatch.setattr(codex_watcher, "_LS_REMOTE_CACHE", {})
+    logger = logging.getLogger("test")
+
+    assert codex_watcher.get_remote_branch_names(repo_dir, logger) == {"main"}
+    assert codex_watcher.get_remote_branch_names(repo_dir, logger) == {"main"}
+    assert len(calls) == 1
+
+    codex_watcher.invalidate_remote_branch_names(repo_dir)
+    codex_watcher.get_remote_branch_names(repo_dir, logger)
+    assert len(calls) == 2
+
+    codex_watcher.CONFIG["watcher"]["ls_remote_ttl_seconds"] = 0
+    codex_watcher.get_remote_branch_names(repo_dir, logger)
+    codex_watcher.get_remote_branch_names(repo_dir, logger)
+    assert len(calls) == 4
+
+
+def test_sharded_job_queue_keeps_each_repo_on_one_worker(tmp_path):
+    def make_job(owner, repo, job_id):
+        return codex_watcher.Job(
+            git_owner=owner,
+            repo_name=repo,
+            branch_name="main",
+            job_id=job_id,
+            inbox_rel=Path(f"{repo}/main/{job_id}.prompt.md"),
+            inbox_path=tmp_path / f"{job_id}.running.md",
+            run_root=tmp_path / job_id,
+            prompt_path=tmp_path / job_id / "prompt.md",
+        )
+
+    sharded = codex_watcher.ShardedJobQueue(4)
+    for index in range(3):
+        sharded.put(make_job("owner", "alpha", f"alpha-{index}"))
+        sharded.put(make_job("owner", "beta", f"beta-{index}"))
+
+    assert len(sharded.queues) == 4
+    shards_by_repo: dict[str, set[int]] = {}
+    for index, shard in enumerate(sharded.queues):
+        for job in list(shard.queue):
+            shards_by_repo.setdefault(job.repo_name, set()).add(index)
+    assert {repo: len(shards) for repo, shards in shards_by_repo.items()} == {
+        "alpha": 1,
+        "beta": 1,
+    }
+    assert sum(shard.qsize() for shard in sharded.queues) == 6
+    assert len(codex_watcher.ShardedJobQueue(0).queues) == 1
+
+
+def test_ensure_repo_cloned_uses_partial_clone_toggle(tmp_path, monkeypatch):
+    _setup_config(tmp_path)
+    calls: list[list[str]] = []
+
+    def fake_run_git(args, *, cwd, allow_failure=False):
+        calls.append(list(args))
+        return subprocess.CompletedProcess(args, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(codex_watcher, "run_git", fake_run_git)
+    repos_root = tmp_path / "repos"
+
+    codex_watcher.ensure_repo_cloned(repos_root, "owner", "example")
+    codex_watcher.CONFIG["watcher"]["partial_clone"] = False
+    codex_watcher.ensure_repo_cloned(repos_root, "owner", "example")
+
+    assert calls[0][:3] == ["clone", "--filter=blob:none", "--no-tags"]
+    assert calls[1][0] == "clone" and "--filter=blob:none" not in calls[1]
+
+
+def test_list_remote_branch_names_parses_ls_remote_output(tmp_path, monkeypatch):
+    _setup_config(tmp_path)
+
+    def fake_run_git(args, *, cwd, allow_failure=False):
+        return subprocess.CompletedProcess(
+            args,
+            0,
+            stdout=(
+                "aaa\trefs/heads/main\n"
+                "\n"
+                "bbb\trefs/heads/feature/nested\n"
+                "ccc\trefs/tags/v1\n"
+            ),
+            stderr="",
+        )
+
+    monkeypatch.setattr(codex_watcher, "run_git", fake_run_git)
+    monkeypatch.setattr(codex_watcher, "_pygit2_remote_branch_names", lambda _: None)
+
+    branches = codex_watcher._list_remote_branch_names(
+        tmp_path, logging.getLogger("test")
+    )
+    assert branches == {"main", "feature/nested"}
+
+
+def test_create_pr_commits_in_process_with_pygit2(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    job = codex_watcher.Job(
+        git_owner="owner",
+        repo_name="example",
+        branch_name="main",
+        job_id="job-3",
+        inbox_rel=Path("example/main/fix_it.prompt.md"),
+        inbox_path=repo_dir / "fix_it.running.md",
+        run_root=tmp_path / "run",
+        prompt_path=tmp_path / "prompt.md",
+    )
+
+    class FakeIndex:
+        def __init__(self):
+            self.calls = []
+
+        def read(self, force):
+            self.calls.append(("read", force))
+
+        def add_all(self):
+            self.calls.append("add_all")
+
+        def write_tree(self):
+            return "tree-new"
+
+        def write(self):
+            self.calls.append("write")
+
+    class FakeRepo:
+        def __init__(self):
+            self.index = FakeIndex()
+            self.head = SimpleNamespace(
+                peel=lambda _: SimpleNamespace(id="parent", tree_id="tree-old")
+            )
+            self.default_signature = "sig"
+            self.references = set()
+            self.commits = []
+            self.heads = []
+
+        def create_commit(self, ref, author, committer, message, tree, parents):
+            self.commits.append((ref, message, tree, parents))
+
+        def set_head(self, ref):
+            self.heads.append(ref)
+
+    fake_repo = FakeRepo()
+    monkeypatch.setattr(
+        codex_watcher, "pygit2", SimpleNamespace(Commit=object, GitError=RuntimeError)
+    )
+    monkeypatch.setattr(codex_watcher, "_pygit2_repo", lambda _: fake_repo)
+    monkeypatch.setattr(
+        codex_watcher, "get_remote_branch_names", lambda *_: frozenset({"main"})
+    )
+    run_cmd_calls: list[list[str]] = []
+
+    def fake_run_cmd(cmd, cwd=None):
+        run_cmd_calls.append(cmd)
+        if cmd == ["git", "diff", "--quiet"]:
+            return 1, "", ""
+        return 0, "", ""
+
+    monkeypatch.setattr(codex_watcher, "run_cmd", fake_run_cmd)
+
+    codex_watcher.create_pr_for_job(job, repo_dir, logging.getLogger("test"))
+
+    ref = "refs/heads/codex/fix-it-prompt-job-3"
+    message = "Codex: fix_it.prompt.md (job job-3)"
+    assert fake_repo.commits == [(ref, message, "tree-new", ["parent"])]
+    assert fake_repo.heads == [ref]
+    assert fake_repo.index.calls == [("read", False), "add_all", "write"]
+    git_verbs = [cmd[1] for cmd in run_cmd_calls if cmd[0] == "git"]
+    assert git_verbs == ["diff", "checkout", "fetch", "rev-parse", "push"]
+    assert any(cmd[:3] == ["gh", "pr", "create"] for cmd in run_cmd_calls)
+
+
+def test_run_codex_streams_output_into_job_log(tmp_path, monkeypatch):
+    _setup_config(tmp_path)
+    runner = tmp_path / "fake-codex"
+    runner.write_text(
+        "#!/bin/sh\n"
+        "echo first\n"
+        "echo oops >&2\n"
+        'echo "$PV_RUN_ID $HOME"\n'
+        "read -r line || echo no-stdin\n"
+        "printf 'caf\\351\\n'\n"
+    )
+    runner.chmod(0o755)
+    codex_watcher.CONFIG["watcher"]["runner_cmd"] = str(runner)
+
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    job_dir = tmp_path / "runs" / "job-4"
+    job_dir.mkdir(parents=True)
+    writer = codex_watcher.JobMetadataWriter(job_dir, {"state": "running"})
+    job = codex_watcher.Job(
+        git_owner="owner",
+        repo_name="example",
+        branch_name="main",
+        job_id="job-4",
+        inbox_rel=Path("example/main/p.prompt.md"),
+        inbox_path=tmp_path / "p.running.md",
+        run_root=tmp_path / "run",
+        prompt_path=tmp_path / "prompt.md",
+    )
+
+    codex_watcher.run_codex_for_job(repo_dir, job, tmp_path / "run", writer)
+
+    lines = writer.log_path.read_bytes().splitlines()
+    assert [line for line in lines if line.startswith(b"STDOUT: ")] == [
+        b"STDOUT: first",
+        f"STDOUT: job-4 {os.environ.get('HOME', '')}".encode(),
+        b"STDOUT: no-stdin",
+        b"STDOUT: caf\xe9",
+    ]
+    assert b"STDERR: oops" in lines
+
+
+def test_run_codex_job_log_can_be_tailed_while_running(tmp_path, monkeypatch):
+    _setup_config(tmp_path)
+    monkeypatch.setattr(codex_watcher, "JOB_LOG_FLUSH_SECONDS", 0.05)
+    job_dir = tmp_path / "runs" / "job-5"
+    job_dir.mkdir(parents=True)
+    writer = codex_watcher.JobMetadataWriter(job_dir, {"state": "running"})
+    runner = tmp_path / "fake-codex"
+    runner.write_text(
+        "#!/bin/sh\n"
+        "echo first\n"
+        "for _ in 1 2 3 4 5 6 7 8 9 10; do\n"
+        f"  grep -q 'STDOUT: first' '{writer.log_path}' && echo tailed && exit 0\n"
+        "  sleep 0.1\n"
+        "done\n"
+        "echo not-flushed\n"
+    )
+    runner.chmod(0o755)
+    codex_watcher.CONFIG["watcher"]["runner_cmd"] = str(runner)
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    job = codex_watcher.Job(
+        git_owner="owner",
+        repo_name="example",
+        branch_name="main",
+        job_id="job-5",
+        inbox_rel=Path("example/main/p.prompt.md"),
+        inbox_path=tmp_path / "p.running.md",
+        run_root=tmp_path / "run",
+        prompt_path=tmp_path / "prompt.md",
+    )
+
+    codex_watcher.run_codex_for_job(repo_dir, job, tmp_path / "run", writer)
+
+    lines = writer.log_path.read_bytes().splitlines()
+    assert b"STDOUT: tailed" in lines
+    assert b"STDOUT: not-flushed" not in lines
+
+
+def test_queue_executor_wakes_up_on_enqueue(tmp_path, monkeypatch):
+    cfg = _setup_config(tmp_path, queue_enabled=True)
+    running = _claim_prompt(tmp_path, Path("repo/main/fast.prompt.md"))
+    queue_root = codex_watcher._queue_root_from_config(cfg)
+    queue_runtime.ensure_jobs_root(queue_root)
+    monkeypatch.setattr(codex_watcher, "POLL_INTERVAL_SECONDS", 30.0)
+    monkeypatch.setattr(codex_watcher, "run_prompt_job", lambda job: True)
+
+    stop_event = codex_watcher.threading.Event()
+    executor = codex_watcher.threading.Thread(
+        target=codex_watcher._queue_executor_loop,
+        args=(queue_root, tmp_path / "processed", tmp_path / "failed"),
+        kwargs={
+            "failure_archive": False,
+            "max_retries": 1,
+            "stop_event": stop_event,
+        },
+        daemon=True,
+    )
+    executor.start()
+    time.sleep(0.1)
+
+    codex_watcher.start_jobs_from_running(
+        tmp_path / "inbox",
+        tmp_path / "processed",
+        None,
+        queue_enabled=True,
+        queue_root=queue_root,
+    )
+    deadline = time.monotonic() + 5.0
+    while running.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stop_event.set()
+    codex_watcher._QUEUE_WAKEUP.set()
+    executor.join(timeout=5.0)
+    assert not executor.is_alive()
+    record = queue_runtime.find_job_for_inbox(queue_root, str(running))
+    assert record is not None and record.state == queue_runtime.STATE_SUCCEEDED
+
+
+def test_link_or_copy_links_then_falls_back(tmp_path, monkeypatch):
+    src = tmp_path / "prompt.running.md"
+    src.write_text("# prompt")
+    linked = tmp_path / "run" / "prompt.md"
+    linked.parent.mkdir()
+
+    codex_watcher._link_or_copy(src, linked)
+    assert os.path.samefile(src, linked)
+    # A retry links the same source again.
+    codex_watcher._link_or_copy(src, linked)
+    assert os.path.samefile(src, linked)
+
+    src.unlink()
+    src.write_text("# retried prompt")
+    codex_watcher._link_or_copy(src, linked)
+    assert linked.read_text() == "# retried prompt"
+    assert os.path.samefile(src, linked)
+
+    def cross_device(a, b):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(codex_watcher.os, "link", cross_device)
+    copied = tmp_path / "run" / "copy.md"
+    codex_watcher._link_or_copy(src, copied)
+    assert copied.read_text() == "# retried prompt"
+    assert not os.path.samefile(src, copied)
+
+    try:
+        codex_watcher._link_or_copy(tmp_path / "missing.md", tmp_path / "x.md")
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("a missing source should raise FileNotFoundError")
+
+
+def test_sharded_job_queue_spreads_repos_and_releases_them(tmp_path):
+    def make_job(repo, job_id):
+        return codex_watcher.Job(
+            git_owner="owner",
+            repo_name=repo,
+            branch_name="main",
+            job_id=job_id,
+            inbox_rel=Path(f"{repo}/main/{job_id}.prompt.md"),
+            inbox_path=tmp_path / f"{job_id}.running.md",
+            run_root=tmp_path / job_id,
+            prompt_path=tmp_path / job_id / "prompt.md",
+        )
+
+    sharded = codex_watcher.ShardedJobQueue(2)
+    sharded.put(make_job("alpha", "a1"))
+    sharded.put(make_job("beta", "b1"))
+    sharded.put(make_job("alpha", "a2"))
+    assert [shard.qsize() for shard in sharded.queues] == [2, 1]
+
+    beta_shard = sharded.queues[1]
+    assert beta_shard.get_nowait().job_id == "b1"
+    beta_shard.task_done()
+
+    # beta has nothing outstanding, so it is placed afresh on the idlest worker,
+    # and so is the new gamma repo.
+    sharded.put(make_job("beta", "b2"))
+    sharded.put(make_job("gamma", "g1"))
+    assert [job.job_id for job in sharded.queues[0].queue] == ["a1", "a2"]
+    assert [job.job_id for job in sharded.queues[1].queue] == ["b2", "g1"]
@@ -3,6 +3,7 @@ from __future__ import annotations
 import copy
 import subprocess
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
@@ -435,3 +436,132 @@ def test_greedy_inboxes_skips_discovery_when_upstream_disabled(
     rebuild_inbox_tree.main()
 
     assert not (inbox / "nova-process").exists()
+
+
+def test_prefetch_remote_branches_maps_each_repo(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    repos = [tmp_path / name for name in ("alpha", "beta", "gamma")]
+
+    def fake_ls_remote(
+        target: str, heads_only: bool = True, cwd: Path | None = None
+    ) -> tuple[bool, list[str], str]:
+        assert cwd is not None
+        return True, [f"{cwd.name}-main"], ""
+
+    monkeypatch.setattr(rebuild_inbox_tree, "run_git_ls_remote", fake_ls_remote)
+
+    assert rebuild_inbox_tree.prefetch_remote_branches(repos) == {
+        repo: [f"{repo.name}-main"] for repo in repos
+    }
+    assert rebuild_inbox_tree.prefetch_remote_branches([]) == {}
+
+
+def test_list_remote_branches_prefers_pygit2_and_falls_back(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    pytest.importorskip("pygit2")
+    remote = tmp_path / "remote.git"
+    _run_git(["git", "init", "--bare", "-b", "main", str(remote)])
+    seed = tmp_path / "seed"
+    _run_git(["git", "clone", str(remote), str(seed)])
+    _run_git(
+        [
+            "git",
+            "-c",
+            "user.name=CI",
+            "-c",
+            "user.email=ci@example.invalid",
+            "commit",
+            "--allow-empty",
+            "-m",
+            "init",
+        ],
+        cwd=seed,
+    )
+    _run_git(["git", "tag", "v1"], cwd=seed)
+    _run_git(["git", "push", "origin", "HEAD:main", "HEAD:feature", "v1"], cwd=seed)
+
+    def fail_ls_remote(
+        target: str, heads_only: bool = True, cwd: Path | None = None
+    ) -> tuple[bool, list[str], str]:
+        raise AssertionError("pygit2 should have listed the heads")
+
+    monkeypatch.setattr(rebuild_inbox_tree, "run_git_ls_remote", fail_ls_remote)
+    assert sorted(rebuild_inbox_tree.list_remote_branches(seed)) == [
+        "feature",
+        "main",
+    ]
+
+    def fake_ls_remote(
+        target: str, heads_only: bool = True, cwd: Path | None = None
+    ) -> tuple[bool, list[str], str]:
+        return True, ["from-git"], ""
+
+    monkeypatch.setattr(rebuild_inbox_tree, "run_git_ls_remote", fake_ls_remote)
+    _run_git(["git", "remote", "remove", "origin"], cwd=seed)
+    assert rebuild_inbox_tree.list_remote_branches(seed) == ["from-git"]
+
+
+def test_remove_inbox_dirs_replaces_stale_branches_with_markers(
+    tmp_path: Path,
+) -> None:
+    stale = [tmp_path / name for name in ("old-a", "old-b")]
+    for path in stale:
+        (path / "nested").mkdir(parents=True)
+        (path / "nested" / "job.prompt.md").write_text("x", encoding="utf-8")
+
+    rebuild_inbox_tree.remove_inbox_dirs(
+        [*stale, tmp_path / "never-existed"], reason="gone"
+    )
+
+    for path in stale:
+        assert [child.name for child in path.iterdir()] == ["ERROR.md"]
+        assert "Reason: gone" in (path / "ERROR.md").read_text(encoding="utf-8")
+    assert not (tmp_path / "never-existed").exists()
+
+
+def test_remove_inbox_dirs_skips_rmtree_for_empty_branches(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    empty = tmp_path / "fresh"
+    empty.mkdir()
+
+    def fail_rmtree(path: Path) -> None:
+        raise AssertionError(f"rmtree should not run for empty folder {path}")
+
+    monkeypatch.setattr(rebuild_inbox_tree.shutil, "rmtree", fail_rmtree)
+
+    rebuild_inbox_tree.remove_inbox_dirs([empty], reason="gone")
+
+    assert [child.name for child in empty.iterdir()] == ["ERROR.md"]
+
+
+def test_log_writes_immediately_outside_main(
+    capsys: pytest.CaptureFixture[str], tmp_path: Path
+) -> None:
+    rebuild_inbox_tree.remove_inbox_dirs([tmp_path / "missing"], reason="gone")
+    rebuild_inbox_tree.log("after removal")
+
+    assert capsys.readouterr().out.endswith("[rebuild_inbox_tree] after removal\n")
+    assert rebuild_inbox_tree._LOG_BUF == []
+
+
+def test_buffered_log_writes_each_line_once_across_threads(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rebuild_inbox_tree, "_LOG_BUFFERED", True)
+    monkeypatch.setattr(rebuild_inbox_tree, "_LOG_FLUSH_LINES", 3)
+
+    def burst(worker: int) -> None:
+        for i in range(200):
+            rebuild_inbox_tree.log(f"{worker}-{i}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(burst, range(8)))
+    rebuild_inbox_tree._flush_log()
+
+    lines = capsys.readouterr().out.splitlines()
+    expected = {f"[rebuild_inbox_tree] {w}-{i}" for w in range(8) for i in range(200)}
+    assert len(lines) == len(expected)
+    assert set(lines) == expected
@@ -75,3 +75,23 @@ def test_derive_repo_root_multi_owner_rejects_too_short(tmp_path):
 
     with pytest.raises(RuntimeError):
         codex_watcher.derive_repo_root_from_prompt(cfg, str(prompt_path))
+
+
+def test_resolve_prompt_repo_follows_symlinked_inbox(tmp_path):
+    real_inbox = tmp_path / "real-inbox"
+    inbox_root = tmp_path / "inbox"
+    repos_root = tmp_path / "repos"
+    prompt_path = real_inbox / "prompt-valet" / "main" / "P1c2-b.prompt.md"
+    prompt_path.parent.mkdir(parents=True, exist_ok=True)
+    prompt_path.write_text("# dummy prompt")
+    inbox_root.symlink_to(real_inbox, target_is_directory=True)
+
+    cfg = make_config(inbox_root, repos_root, mode="legacy_single_owner")
+    linked_prompt = inbox_root / "prompt-valet" / "main" / "P1c2-b.prompt.md"
+    for path in (linked_prompt, prompt_path):
+        owner, repo_name, branch, repo_root, rel = codex_watcher.resolve_prompt_repo(
+            cfg, str(path)
+        )
+        assert (owner, repo_name, branch) == ("nova-rey", "prompt-valet", "main")
+        assert repo_root == repos_root / "nova-rey" / "prompt-valet"
+        assert rel == Path("prompt-valet/main/P1c2-b.prompt.md")
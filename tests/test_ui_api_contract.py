@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from pathlib import Path
 from typing import List
 
 import httpx
@@ -57,6 +58,18 @@ def test_upload_jobs_returns_expected_job_list() -> None:
     assert all(job_id.startswith("upload-") for job_id in job_ids)
 
 
+def test_upload_jobs_streams_path_backed_files(tmp_path: Path) -> None:
+    client = _make_client()
+    spooled = tmp_path / "spooled.prompt.md"
+    spooled.write_bytes(b"# from disk")
+    files = [
+        UploadFilePayload(filename="spooled.prompt.md", path=spooled),
+        UploadFilePayload(filename="inline.prompt.md", data=b"# inline"),
+    ]
+    response = asyncio.run(client.upload_jobs("repo-one", "main", files))
+    assert len(response) == len(files)
+
+
 def test_tail_job_log_respects_lines_parameter() -> None:
     client = _make_client()
     full_log = asyncio.run(client.tail_job_log(stub_api.STREAM_JOB_ID))
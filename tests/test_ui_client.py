@@ -95,3 +95,141 @@ def test_get_status_returns_dict_payload() -> None:
 
     result = asyncio.run(client.get_status())
     assert result["status"] == "ok"
+
+
+def test_calls_share_one_pooled_client_per_loop() -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"jobs": []})
+
+    transport = httpx.MockTransport(handler)
+    client = PromptValetAPIClient("http://example/api/v1", transport=transport)
+
+    async def _exercise() -> None:
+        await client.list_jobs()
+        pooled = client._client
+        await client.list_jobs(state="running")
+        assert pooled is not None
+        assert client._client is pooled
+        await client.aclose()
+        assert pooled.is_closed
+        assert client._client is None
+
+        async with client as managed:
+            await managed.list_jobs()
+            pooled = client._client
+        assert pooled is not None and pooled.is_closed
+
+    asyncio.run(_exercise())
+
+
+def test_ping_revalidates_health_with_etag() -> None:
+    from prompt_valet import __version__
+    from prompt_valet.api.app import create_app
+
+    seen_status: list[int] = []
+
+    async def _log_response(response: httpx.Response) -> None:
+        seen_status.append(response.status_code)
+
+    transport = httpx.ASGITransport(app=create_app())
+    client = PromptValetAPIClient("http://example/api/v1", transport=transport)
+
+    async def _run() -> None:
+        client._httpx_client().event_hooks["response"].append(_log_response)
+        first = await client.ping()
+        client.invalidate_health()
+        second = await client.ping()
+        assert first.reachable and second.reachable
+        assert first.version == second.version == __version__
+        await client.aclose()
+
+    asyncio.run(_run())
+    assert seen_status == [200, 304]
+
+
+def test_ping_coalesces_concurrent_and_recent_probes() -> None:
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json={"status": "ok", "version": "1.2.3"})
+
+    transport = httpx.MockTransport(handler)
+    client = PromptValetAPIClient("http://example/api/v1", transport=transport)
+
+    async def _run() -> None:
+        reports = await asyncio.gather(*(client.ping() for _ in range(3)))
+        assert {report.version for report in reports} == {"1.2.3"}
+        assert calls == 1
+        await client.ping()
+        assert calls == 1, "a fresh report is served from the TTL cache"
+        client.invalidate_health()
+        await client.ping()
+        assert calls == 2
+        await client.aclose()
+
+    asyncio.run(_run())
+
+
+def test_concurrent_list_calls_share_one_request() -> None:
+    seen: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        if request.url.path.endswith("/targets"):
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json={"jobs": [{"job_id": "a"}]})
+
+    transport = httpx.MockTransport(handler)
+    client = PromptValetAPIClient("http://example/api/v1", transport=transport)
+
+    async def _run() -> None:
+        results = await asyncio.gather(
+            client.list_jobs(),
+            client.list_jobs(),
+            client.list_jobs(state="running"),
+            client.list_targets(),
+            client.list_targets(),
+        )
+        assert results[0] == results[1] == [{"job_id": "a"}]
+        assert len(seen) == 3
+        await client.list_jobs()
+        assert len(seen) == 4, "finished requests are not cached"
+        await client.aclose()
+
+    asyncio.run(_run())
+
+
+def test_stream_job_log_reassembles_split_chunks() -> None:
+    async def _chunks():
+        for chunk in (b"da", b"ta: caf\xc3", b"\xa9\r\n: keepalive\r\n\r\ndata: tail"):
+            yield chunk
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, content=_chunks(), headers={"content-type": "text/event-stream"}
+        )
+
+    transport = httpx.MockTransport(handler)
+    client = PromptValetAPIClient("http://example/api/v1", transport=transport)
+
+    async def _collect() -> list[str]:
+        return [line async for line in client.stream_job_log("job-abc")]
+
+    assert asyncio.run(_collect()) == ["café", "tail"]
+
+
+def test_unexpected_payload_shapes_raise_value_error() -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=["not", "an", "object"])
+
+    transport = httpx.MockTransport(handler)
+    client = PromptValetAPIClient("http://example/api/v1", transport=transport)
+
+    for call in (client.list_jobs, client.get_status):
+        try:
+            asyncio.run(call())
+        except ValueError:
+            continue
+        raise AssertionError(f"{call.__name__} accepted a list payload")
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timedelta
 
 from prompt_valet.ui.app import (
+    _build_job_rows,
     _format_relative_age,
     _format_timestamp_label,
+    _is_accepted_upload,
+    _job_rows_signature,
+    _jobs_fingerprint,
+    _json_cell,
     _parse_iso_timestamp,
+    _merge_job_rows,
+    _tree_card_fields,
+    _watcher_card_fields,
 )
 
 
@@ -32,3 +41,110 @@ def test_format_relative_age_variants() -> None:
     assert _format_relative_age(timedelta(seconds=125)) == "2m"
     assert _format_relative_age(timedelta(hours=3, minutes=10)) == "3h"
     assert _format_relative_age(timedelta(days=2, hours=5)) == "2d"
+
+
+def test_job_rows_signature_tracks_content_and_order() -> None:
+    jobs = [
+        {"job_id": "a", "state": "running", "created_at": "2025-01-01T00:00:00Z"},
+        {"job_id": "b", "state": "queued", "created_at": "2025-01-02T00:00:00Z"},
+    ]
+    rows = _build_job_rows(jobs, descending=True)
+    assert _job_rows_signature(rows) == _job_rows_signature(
+        _build_job_rows([dict(job) for job in jobs], descending=True)
+    )
+    assert _job_rows_signature(rows) != _job_rows_signature(
+        _build_job_rows(jobs, descending=False)
+    )
+    jobs[0]["state"] = "succeeded"
+    assert _job_rows_signature(rows) != _job_rows_signature(
+        _build_job_rows(jobs, descending=True)
+    )
+
+
+def test_merge_job_rows_reuses_rows_by_job_id() -> None:
+    current = [{"job_id": "a", "state": "Running"}, {"job_id": "b", "state": "Queued"}]
+    row_a, row_b = current
+    _merge_job_rows(
+        current,
+        [{"job_id": "a", "state": "Succeeded"}, {"job_id": "b", "state": "Queued"}],
+    )
+    assert current[0] is row_a
+    assert row_a["state"] == "Succeeded"
+
+    _merge_job_rows(
+        current,
+        [
+            {"job_id": "c", "state": "Queued"},
+            {"job_id": "b", "state": "Running"},
+        ],
+    )
+    assert [row["job_id"] for row in current] == ["c", "b"]
+    assert current[1] is row_b
+    assert row_b["state"] == "Running"
+
+
+def test_services_card_fields_are_comparable_snapshots() -> None:
+    status = {
+        "status": "ok",
+        "jobs": {"counts": {"running": 1}, "total": 3, "stalled_running": 0},
+        "roots": {"runs_root_exists": True, "tree_builder_root_exists": True},
+        "config": {"runs_root": "/runs", "tree_builder_root": "/inbox"},
+        "targets": {"count": 2},
+    }
+    running = {"state": "running", "heartbeat_at": "2025-01-01T00:00:00Z"}
+    fields = _watcher_card_fields(status, running, running)
+    assert fields == _watcher_card_fields(dict(status), dict(running), None)
+    assert fields.message == "1 running run(s)"
+    assert fields.heartbeat_text == "Last heartbeat: 2025-01-01 00:00:00 UTC"
+    assert fields.detail == "Runs root: /runs"
+
+    tree = _tree_card_fields(status, 0)
+    assert tree.state == "running"
+    assert tree.message == "2 target(s) discovered"
+    assert tree.count_text == "Targets: 2"
+
+
+def test_parse_iso_timestamp_ignores_unhashable_values() -> None:
+    assert _parse_iso_timestamp({"at": "2025-01-01T00:00:00Z"}) is None
+    assert _parse_iso_timestamp("not a timestamp") is None
+    assert _parse_iso_timestamp("2025-01-01T00:00:00Z") is _parse_iso_timestamp(
+        "2025-01-01T00:00:00Z"
+    )
+
+
+def test_json_cell_matches_stdlib_for_scalars() -> None:
+    assert _json_cell("héllo") == '"héllo"'
+    assert _json_cell(3) == "3"
+    assert _json_cell(None) == "null"
+
+
+def test_json_cell_matches_stdlib_for_containers_and_floats() -> None:
+    for value in (
+        {"a": 1, "b": [1, 2], "c": {"d": None}},
+        [1, "x", {"y": 2.5}],
+        {1: "non-str key"},
+        1.5e-7,
+        float("nan"),
+        2**70,
+        True,
+    ):
+        assert _json_cell(value) == json.dumps(value, ensure_ascii=False, default=str)
+
+
+def test_jobs_fingerprint_ignores_unrendered_fields() -> None:
+    jobs = [{"job_id": "a", "state": "running", "heartbeat_at": "2025-01-01T00:00:00Z"}]
+    fingerprint = _jobs_fingerprint(jobs, True)
+    assert fingerprint == _jobs_fingerprint([{**jobs[0], "log_path": "/x"}], True)
+    assert fingerprint != _jobs_fingerprint(jobs, False)
+    assert fingerprint != _jobs_fingerprint([{**jobs[0], "state": "failed"}], True)
+
+
+def test_is_accepted_upload_requires_md_extension() -> None:
+    assert _is_accepted_upload("notes.md")
+    assert _is_accepted_upload("NOTES.MD")
+    assert _is_accepted_upload("archive.tar.md")
+    assert not _is_accepted_upload("md")
+    assert not _is_accepted_upload("MD")
+    assert not _is_accepted_upload("notes.txt")
+    assert not _is_accepted_upload("notesmd")
+    assert not _is_accepted_upload("")
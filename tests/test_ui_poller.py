@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import List
+
+from nicegui import app as nicegui_app
+
+import prompt_valet.ui.app as ui_app_module
+
+
+def test_poller_dispatches_only_due_active_tasks() -> None:
+    initial_routes = list(nicegui_app.router.routes)
+    calls: List[str] = []
+
+    def _recorder(name: str):
+        async def _callback() -> None:
+            calls.append(name)
+
+        return _callback
+
+    try:
+        poller = ui_app_module._Poller()
+        due = poller.every(2.0, _recorder("due"))
+        later = poller.every(5.0, _recorder("later"))
+        paused = poller.every(1.0, _recorder("paused"), active=False)
+
+        async def _tick() -> None:
+            poller._tick()
+            await asyncio.sleep(0)
+
+        async def _run() -> None:
+            await _tick()
+            assert calls == []
+
+            due.next_due = time.monotonic() - 1
+            paused.next_due = time.monotonic() - 1
+            await _tick()
+            assert calls == ["due"]
+            assert due.next_due > time.monotonic()
+
+            paused.active = True
+            await _tick()
+            assert calls == ["due"], "re-activation restarts the interval"
+
+        asyncio.run(_run())
+        assert later.next_due > time.monotonic()
+
+        poller.active = False
+        assert not poller._timer.active
+        poller.active = True
+        assert poller._timer.active
+    finally:
+        nicegui_app.router.routes[:] = initial_routes
+
+
+def test_poll_task_backs_off_while_results_repeat() -> None:
+    async def _noop() -> None:
+        return None
+
+    task = ui_app_module._PollTask(5.0, _noop, active=True)
+    task.note_result("up")
+    assert task.interval == 5.0
+    task.note_result("up")
+    assert task.interval == 10.0
+    task.note_result("up")
+    assert task.interval == 20.0
+    task.note_result("up")
+    assert task.interval == 30.0, "capped at six times the base interval"
+
+    task.note_result("down")
+    assert task.interval == 5.0
+    assert task.next_due <= time.monotonic() + 5.0
+
+
+def test_poll_task_failure_backoff_resets_on_success() -> None:
+    async def _noop() -> None:
+        return None
+
+    task = ui_app_module._PollTask(2.0, _noop, active=True)
+    for expected in (2.0, 4.0, 8.0, 16.0, 30.0, 30.0):
+        task.note_failure(30.0)
+        assert task.interval == expected
+    task.note_result("fresh")
+    assert task.interval == 2.0
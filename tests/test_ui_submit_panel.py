@@ -21,6 +21,7 @@ class ControlledPromptValetAPIClient:
         transport: Any | None = None,
     ) -> None:
         self._targets: List[Dict[str, str | None]] = []
+        self.list_targets_calls = 0
 
     def set_targets(self, targets: List[Dict[str, str | None]]) -> None:
         self._targets = [dict(target) for target in targets]
@@ -28,7 +29,12 @@ class ControlledPromptValetAPIClient:
     async def ping(self) -> HealthReport:
         return HealthReport(reachable=True, version="stub")
 
+    async def aclose(self) -> None:
+        return None
+
     async def list_targets(self) -> List[Dict[str, str | None]]:
+        self.list_targets_calls += 1
+        await asyncio.sleep(0)
         return [dict(target) for target in self._targets]
 
     async def list_jobs(
@@ -124,3 +130,58 @@ def test_submit_repo_selection_survives_refresh(monkeypatch) -> None:
         assert branch == "main"
     finally:
         nicegui_app.router.routes[:] = initial_routes
+
+
+def test_submit_refresh_targets_skips_overlapping_calls(monkeypatch) -> None:
+    initial_routes = list(nicegui_app.router.routes)
+    monkeypatch.setattr(
+        ui_app_module, "PromptValetAPIClient", ControlledPromptValetAPIClient
+    )
+    test_context: Dict[str, Dict[str, Any]] = {}
+    settings = UISettings(
+        api_base_url="http://stub/api/v1",
+        ui_bind_host="0.0.0.0",
+        ui_bind_port=8080,
+        api_timeout_seconds=0.1,
+    )
+    try:
+        ui_app_module.create_ui_app(settings, test_context=test_context)
+        submit_panel = test_context["submit_panel"]
+        client = submit_panel["client"]
+        refresh_targets = submit_panel["refresh_targets"]
+        client.set_targets(
+            [{"repo": "repo-a", "branch": "main", "full_repo": "org/repo-a"}]
+        )
+
+        async def _overlap() -> None:
+            await asyncio.gather(refresh_targets(), refresh_targets())
+
+        asyncio.run(_overlap())
+        assert client.list_targets_calls == 1
+        assert submit_panel["get_selection"]() == ("org/repo-a", "main")
+    finally:
+        nicegui_app.router.routes[:] = initial_routes
+
+
+def test_api_client_is_closed_with_its_page(monkeypatch) -> None:
+    initial_routes = list(nicegui_app.router.routes)
+    monkeypatch.setattr(
+        ui_app_module, "PromptValetAPIClient", ControlledPromptValetAPIClient
+    )
+    shutdown_handlers = list(nicegui_app._shutdown_handlers)
+    page = ui_app_module.ui.context.client
+    settings = UISettings(
+        api_base_url="http://stub/api/v1",
+        ui_bind_host="0.0.0.0",
+        ui_bind_port=8080,
+        api_timeout_seconds=0.1,
+    )
+    try:
+        for _ in range(2):
+            test_context: Dict[str, Dict[str, Any]] = {}
+            ui_app_module.create_ui_app(settings, test_context=test_context)
+            client = test_context["submit_panel"]["client"]
+            assert client.aclose in page.delete_handlers
+        assert nicegui_app._shutdown_handlers == shutdown_handlers
+    finally:
+        nicegui_app.router.routes[:] = initial_routes